@@ -0,0 +1 @@
+"""Code shared by the travel planner and the intro A2A examples."""
@@ -0,0 +1,221 @@
+"""
+Minimal Prometheus metrics in the text exposition format, used by the intro
+agents and the travel planner's weather agent.
+
+prometheus_client is not a dependency, and the A2A servers only need
+counters, histograms and scrape-time gauges. Recording is a dict lookup and
+an add (plus a bisect for histograms), with no locks: all recording happens
+on the event loop.
+"""
+
+import bisect
+import time
+from importlib.metadata import version
+from typing import Callable
+
+from a2a.server.events.in_memory_queue_manager import InMemoryQueueManager
+from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; echo calls take well under a millisecond, model calls many seconds
+LATENCY_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30,
+)
+
+
+def _escape(value) -> str:
+    """Label value escaped per the exposition format: backslash, quote, newline."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names, values, extra=""):
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+
+    def inc(self, *labelvalues, amount=1):
+        self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} counter"
+        for labelvalues, value in self._values.items():
+            yield f"{self.name}{_label_text(self.labelnames, labelvalues)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=LATENCY_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # label values -> [per-bucket counts (last one is +Inf), sum]
+        self._series = {}
+
+    def observe(self, value: float, *labelvalues):
+        series = self._series.get(labelvalues)
+        if series is None:
+            series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} histogram"
+        for labelvalues, (counts, total) in self._series.items():
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                labels = _label_text(self.labelnames, labelvalues, f'le="{_number(bound)}"')
+                yield f"{self.name}_bucket{labels} {cumulative}"
+            labels = _label_text(self.labelnames, labelvalues)
+            yield f"{self.name}_sum{labels} {_number(total)}"
+            yield f"{self.name}_count{labels} {cumulative}"
+
+
+class Gauge:
+    """Value read from `func` at scrape time, so the hot path pays nothing."""
+
+    def __init__(self, name: str, documentation: str, func: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.func = func
+
+    def render(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} gauge"
+        yield f"{self.name} {_number(self.func())}"
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._add(Counter(name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), buckets=LATENCY_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, documentation, labelnames, buckets))
+
+    def gauge(self, name, documentation, func) -> Gauge:
+        return self._add(Gauge(name, documentation, func))
+
+    def _add(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+class A2AMetrics:
+    """Request counts and latency per A2A method, shared by every transport."""
+
+    def __init__(self, registry: Registry):
+        self.requests = registry.counter(
+            "a2a_requests_total", "A2A requests by method and outcome.", ("method", "outcome")
+        )
+        self.latency = registry.histogram(
+            "a2a_request_duration_seconds", "A2A request latency by method.", ("method",)
+        )
+
+    def record(self, method: str, start: float, outcome: str):
+        self.latency.observe(time.perf_counter() - start, method)
+        self.requests.inc(method, outcome)
+
+
+class InstrumentedRequestHandler(DefaultRequestHandler):
+    """
+    DefaultRequestHandler that records every call in A2AMetrics.
+
+    Instrumenting the handler rather than the HTTP app covers JSON-RPC and
+    gRPC alike, without parsing request bodies.
+    """
+
+    def __init__(self, *args, metrics: A2AMetrics, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = metrics
+
+    async def _timed(self, method, call, *args, **kwargs):
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await call(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            self.metrics.record(method, start, outcome)
+
+    async def on_message_send(self, params, context=None):
+        return await self._timed("message/send", super().on_message_send, params, context)
+
+    async def on_get_task(self, params, context=None):
+        return await self._timed("tasks/get", super().on_get_task, params, context)
+
+    async def on_cancel_task(self, params, context=None):
+        return await self._timed("tasks/cancel", super().on_cancel_task, params, context)
+
+    async def on_message_send_stream(self, params, context=None):
+        # Latency of a stream is the time until its last event
+        start = time.perf_counter()
+        outcome = "error"
+        try:
+            async for event in super().on_message_send_stream(params, context):
+                yield event
+            outcome = "ok"
+        finally:
+            self.metrics.record("message/stream", start, outcome)
+
+    def register_gauges(self, registry: Registry):
+        """
+        Task store size, event queue depth and running tasks, read at scrape time.
+
+        The last two read DefaultRequestHandler and InMemoryQueueManager
+        internals (checked against a2a-sdk 0.3.22), so this fails here rather
+        than reporting zeros if an SDK upgrade renames them.
+        """
+        queues = getattr(self._queue_manager, "_task_queue", None)
+        if not (
+            isinstance(self._queue_manager, InMemoryQueueManager)
+            and isinstance(queues, dict)
+            and isinstance(getattr(self, "_running_agents", None), dict)
+        ):
+            raise RuntimeError(
+                "a2a_event_queue_depth and a2a_active_tasks need the in-memory queue "
+                f"manager of a2a-sdk 0.3.x; found a2a-sdk {version('a2a-sdk')} with "
+                f"{type(self._queue_manager).__name__}"
+            )
+        registry.gauge(
+            "a2a_task_store_tasks",
+            "Tasks held in the task store.",
+            lambda: len(getattr(self.task_store, "tasks", ())),
+        )
+        registry.gauge(
+            "a2a_event_queue_depth",
+            "Events waiting in the queues of running tasks.",
+            lambda: sum(queue.queue.qsize() for queue in queues.values()),
+        )
+        registry.gauge(
+            "a2a_active_tasks",
+            "Tasks whose agent is currently running.",
+            lambda: len(self._running_agents),
+        )
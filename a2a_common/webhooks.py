@@ -0,0 +1,88 @@
+"""
+Push-notification webhook URL checks.
+
+An A2A server POSTs finished tasks to whatever URL the client registered, so
+an unchecked URL lets any caller make the server send requests into its own
+network. As the A2A spec recommends, only http(s) URLs whose host resolves to
+public addresses are accepted, unless the host is explicitly allowed.
+"""
+
+import asyncio
+import ipaddress
+import os
+import socket
+from dataclasses import dataclass
+from typing import Optional
+from urllib.parse import urlsplit
+
+
+class WebhookNotAllowed(ValueError):
+    """Raised for a webhook URL the server will not call."""
+
+
+@dataclass(frozen=True)
+class WebhookPolicy:
+    """
+    Which webhook URLs a server calls.
+
+    allowed_hosts: "host" or "host:port" entries called whatever they resolve
+      to, e.g. a webhook receiver on localhost during development
+    allow_private: accept private, loopback and link-local addresses for
+      every host; only for servers on a trusted network
+    """
+
+    allowed_hosts: frozenset = frozenset()
+    allow_private: bool = False
+
+    @classmethod
+    def from_env(cls, prefix: str) -> "WebhookPolicy":
+        """Reads <prefix>_WEBHOOK_ALLOWED_HOSTS (comma-separated) and <prefix>_WEBHOOK_ALLOW_PRIVATE=1."""
+        hosts = os.getenv(f"{prefix}_WEBHOOK_ALLOWED_HOSTS", "")
+        return cls(
+            allowed_hosts=frozenset(h.strip().lower() for h in hosts.split(",") if h.strip()),
+            allow_private=os.getenv(f"{prefix}_WEBHOOK_ALLOW_PRIVATE") == "1",
+        )
+
+
+def _target(url: str) -> tuple[str, int]:
+    parts = urlsplit(url)
+    if parts.scheme not in ("http", "https") or not parts.hostname:
+        raise WebhookNotAllowed(f"Webhook URL must be http(s) with a host: {url!r}")
+    try:
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+    except ValueError:
+        raise WebhookNotAllowed(f"Invalid port in webhook URL: {url!r}") from None
+    return parts.hostname.lower(), port
+
+
+def _check_address(host: str, address: str):
+    ip = ipaddress.ip_address(address.split("%")[0])  # drop an IPv6 zone
+    if not ip.is_global:
+        raise WebhookNotAllowed(f"Webhook host {host} is not a public address ({ip})")
+
+
+async def check_webhook_url(url: str, policy: Optional[WebhookPolicy] = None):
+    """
+    Raises WebhookNotAllowed unless `policy` lets the server call `url`.
+    Resolves the host, so call it again right before each notification:
+    a name that was public when registered may point inward later.
+    """
+    policy = policy or WebhookPolicy()
+    host, port = _target(url)
+    if host in policy.allowed_hosts or f"{host}:{port}" in policy.allowed_hosts:
+        return
+    if policy.allow_private:
+        return
+    try:
+        ipaddress.ip_address(host)
+        addresses = [host]
+    except ValueError:
+        try:
+            infos = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except socket.gaierror as e:
+            raise WebhookNotAllowed(f"Webhook host {host} does not resolve: {e}") from None
+        addresses = [sockaddr[0] for *_, sockaddr in infos]
+    for address in addresses:
+        _check_address(host, address)
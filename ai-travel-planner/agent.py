@@ -1,55 +1,213 @@
-import random
+"""
+Travel planner agents, tools and datasets.
+
+Everything here is built on first access (PEP 562 module `__getattr__`), so
+`from agent import attractions_agent` only imports ADK and builds that one
+agent, and a worker that only calls `query_hotels` never imports ADK or
+parses the flight dataset. Accessing `root_agent` builds the full tree.
+"""
 
 # Task 1: Import Libraries
-from google.genai import Client
-from google.adk.agents.llm_agent import Agent
-from google.adk.agents.remote_a2a_agent import (
-    AGENT_CARD_WELL_KNOWN_PATH,
-    RemoteA2aAgent,
-)
-from google.adk.tools.example_tool import ExampleTool
-from google.genai import types
 import os
 import json
+import threading
 from typing import Optional
 
+# Guards first loads and builds: tools run on worker threads (tool_executor.py)
+_load_lock = threading.RLock()
+
+
+# --- Model routing ---
+# Model and token budget per agent (see model_routing.ModelRoute). The flight
+# and hotel agents mostly format tool output, so they run on a smaller model
+# without thinking, and answer tool results with TOOL_ANSWER_TEMPLATES
+# instead of a second model turn. TRAVEL_PLANNER_MODEL_ROUTES overrides
+# entries with JSON, e.g. '{"hotel_agent": {"model": "gemini-2.5-flash"}}'.
+MODEL_ROUTES = {
+    "root_agent": {
+        "model": "gemini-2.5-flash",
+        "max_output_tokens": 4096,
+        "thinking_budget": 1024,
+    },
+    "attractions_agent": {
+        "model": "gemini-2.5-flash",
+        "max_output_tokens": 1024,
+        "thinking_budget": 0,
+    },
+    "flight_agent": {
+        "model": "gemini-2.5-flash-lite",
+        "max_output_tokens": 1024,
+        "thinking_budget": 0,
+        "direct_answer": True,
+    },
+    "hotel_agent": {
+        "model": "gemini-2.5-flash-lite",
+        "max_output_tokens": 1024,
+        "thinking_budget": 0,
+        "direct_answer": True,
+    },
+}
+
+
+def _model_route(agent_name):
+    """
+    The agent's ModelRoute: MODEL_ROUTES with TRAVEL_PLANNER_MODEL_ROUTES
+    applied. Read when the agent is built, so a .env loaded after importing
+    this module still counts.
+    """
+    from model_routing import ModelRoute
+
+    raw = os.getenv("TRAVEL_PLANNER_MODEL_ROUTES", "").strip()
+    try:
+        overrides = json.loads(raw) if raw else {}
+    except json.JSONDecodeError as e:
+        raise ValueError(f"TRAVEL_PLANNER_MODEL_ROUTES is not valid JSON: {e}") from None
+    if not isinstance(overrides, dict) or not all(isinstance(v, dict) for v in overrides.values()):
+        raise ValueError(
+            "TRAVEL_PLANNER_MODEL_ROUTES must map agent names to route objects, "
+            'e.g. {"hotel_agent": {"model": "gemini-2.5-flash"}}'
+        )
+
+    settings = {**MODEL_ROUTES.get(agent_name, {}), **overrides.get(agent_name, {})}
+    try:
+        return ModelRoute(**settings)
+    except TypeError as e:
+        raise ValueError(f"Invalid route for {agent_name} in TRAVEL_PLANNER_MODEL_ROUTES: {e}") from None
+
+
+# Tool results rendered without the model (see model_routing.render_tool_result)
+TOOL_ANSWER_TEMPLATES = {
+    "query_flights_simple": {
+        "header": "Found {count} flight(s):",
+        "row": "- {airline} {flight_number}: {departure_city} ({departure_airport}) "
+        "{departure_time} → {arrival_city} ({arrival_airport}) {arrival_time}, {status}",
+        "empty": "No flights were found matching your request.",
+        "max_rows": 20,
+    },
+    "query_hotels": {
+        "header": "Found {count} hotel(s):",
+        "row": "- {name} ({city}): rated {rating}, ${price} per night",
+        "variants": {
+            "total_price": "- {name} ({city}): rated {rating}, ${total_price} for "
+            "{nights} nights (${average_nightly_price} per night)",
+        },
+        "empty": "No hotels were found matching your request.",
+        "max_rows": 20,
+    },
+}
+
+
+def _model_settings(agent_name, templates=None):
+    """Agent keyword arguments for the agent's route: model, config, planner, callbacks."""
+    from model_routing import model_callbacks
+
+    route = _model_route(agent_name)
+    before_model, after_model = model_callbacks(route, templates)
+    return {
+        "model": route.model,
+        "generate_content_config": route.generate_content_config(),
+        "planner": route.planner(),
+        "before_model_callback": before_model,
+        "after_model_callback": after_model,
+    }
+
+
+# --- Tool execution policies ---
+# Sync tools never run on the event loop shared by every session. Set a
+# tool's mode to "process" for CPU-heavy scans held back by the GIL, or
+# "inline" to run it on the loop (see tool_executor.ExecutionPolicy).
+TOOL_POLICIES = {
+    "query_flights_simple": {"mode": "thread", "max_workers": 4, "timeout": 30.0},
+    "query_hotels": {"mode": "thread", "max_workers": 4, "timeout": 30.0},
+}
+
+
+def _tool(func):
+    from tool_executor import ExecutionPolicy, offload
+
+    return offload(func, ExecutionPolicy(**TOOL_POLICIES[func.__name__]))
+
 
 # Task 2: Create your First Agent
-attractions_agent = Agent(
-    model="gemini-2.5-flash",
-    name="attractions_agent",
-    description="Provides tourist attractions info for a given city.",
-    instruction="""
-      You are responsible for suggesting popular tourist attractions,
-      sightseeing spots, and local activities for the given city.
-      Provide concise and relevant recommendations to help the user plan their trip.
-    """,
-    generate_content_config=types.GenerateContentConfig(
-        safety_settings=[
-            types.SafetySetting(
-                category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                threshold=types.HarmBlockThreshold.OFF,
-            ),
-        ]
-    ),
-)
+def _build_attractions_agent():
+    from google.adk.agents.llm_agent import Agent
+
+    return Agent(
+        name="attractions_agent",
+        description="Provides tourist attractions info for a given city.",
+        instruction="""
+          You are responsible for suggesting popular tourist attractions,
+          sightseeing spots, and local activities for the given city.
+          Provide concise and relevant recommendations to help the user plan their trip.
+        """,
+        **_model_settings("attractions_agent"),
+    )
 
 
 # Task 3: Integrate Flight Agent
 from datetime import datetime
 
-# --- Load mock flight dataset ---
+# --- Mock flight dataset (loaded on first use) ---
 FLIGHTS_JSON_PATH = os.path.join(os.path.dirname(__file__), "flights_dataset.json")
 
-with open(FLIGHTS_JSON_PATH, "r") as f:
-    flights_data = json.load(f)
+
+def _load_flights():
+    with open(FLIGHTS_JSON_PATH, "r") as f:
+        return json.load(f)
+
+
+# --- Place resolution (city names, aliases, IATA codes, misspellings) ---
+_place_indexes = {}
+
+
+def _place_index(dataset_name):
+    """PlaceIndex over a dataset's cities, rebuilt if the dataset is replaced."""
+    from places import PlaceIndex
+
+    data = _dataset(dataset_name)
+    cached = _place_indexes.get(dataset_name)
+    if cached is None or cached[0] is not data:
+        with _load_lock:
+            cached = _place_indexes.get(dataset_name)
+            if cached is None or cached[0] is not data:
+                if dataset_name == "flights_data":
+                    cached = (data, PlaceIndex.from_flights(data))
+                else:
+                    cached = (data, PlaceIndex.from_hotels(data))
+                _place_indexes[dataset_name] = cached
+    return cached[1]
+
+
+def _resolve_city(text, dataset_name):
+    """
+    Dataset spellings of the city `text` refers to, or an error dict listing
+    the candidates when it is ambiguous. Unknown places match nothing.
+    """
+    resolution = _place_index(dataset_name).resolve(text)
+    if resolution.ambiguous:
+        return {
+            "error": f"'{text}' could refer to several cities.",
+            "did_you_mean": resolution.candidates,
+        }
+    return resolution.spellings
 
 
 def query_flights(
     dep_city=None, arr_city=None, date=None, start_date=None, end_date=None, month=None
 ):
+    # Resolve each city once, not per row
+    dep_names = arr_names = None
+    if dep_city:
+        dep_names = _resolve_city(dep_city, "flights_data")
+        if isinstance(dep_names, dict):
+            return dep_names
+    if arr_city:
+        arr_names = _resolve_city(arr_city, "flights_data")
+        if isinstance(arr_names, dict):
+            return arr_names
+
     results = []
-    for flight in flights_data:
+    for flight in _dataset("flights_data"):
         dep_time_str = flight["departure_time"]  # e.g., "01-17 23:30"
         try:
             # parse with dummy year 2025
@@ -57,10 +215,10 @@ def query_flights(
         except ValueError:
             continue  # skip invalid date entries
 
-        # Filter by city names (case-insensitive)
-        if dep_city and flight.get("departure_city", "").lower() != dep_city.lower():
+        # Filter by resolved city names
+        if dep_names is not None and flight.get("departure_city") not in dep_names:
             continue
-        if arr_city and flight.get("arrival_city", "").lower() != arr_city.lower():
+        if arr_names is not None and flight.get("arrival_city") not in arr_names:
             continue
 
         # Filter by exact date
@@ -102,303 +260,410 @@ def query_flights_simple(
 
 
 # --- Flight Agent ---
-flight_agent = Agent(
-    model="gemini-2.5-flash",
-    name="flight_agent",
-    description="Provides flight information from the mock flight dataset using city names.",
-    instruction="""
-      You are a Flight Information agent. When asked for flights between cities on a certain date, 
-      query the mock flight dataset and provide a clear summary of matching flights,
-      including airline, flight number, departure/arrival cities and times, and status.
-      If no flights match, politely tell the user that no flights were found.
-      Assume the user provides city names, not airport codes.
-    """,
-    tools=[query_flights_simple],
-    generate_content_config=types.GenerateContentConfig(
-        safety_settings=[
-            types.SafetySetting(
-                category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                threshold=types.HarmBlockThreshold.OFF,
-            ),
-        ]
-    ),
-)
+def _build_flight_agent():
+    from google.adk.agents.llm_agent import Agent
+
+    return Agent(
+        name="flight_agent",
+        description="Provides flight information from the mock flight dataset using city names.",
+        instruction="""
+          You are a Flight Information agent. When asked for flights between cities on a certain date,
+          query the mock flight dataset and provide a clear summary of matching flights,
+          including airline, flight number, departure/arrival cities and times, and status.
+          If no flights match, politely tell the user that no flights were found.
+          Pass places as the user wrote them: city names, common aliases (e.g. NYC),
+          airport codes and misspellings are resolved by the tool. If the tool answers
+          with did_you_mean, ask the user which city they meant instead of guessing.
+        """,
+        tools=[_tool(query_flights_simple)],
+        **_model_settings("flight_agent", TOOL_ANSWER_TEMPLATES),
+    )
 
 
 # Task 4: Integrate Hotel Agent
-# --- Load mock hotel dataset ---
+# --- Mock hotel dataset (loaded on first use) ---
 HOTELS_JSON_PATH = os.path.join(os.path.dirname(__file__), "mock_hotels.json")
 
-with open(HOTELS_JSON_PATH, "r") as f:
-    hotels_data = json.load(f)
 
-# Normalize city names for faster searches
-for hotel in hotels_data:
-    hotel["city_normalized"] = hotel.get("city", "").lower()
+def _load_hotels():
+    from hotel_pricing import RateCalendar
+
+    with open(HOTELS_JSON_PATH, "r") as f:
+        hotels = json.load(f)
+
+    for hotel in hotels:
+        # Expand rate rules into a per-night calendar with prefix sums
+        hotel["calendar"] = RateCalendar.from_rules(
+            hotel.get("price", 0),
+            hotel.pop("rates", []),
+            hotel.pop("sold_out", []),
+        )
+    return hotels
 
 
-# --- Hotel query function (supports filters for city, rating, price) ---
+# --- Hotel query function (supports filters for city, rating, price, dates) ---
 def query_hotels(
     city: Optional[str] = None,
     min_rating: Optional[float] = None,
     max_price: Optional[float] = None,
+    check_in: Optional[str] = None,
+    check_out: Optional[str] = None,
 ):
     """
     Returns hotel details filtered by city, minimum rating, and maximum price.
-    city: str - partial or full name of the city (case-insensitive)
+    With stay dates, only hotels available for every night are returned, with
+    the total and average nightly price of the stay.
+    city: str - city name, alias (e.g. "NYC") or airport code; misspellings are tolerated
     min_rating: float - minimum rating threshold
-    max_price: float - maximum price per night
+    max_price: float - maximum price per night (average over the stay when dates are given)
+    check_in: str - arrival date as MM-DD, e.g. "06-10"
+    check_out: str - departure date as MM-DD, e.g. "06-15"; give both dates or neither
     """
+    from hotel_pricing import stay_nights
+
+    stay = None
+    if bool(check_in) != bool(check_out):
+        return {"error": "Give both check_in and check_out (MM-DD) to search a stay, or neither."}
+    if check_in and check_out:
+        stay = stay_nights(check_in, check_out)
+        if stay is None:
+            return {
+                "error": "check_in and check_out must be MM-DD dates with check_out after "
+                "check_in; a stay over New Year (e.g. 12-30 to 01-02) may last up to 31 nights."
+            }
+
+    city_names = None
+    if city:
+        city_names = _resolve_city(city, "hotels_data")
+        if isinstance(city_names, dict):
+            return city_names
+
     results = []
-    for hotel in hotels_data:
-        # Filter by city (partial match, case-insensitive)
-        if city and city.lower() not in hotel.get("city_normalized", ""):
+    for hotel in _dataset("hotels_data"):
+        # Filter by resolved city name
+        if city_names is not None and hotel.get("city") not in city_names:
             continue
         # Filter by minimum rating
         if min_rating and hotel.get("rating", 0) < min_rating:
             continue
+
+        result = {k: v for k, v in hotel.items() if k != "calendar"}
+        nightly_price = hotel.get("price", float("inf"))
+        if stay:
+            calendar = hotel["calendar"]
+            if not calendar.is_available(*stay):
+                continue
+            nights = stay[1] - stay[0]
+            total = calendar.total_price(*stay)
+            nightly_price = total / nights
+            result.update(
+                nights=nights,
+                total_price=round(total, 2),
+                average_nightly_price=round(nightly_price, 2),
+            )
+
         # Filter by maximum price
-        if max_price and hotel.get("price", float("inf")) > max_price:
+        if max_price and nightly_price > max_price:
             continue
-        results.append(hotel)
+        results.append(result)
     return results
 
 
 # --- Hotel Agent ---
-hotel_agent = Agent(
-    model="gemini-2.5-flash",
-    name="hotel_agent",
-    description="Provides hotel information for a city using a mock hotel dataset.",
-    instruction="""
-      You are a Hotel Information agent. When asked about hotels in a city, 
-      use the hotel dataset to provide a clear summary including hotel names, ratings, and prices.
-      You can optionally consider user's preferences for minimum rating or maximum price.
-      Assume all hotels have room availability.
-      If no hotels match, politely inform the user.
-    """,
-    tools=[query_hotels],  # agent calls query_hotels directly
-    generate_content_config=types.GenerateContentConfig(
-        safety_settings=[
-            types.SafetySetting(
-                category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                threshold=types.HarmBlockThreshold.OFF,
-            ),
-        ]
-    ),
-)
+def _build_hotel_agent():
+    from google.adk.agents.llm_agent import Agent
+
+    return Agent(
+        name="hotel_agent",
+        description="Provides hotel information for a city using a mock hotel dataset.",
+        instruction="""
+          You are a Hotel Information agent. When asked about hotels in a city,
+          use the hotel dataset to provide a clear summary including hotel names, ratings, and prices.
+          You can optionally consider user's preferences for minimum rating or maximum price.
+          When the user gives stay dates, pass them as check_in and check_out (MM-DD) so only
+          hotels with rooms for every night are returned, and report the total and average
+          nightly price for the stay.
+          Pass the city as the user wrote it; aliases, airport codes and misspellings are
+          resolved by the tool. If the tool answers with did_you_mean, ask the user which
+          city they meant.
+          If no hotels match, politely inform the user.
+        """,
+        tools=[_tool(query_hotels)],  # agent calls query_hotels off the event loop
+        **_model_settings("hotel_agent", TOOL_ANSWER_TEMPLATES),
+    )
 
 
 # Task 8: Add Example Tool for Demonstrations
-example_tool = ExampleTool(
-    [
-        {
-            "input": {
-                "role": "user",
-                "parts": [{"text": "I want to plan a trip to Paris."}],
-            },
-            "output": [
-                {
-                    "role": "flight_agent",
-                    "parts": [
-                        {
-                            "text": "I found flights from New York to Paris on June 10th. The return flight is available on June 15th."
-                        }
-                    ],
-                },
-                {
-                    "role": "hotel_agent",
-                    "parts": [
-                        {
-                            "text": "In Paris, you can stay at Hotel Lumiere for $120 per night or Eiffel Stay for $95 per night."
-                        }
-                    ],
-                },
-                {
-                    "role": "attractions_agent",
-                    "parts": [
-                        {
-                            "text": "Some must-see attractions include the Eiffel Tower, Louvre Museum, and Seine River cruise."
-                        }
-                    ],
-                },
-                {
-                    "role": "root_agent",
-                    "parts": [
-                        {
-                            "text": "Here’s a draft plan: Fly from New York to Paris on June 10th, stay at Hotel Lumiere or Eiffel Stay, and explore the Eiffel Tower, Louvre, and Seine cruise. Your return flight is on June 15th. Would you like me to finalize this plan?"
-                        }
-                    ],
-                },
-            ],
+EXAMPLES = [
+    {
+        "input": {
+            "role": "user",
+            "parts": [{"text": "I want to plan a trip to Paris."}],
         },
-        {
-            "input": {
-                "role": "user",
-                "parts": [{"text": "Can you suggest a hotel near the Eiffel Tower?"}],
+        "output": [
+            {
+                "role": "flight_agent",
+                "parts": [
+                    {
+                        "text": "I found flights from New York to Paris on June 10th. The return flight is available on June 15th."
+                    }
+                ],
             },
-            "output": [
-                {
-                    "role": "hotel_agent",
-                    "parts": [
-                        {
-                            "text": "Eiffel Stay is a great choice—it’s close to the Eiffel Tower, rated 4.0, and priced at $95 per night."
-                        }
-                    ],
-                },
-                {
-                    "role": "root_agent",
-                    "parts": [
-                        {
-                            "text": "I recommend Eiffel Stay since it balances affordability and location. Do you want me to add this to your trip plan?"
-                        }
-                    ],
-                },
-            ],
+            {
+                "role": "hotel_agent",
+                "parts": [
+                    {
+                        "text": "In Paris, you can stay at Hotel Lumiere for $120 per night or Eiffel Stay for $95 per night."
+                    }
+                ],
+            },
+            {
+                "role": "attractions_agent",
+                "parts": [
+                    {
+                        "text": "Some must-see attractions include the Eiffel Tower, Louvre Museum, and Seine River cruise."
+                    }
+                ],
+            },
+            {
+                "role": "root_agent",
+                "parts": [
+                    {
+                        "text": "Here’s a draft plan: Fly from New York to Paris on June 10th, stay at Hotel Lumiere or Eiffel Stay, and explore the Eiffel Tower, Louvre, and Seine cruise. Your return flight is on June 15th. Would you like me to finalize this plan?"
+                    }
+                ],
+            },
+        ],
+    },
+    {
+        "input": {
+            "role": "user",
+            "parts": [{"text": "Can you suggest a hotel near the Eiffel Tower?"}],
         },
-        {
-            "input": {
-                "role": "user",
-                "parts": [{"text": "What can I do on day 2 of my trip?"}],
+        "output": [
+            {
+                "role": "hotel_agent",
+                "parts": [
+                    {
+                        "text": "Eiffel Stay is a great choice—it’s close to the Eiffel Tower, rated 4.0, and priced at $95 per night."
+                    }
+                ],
             },
-            "output": [
-                {
-                    "role": "attractions_agent",
-                    "parts": [
-                        {
-                            "text": "On day 2, you could visit the Louvre Museum in the morning and enjoy a Seine River cruise in the evening."
-                        }
-                    ],
-                },
-                {
-                    "role": "root_agent",
-                    "parts": [
-                        {
-                            "text": "That sounds like a great day! I’ll add Louvre in the morning and a Seine cruise in the evening to your itinerary."
-                        }
-                    ],
-                },
-            ],
+            {
+                "role": "root_agent",
+                "parts": [
+                    {
+                        "text": "I recommend Eiffel Stay since it balances affordability and location. Do you want me to add this to your trip plan?"
+                    }
+                ],
+            },
+        ],
+    },
+    {
+        "input": {
+            "role": "user",
+            "parts": [{"text": "What can I do on day 2 of my trip?"}],
         },
-        {
-            "input": {
-                "role": "user",
-                "parts": [{"text": "Book me a return flight to New York."}],
+        "output": [
+            {
+                "role": "attractions_agent",
+                "parts": [
+                    {
+                        "text": "On day 2, you could visit the Louvre Museum in the morning and enjoy a Seine River cruise in the evening."
+                    }
+                ],
             },
-            "output": [
-                {
-                    "role": "flight_agent",
-                    "parts": [
-                        {
-                            "text": "Your return flight from Paris to New York is scheduled for June 15th at 3:00 PM."
-                        }
-                    ],
-                },
-                {
-                    "role": "root_agent",
-                    "parts": [
-                        {
-                            "text": "Your trip is now confirmed with a return flight on June 15th. Do you want me to summarize the full itinerary?"
-                        }
-                    ],
-                },
-            ],
+            {
+                "role": "root_agent",
+                "parts": [
+                    {
+                        "text": "That sounds like a great day! I’ll add Louvre in the morning and a Seine cruise in the evening to your itinerary."
+                    }
+                ],
+            },
+        ],
+    },
+    {
+        "input": {
+            "role": "user",
+            "parts": [{"text": "Book me a return flight to New York."}],
         },
-        {
-            "input": {
-                "role": "user",
+        "output": [
+            {
+                "role": "flight_agent",
                 "parts": [
                     {
-                        "text": "Plan a full trip to Paris from New York, including flights, hotels, weather, and attractions."
+                        "text": "Your return flight from Paris to New York is scheduled for June 15th at 3:00 PM."
                     }
                 ],
             },
-            "output": [
-                {
-                    "role": "flight_agent",
-                    "parts": [
-                        {
-                            "text": "I found flights from New York to Paris on June 10th. Return flights are available on June 15th."
-                        }
-                    ],
-                },
-                {
-                    "role": "hotel_agent",
-                    "parts": [
-                        {
-                            "text": "For Paris, you can stay at Hotel Lumiere for $120 per night or Eiffel Stay for $95 per night."
-                        }
-                    ],
-                },
-                {
-                    "role": "weather_agent",
-                    "parts": [
-                        {
-                            "text": "The forecast for Paris from June 10 to June 15 is: June 10: Sunny (High: 25°C, Low: 15°C), June 11: Light Rain (High: 22°C, Low: 14°C), June 12: Cloudy (High: 23°C, Low: 16°C), June 13: Sunny (High: 24°C, Low: 15°C), June 14: Partly Cloudy (High: 23°C, Low: 14°C), June 15: Sunny (High: 25°C, Low: 16°C)."
-                        }
-                    ],
-                },
-                {
-                    "role": "attractions_agent",
-                    "parts": [
-                        {
-                            "text": "Suggested attractions include the Eiffel Tower, Louvre Museum, Notre Dame, and a Seine River cruise."
-                        }
-                    ],
-                },
+            {
+                "role": "root_agent",
+                "parts": [
+                    {
+                        "text": "Your trip is now confirmed with a return flight on June 15th. Do you want me to summarize the full itinerary?"
+                    }
+                ],
+            },
+        ],
+    },
+    {
+        "input": {
+            "role": "user",
+            "parts": [
                 {
-                    "role": "root_agent",
-                    "parts": [
-                        {
-                            "text": "Here’s your complete trip plan: Fly from New York to Paris on June 10, stay at Hotel Lumiere or Eiffel Stay, enjoy the attractions and local weather-aware activities, and return to New York on June 15. Do you want me to finalize this itinerary?"
-                        }
-                    ],
-                },
+                    "text": "Plan a full trip to Paris from New York, including flights, hotels, weather, and attractions."
+                }
             ],
         },
-    ]  # type: ignore
-)
+        "output": [
+            {
+                "role": "flight_agent",
+                "parts": [
+                    {
+                        "text": "I found flights from New York to Paris on June 10th. Return flights are available on June 15th."
+                    }
+                ],
+            },
+            {
+                "role": "hotel_agent",
+                "parts": [
+                    {
+                        "text": "For Paris, you can stay at Hotel Lumiere for $120 per night or Eiffel Stay for $95 per night."
+                    }
+                ],
+            },
+            {
+                "role": "weather_agent",
+                "parts": [
+                    {
+                        "text": "The forecast for Paris from June 10 to June 15 is: June 10: Sunny (High: 25°C, Low: 15°C), June 11: Light Rain (High: 22°C, Low: 14°C), June 12: Cloudy (High: 23°C, Low: 16°C), June 13: Sunny (High: 24°C, Low: 15°C), June 14: Partly Cloudy (High: 23°C, Low: 14°C), June 15: Sunny (High: 25°C, Low: 16°C)."
+                    }
+                ],
+            },
+            {
+                "role": "attractions_agent",
+                "parts": [
+                    {
+                        "text": "Suggested attractions include the Eiffel Tower, Louvre Museum, Notre Dame, and a Seine River cruise."
+                    }
+                ],
+            },
+            {
+                "role": "root_agent",
+                "parts": [
+                    {
+                        "text": "Here’s your complete trip plan: Fly from New York to Paris on June 10, stay at Hotel Lumiere or Eiffel Stay, enjoy the attractions and local weather-aware activities, and return to New York on June 15. Do you want me to finalize this itinerary?"
+                    }
+                ],
+            },
+        ],
+    },
+]
+
+
+# Only the examples relevant to the current user message are sent, picked
+# from a BM25 index built once over EXAMPLES.
+def _build_example_tool():
+    from example_store import BM25ExampleProvider, RetrievalExampleTool
+
+    return RetrievalExampleTool(BM25ExampleProvider(EXAMPLES, k=2, token_budget=400))
 
 
 # Task 6: Register the Weather Agent as a Remote Agent
 # --- Remote Agents ---
-weather_agent = RemoteA2aAgent(
-    name="weather_agent",
-    description="Provides weather info for a given city.",
-    agent_card=os.path.join(
-        os.path.dirname(__file__), "agents", "weather_agent", "agent.json"
-    ),
-)
+# Cards resolve through the shared card cache; RemoteAgentWarmer can resolve
+# them and open connections before the first user request. Calls are bounded
+# by a latency-aware timeout, hedging and a circuit breaker, falling back to a
+# cached or mock forecast.
+def _build_weather_agent():
+    from resilience import ResilientRemoteA2aAgent
+
+    return ResilientRemoteA2aAgent(
+        name="weather_agent",
+        description="Provides weather info for a given city.",
+        agent_card=os.path.join(
+            os.path.dirname(__file__), "agents", "weather_agent", "agent.json"
+        ),
+    )
 
 
 # Task 7: Create the Root Agent
 # --- Root Agent ---
-root_agent = Agent(
-    model="gemini-2.5-flash",
-    name="root_agent",
-    instruction="""
-        You are TravelPlannerBot.
-        When the user asks to plan a trip, you should:
-
-        1. Determine the trip details: departure city, arrival city, dates.
-        2. Call flight_agent to find flights.
-        3. Call hotel_agent to find hotels for the destination city and dates.
-        4. Call weather_agent to get weather forecasts for the destination during the trip.
-        5. Call attractions_agent to suggest attractions based on city and weather.
-        
-        Always consolidate results and present a single, coherent plan to the user.
-        Do not ask the user for airport codes; use city names only.
-        Use sub-agent outputs internally; do not require the user to call each agent.
-        Only ask the user clarifying questions if essential information is missing.
-    """,
-    global_instruction="You are TravelPlannerBot, ready to autonomously plan trips using your sub-agents.",
-    sub_agents=[flight_agent, hotel_agent, weather_agent, attractions_agent],
-    tools=[example_tool],
-    generate_content_config=types.GenerateContentConfig(
-        safety_settings=[
-            types.SafetySetting(
-                category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
-                threshold=types.HarmBlockThreshold.OFF,
-            ),
-        ]
-    ),
-)
+def _build_root_agent():
+    from google.adk.agents.llm_agent import Agent
+
+    return Agent(
+        name="root_agent",
+        instruction="""
+            You are TravelPlannerBot.
+            When the user asks to plan a trip, you should:
+
+            1. Determine the trip details: departure city, arrival city, dates.
+            2. Call flight_agent to find flights.
+            3. Call hotel_agent to find hotels for the destination city and dates.
+            4. Call weather_agent to get weather forecasts for the destination during the trip.
+            5. Call attractions_agent to suggest attractions based on city and weather.
+
+            Always consolidate results and present a single, coherent plan to the user.
+            Do not ask the user for airport codes; use city names only.
+            Use sub-agent outputs internally; do not require the user to call each agent.
+            Only ask the user clarifying questions if essential information is missing.
+        """,
+        global_instruction="You are TravelPlannerBot, ready to autonomously plan trips using your sub-agents.",
+        sub_agents=[
+            _get("flight_agent"),
+            _get("hotel_agent"),
+            _get("weather_agent"),
+            _get("attractions_agent"),
+        ],
+        tools=[_get("example_tool")],
+        **_model_settings("root_agent"),
+    )
+
+
+# --- Lazy registry ---
+_DATASET_LOADERS = {
+    "flights_data": _load_flights,
+    "hotels_data": _load_hotels,
+}
+
+_AGENT_BUILDERS = {
+    "attractions_agent": _build_attractions_agent,
+    "flight_agent": _build_flight_agent,
+    "hotel_agent": _build_hotel_agent,
+    "example_tool": _build_example_tool,
+    "weather_agent": _build_weather_agent,
+    "root_agent": _build_root_agent,
+}
+
+
+def _dataset(name):
+    """Returns a dataset, loading it on first use. Assigning the module
+    attribute (e.g. `agent.hotels_data = [...]`) replaces it."""
+    if name not in globals():
+        with _load_lock:
+            if name not in globals():
+                globals()[name] = _DATASET_LOADERS[name]()
+    return globals()[name]
+
+
+def _get(name):
+    """Returns a lazily built module attribute, building it at most once."""
+    if name not in globals():
+        if name in _DATASET_LOADERS:
+            return _dataset(name)
+        with _load_lock:
+            if name not in globals():
+                globals()[name] = _AGENT_BUILDERS[name]()
+    return globals()[name]
+
+
+def __getattr__(name):
+    if name in _DATASET_LOADERS or name in _AGENT_BUILDERS:
+        return _get(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_DATASET_LOADERS) | set(_AGENT_BUILDERS))
@@ -3,12 +3,34 @@ from google.adk import Agent
 from google.genai import types
 import httpx
 import json
+import time
 
 # Task 5: Build Weather Agent
 
 OPENWEATHERMAP_API_KEY = os.getenv("OPENWEATHERMAP_API_KEY")
 BASE_URL = "http://api.openweathermap.org/data/2.5/forecast"
 
+# Upstream forecasts only change every 3 hours; repeated locations are served
+# from memory for this many seconds
+FORECAST_CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+# Beyond this many locations, the entries closest to expiry are dropped first
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("WEATHER_CACHE_MAX_ENTRIES", "1000"))
+_forecast_cache = {}  # location key -> (expires at, OpenWeatherMap payload)
+
+
+# --- Instrumentation hooks ---
+# No-ops here; server.py points them at its /metrics collectors.
+def on_upstream_call(seconds: float, outcome: str):
+    pass
+
+
+def on_cache_lookup(hit: bool):
+    pass
+
+
+def on_forecast_request(location: str):
+    pass
+
 
 # --- Tool Function ---
 async def get_weather(location: str) -> str:
@@ -25,6 +47,59 @@ async def get_weather(location: str) -> str:
     if not OPENWEATHERMAP_API_KEY:
         return "Error: OpenWeatherMap API key is not configured."
 
+    on_forecast_request(location)
+    cached = _forecast_cache.get(forecast_cache_key(location))
+    hit = cached is not None and cached[0] > time.monotonic()
+    on_cache_lookup(hit)
+    if hit:
+        return summarize_forecast(location, cached[1])
+
+    data = await fetch_and_cache(location)
+    if isinstance(data, str):
+        return data  # error message for the model
+    return summarize_forecast(location, data)
+
+
+def forecast_cache_key(location: str) -> str:
+    return location.strip().lower()
+
+
+async def fetch_and_cache(location: str, ttl: float = FORECAST_CACHE_TTL):
+    """
+    Fetches a forecast and caches it for `ttl` seconds.
+
+    Returns the payload, or an error message; on error the cache entry (if
+    any) is left untouched.
+    """
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        data = await _fetch_forecast(location)
+        if isinstance(data, str):
+            return data
+        outcome = "ok"
+    finally:
+        on_upstream_call(time.perf_counter() - start, outcome)
+
+    _forecast_cache[forecast_cache_key(location)] = (time.monotonic() + ttl, data)
+    evict_forecasts()
+    return data
+
+
+def evict_forecasts():
+    """Drops expired forecasts, then the soonest to expire beyond the size cap."""
+    now = time.monotonic()
+    for key, (expires_at, _) in list(_forecast_cache.items()):
+        if expires_at <= now:
+            del _forecast_cache[key]
+    excess = len(_forecast_cache) - FORECAST_CACHE_MAX_ENTRIES
+    if excess > 0:
+        for key in sorted(_forecast_cache, key=lambda k: _forecast_cache[k][0])[:excess]:
+            del _forecast_cache[key]
+
+
+async def _fetch_forecast(location: str):
+    """OpenWeatherMap /forecast payload for a location, or an error message."""
     # Use an asynchronous HTTP client
     async with httpx.AsyncClient() as client:
         # NOTE: OpenWeatherMap free tier only gives 5-day/3-hour forecasts (40 data points).
@@ -46,7 +121,12 @@ async def get_weather(location: str) -> str:
         except json.JSONDecodeError:
             return "Error: Received unreadable response from the weather service."
 
-    # --- Data Processing (Converting 3-hour forecasts to a daily summary) ---
+    return data
+
+
+# --- Data Processing (Converting 3-hour forecasts to a daily summary) ---
+def summarize_forecast(location: str, data: dict) -> str:
+    """Turns an OpenWeatherMap /forecast payload into one line per day."""
     daily_forecasts = {}
 
     for item in data.get("list", []):
@@ -0,0 +1,184 @@
+"""
+Background refresh of forecasts for popular destinations.
+
+OpenWeatherMap publishes a new 5-day/3-hour forecast every 3 hours, so the
+forecasts people ask for most can be fetched once per update and served to
+`get_weather` from a warm cache, instead of an upstream round trip inside
+the trip plan.
+"""
+
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Optional
+
+import agent
+
+logger = logging.getLogger(__name__)
+
+FLIGHTS_JSON_PATH = Path(__file__).parents[2] / "flights_dataset.json"
+
+# Forecasts are updated every 3 hours (00:00, 03:00, ... UTC); refresh a
+# little after each update has been published
+UPDATE_INTERVAL_SECONDS = 3 * 3600
+UPDATE_DELAY_SECONDS = 10 * 60
+
+# A request counts half as much after this long, so recent demand wins over
+# the flight schedule seed
+POPULARITY_HALF_LIFE_SECONDS = 24 * 3600
+
+# Request weights are rebased after this many half-lives, long before
+# 2 ** elapsed overflows a float (about 1024)
+REBASE_AFTER_HALF_LIVES = 32
+
+# Locations tracked; past this (plus a quarter of slack, so pruning is rare)
+# the lowest-scored are dropped
+MAX_TRACKED_LOCATIONS = 1000
+
+
+def arrival_city_counts(path=FLIGHTS_JSON_PATH) -> Counter:
+    """Flights per arrival city: the destinations the planner is asked about."""
+    try:
+        with open(path) as f:
+            flights = json.load(f)
+    except (OSError, json.JSONDecodeError) as e:
+        logger.warning("No popularity seed from %s: %s", path, e)
+        return Counter()
+    return Counter(f["arrival_city"] for f in flights if f.get("arrival_city"))
+
+
+class DestinationPopularity:
+    """
+    Exponentially decayed request counts per location.
+
+    Instead of decaying every score, each request adds a weight that grows
+    by 2 per half-life; ranking by the sums is the same as ranking by the
+    decayed counts. Every REBASE_AFTER_HALF_LIVES the epoch moves to now and
+    the scores are scaled down to match, so weights stay finite.
+    """
+
+    def __init__(
+        self,
+        half_life: float = POPULARITY_HALF_LIFE_SECONDS,
+        max_locations: int = MAX_TRACKED_LOCATIONS,
+    ):
+        self.half_life = half_life
+        self.max_locations = max_locations
+        self._epoch = time.monotonic()
+        self._scores: dict[str, float] = {}
+        self._names: dict[str, str] = {}  # cache key -> spelling to fetch
+
+    def record(self, location: str, weight: float = 1.0):
+        key = agent.forecast_cache_key(location)
+        if not key:
+            return
+        half_lives = (time.monotonic() - self._epoch) / self.half_life
+        if half_lives >= REBASE_AFTER_HALF_LIVES:
+            self._rebase(half_lives)
+            half_lives = 0.0
+        self._scores[key] = self._scores.get(key, 0.0) + weight * 2**half_lives
+        # Fetch with the spelling the model actually uses, so the cache key matches
+        self._names[key] = location.strip()
+        if len(self._scores) > self.max_locations + self.max_locations // 4:
+            self._prune()
+
+    def _rebase(self, half_lives: float):
+        scale = 2**-half_lives
+        self._scores = {key: score * scale for key, score in self._scores.items()}
+        self._epoch += half_lives * self.half_life
+
+    def _prune(self):
+        for key in sorted(self._scores, key=self._scores.get)[: len(self._scores) - self.max_locations]:
+            del self._scores[key]
+            del self._names[key]
+
+    def seed(self, counts: Counter):
+        """Adds a prior, scaled so the most common entry weighs one request."""
+        if counts:
+            top = max(counts.values())
+            for location, count in counts.items():
+                self.record(location, count / top)
+
+    def top(self, n: int) -> list[str]:
+        ranked = sorted(self._scores, key=self._scores.get, reverse=True)
+        return [self._names[key] for key in ranked[:n]]
+
+
+def seconds_until_next_update(now: Optional[float] = None) -> float:
+    """Seconds until the next forecast update has been published."""
+    now = time.time() if now is None else now
+    since_update = (now - UPDATE_DELAY_SECONDS) % UPDATE_INTERVAL_SECONDS
+    return UPDATE_INTERVAL_SECONDS - since_update
+
+
+class ForecastPrefetcher:
+    """
+    Keeps the forecasts of the `top_n` most popular destinations cached.
+
+    Refreshes run at startup and after every forecast update. Upstream calls
+    are made one at a time, spread over `spread_seconds` with jitter, so a
+    refresh never bursts against the API's rate limit. Prefetched entries
+    live until the following refresh has had time to replace them.
+    """
+
+    def __init__(self, top_n: int = 20, spread_seconds: float = 600.0, seed: bool = True):
+        self.top_n = top_n
+        self.spread_seconds = spread_seconds
+        self.popularity = DestinationPopularity()
+        if seed:
+            self.popularity.seed(arrival_city_counts())
+        self.refreshes = 0
+        self.last_refresh_seconds: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def record_request(self, location: str):
+        self.popularity.record(location)
+
+    async def refresh(self) -> dict:
+        """Fetches the current top destinations; returns fetched/failed counts."""
+        locations = self.popularity.top(self.top_n)
+        # Cached until the next refresh has finished, plus a margin
+        ttl = seconds_until_next_update() + self.spread_seconds + UPDATE_DELAY_SECONDS
+        gap = self.spread_seconds / max(len(locations), 1)
+
+        start = time.perf_counter()
+        fetched = failed = 0
+        for i, location in enumerate(locations):
+            if i:
+                await asyncio.sleep(gap * random.uniform(0.5, 1.5))
+            try:
+                result = await agent.fetch_and_cache(location, ttl=ttl)
+            except Exception as e:
+                result = str(e)
+            if isinstance(result, str):
+                failed += 1
+                logger.warning("Prefetch of %s failed: %s", location, result)
+            else:
+                fetched += 1
+
+        agent.evict_forecasts()
+        self.refreshes += 1
+        self.last_refresh_seconds = time.perf_counter() - start
+        return {"fetched": fetched, "failed": failed}
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning("Forecast refresh failed: %s", e)
+            await asyncio.sleep(seconds_until_next_update())
+
+    def start(self):
+        """Counts `get_weather` requests and starts refreshing in the background."""
+        agent.on_forecast_request = self.record_request
+        self._task = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
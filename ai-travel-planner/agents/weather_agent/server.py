@@ -0,0 +1,171 @@
+import json
+import os
+import warnings
+from contextlib import asynccontextmanager
+from pathlib import Path
+
+import grpc
+import uvicorn
+from a2a.grpc import a2a_pb2_grpc
+from a2a.server.apps.jsonrpc.fastapi_app import A2AFastAPIApplication
+from a2a.server.request_handlers.grpc_handler import GrpcHandler
+from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
+from a2a.types import AgentCard, AgentInterface, TransportProtocol
+from a2a.utils.constants import AGENT_CARD_WELL_KNOWN_PATH
+from dotenv import load_dotenv
+from fastapi import Response
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
+from google.adk.auth.credential_service.in_memory_credential_service import (
+    InMemoryCredentialService,
+)
+from google.adk.runners import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+
+warnings.filterwarnings("ignore", category=UserWarning)
+# Before importing agent, which reads OPENWEATHERMAP_API_KEY at import
+load_dotenv()  # loads .env into os.environ
+
+import agent
+from a2a_common.metrics import CONTENT_TYPE, A2AMetrics, InstrumentedRequestHandler, Registry
+from agent import root_agent
+from prefetch import ForecastPrefetcher
+
+# Same port and path as `adk api_server --a2a --port 8001 agents`, so the
+# travel planner's agent.json works against either server
+PORT = int(os.getenv("WEATHER_AGENT_PORT", "8001"))
+GRPC_PORT = int(os.getenv("WEATHER_AGENT_GRPC_PORT", "50052"))
+RPC_PATH = "/a2a/weather_agent"
+
+# Forecasts of the most requested destinations are refreshed in the
+# background (0 turns prefetching off); upstream calls of one refresh are
+# spread over PREFETCH_SPREAD seconds
+PREFETCH_TOP = int(os.getenv("WEATHER_PREFETCH_TOP", "20"))
+PREFETCH_SPREAD = float(os.getenv("WEATHER_PREFETCH_SPREAD", "600"))
+
+
+# --- Agent Card ---
+def load_agent_card():
+    """agent.json, plus the gRPC interface this server adds."""
+    card = AgentCard.model_validate(
+        json.loads((Path(__file__).parent / "agent.json").read_text())
+    )
+    return card.model_copy(
+        update={
+            "preferred_transport": TransportProtocol.jsonrpc,
+            "additional_interfaces": [
+                AgentInterface(transport=TransportProtocol.jsonrpc, url=card.url),
+                AgentInterface(
+                    transport=TransportProtocol.grpc, url=f"localhost:{GRPC_PORT}"
+                ),
+            ],
+        }
+    )
+
+
+agent_card = load_agent_card()
+
+
+def create_grpc_server(request_handler):
+    """Create a gRPC server for the same request handler as the HTTP app."""
+    server = grpc.aio.server()
+    a2a_pb2_grpc.add_A2AServiceServicer_to_server(
+        GrpcHandler(agent_card=agent_card, request_handler=request_handler), server
+    )
+    server.add_insecure_port(f"[::]:{GRPC_PORT}")
+    return server
+
+
+# --- Metrics ---
+def instrument_weather_tool(registry):
+    """Point the tool's hooks at upstream latency and cache hit collectors."""
+    upstream = registry.histogram(
+        "weather_upstream_duration_seconds",
+        "OpenWeatherMap forecast request latency by outcome.",
+        ("outcome",),
+    )
+    cache_lookups = registry.counter(
+        "weather_cache_lookups_total", "Forecast cache lookups by result.", ("result",)
+    )
+    agent.on_upstream_call = lambda seconds, outcome: upstream.observe(seconds, outcome)
+    agent.on_cache_lookup = lambda hit: cache_lookups.inc("hit" if hit else "miss")
+    registry.gauge(
+        "weather_cache_entries",
+        "Locations with a cached forecast.",
+        lambda: len(agent._forecast_cache),
+    )
+
+
+def create_app():
+    """
+    Create the weather agent's A2A application.
+
+    JSON-RPC is served over HTTP at RPC_PATH and gRPC on GRPC_PORT; both
+    transports share one runner, request handler and task store. Prometheus
+    metrics for both are served at /metrics.
+    """
+
+    runner = Runner(
+        app_name=root_agent.name,
+        agent=root_agent,
+        artifact_service=InMemoryArtifactService(),
+        session_service=InMemorySessionService(),
+        credential_service=InMemoryCredentialService(),
+    )
+
+    registry = Registry()
+    request_handler = InstrumentedRequestHandler(
+        agent_executor=A2aAgentExecutor(runner=runner),
+        task_store=InMemoryTaskStore(),
+        metrics=A2AMetrics(registry),
+    )
+    request_handler.register_gauges(registry)
+    instrument_weather_tool(registry)
+
+    prefetcher = None
+    if PREFETCH_TOP > 0 and agent.OPENWEATHERMAP_API_KEY:
+        prefetcher = ForecastPrefetcher(top_n=PREFETCH_TOP, spread_seconds=PREFETCH_SPREAD)
+        registry.gauge(
+            "weather_prefetch_refreshes",
+            "Completed background forecast refreshes.",
+            lambda: prefetcher.refreshes,
+        )
+    elif PREFETCH_TOP > 0:
+        print("⚠️ Forecast prefetching is off: OPENWEATHERMAP_API_KEY is not set")
+
+    @asynccontextmanager
+    async def lifespan(app):
+        grpc_server = create_grpc_server(request_handler)
+        await grpc_server.start()
+        if prefetcher:
+            prefetcher.start()
+        yield
+        if prefetcher:
+            await prefetcher.stop()
+        await grpc_server.stop(grace=1)
+        await runner.close()
+
+    app = A2AFastAPIApplication(
+        agent_card=agent_card, http_handler=request_handler
+    ).build(
+        agent_card_url=RPC_PATH + AGENT_CARD_WELL_KNOWN_PATH,
+        rpc_url=RPC_PATH,
+        lifespan=lifespan,
+    )
+
+    app.add_api_route(
+        "/metrics",
+        lambda: Response(registry.render(), media_type=CONTENT_TYPE),
+        methods=["GET"],
+    )
+    return app
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Weather Agent A2A server...")
+    print(f"📡 Agent Card: http://localhost:{PORT}{RPC_PATH}{AGENT_CARD_WELL_KNOWN_PATH}")
+    print(f"🔗 A2A Endpoint: http://localhost:{PORT}{RPC_PATH}")
+    print(f"⚡ gRPC Endpoint: localhost:{GRPC_PORT}")
+    print(f"📊 Metrics: http://localhost:{PORT}/metrics")
+
+    uvicorn.run(create_app(), host="0.0.0.0", port=PORT, log_level="info")
@@ -0,0 +1,102 @@
+import argparse
+import asyncio
+import statistics
+import time
+import warnings
+
+from dotenv import load_dotenv
+from google.adk.examples import example_util
+
+import agent
+from example_store import estimate_tokens
+
+warnings.filterwarnings("ignore", category=UserWarning)
+load_dotenv()  # loads .env into os.environ
+
+MODEL = "gemini-2.5-flash"
+
+# The queries hard-coded in test.py's entry points, plus the README examples
+QUERIES = [
+    "Suggest three attractions in Paris that are good for photography.",
+    "Show flights from New York to London on 01-01",
+    "Suggest hotels in Paris with at least 4 stars and under $120",
+    "Plan me a 3-day trip to Paris.",
+    "What will the weather be like in Paris next week?",
+]
+
+
+def example_instructions(query):
+    """(static, dynamic) example system-instruction text for a query."""
+    provider = agent.example_tool.examples
+    static = example_util.convert_examples_to_text(provider.examples, MODEL)
+    selected = provider.get_examples(query)
+    dynamic = example_util.convert_examples_to_text(selected, MODEL) if selected else ""
+    return static, dynamic
+
+
+async def measure_online(client, query, examples_text, runs):
+    """Exact prompt tokens and median time-to-first-token for one variant."""
+    from google.genai import types
+
+    config = types.GenerateContentConfig(
+        system_instruction=agent.root_agent.instruction + "\n\n" + examples_text,
+        max_output_tokens=32,
+    )
+    tokens = await client.aio.models.count_tokens(
+        model=MODEL,
+        contents=[config.system_instruction, query],
+    )
+
+    ttfts = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        stream = await client.aio.models.generate_content_stream(
+            model=MODEL, contents=query, config=config
+        )
+        async for _ in stream:
+            ttfts.append(time.perf_counter() - start)
+            break
+    return tokens.total_tokens, statistics.median(ttfts)
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare static ExampleTool examples with BM25-selected examples."
+    )
+    parser.add_argument(
+        "--online",
+        action="store_true",
+        help="count exact tokens and time-to-first-token with the real model",
+    )
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+
+    client = None
+    if args.online:
+        from google.genai import Client
+
+        client = Client()
+
+    print(f"{'query':<45} {'static':>8} {'dynamic':>8} {'saved':>6}")
+    for query in QUERIES:
+        static, dynamic = example_instructions(query)
+        static_tokens, dynamic_tokens = estimate_tokens(static), estimate_tokens(dynamic)
+        line = (
+            f"{query[:44]:<45} {static_tokens:>8} {dynamic_tokens:>8} "
+            f"{1 - dynamic_tokens / static_tokens:>6.0%}"
+        )
+        if client:
+            static_exact, static_ttft = await measure_online(client, query, static, args.runs)
+            dynamic_exact, dynamic_ttft = await measure_online(client, query, dynamic, args.runs)
+            line += (
+                f"  prompt {static_exact}->{dynamic_exact} tokens, "
+                f"TTFT {static_ttft * 1000:.0f}->{dynamic_ttft * 1000:.0f} ms"
+            )
+        print(line)
+
+    if not client:
+        print("\n(estimated example tokens; use --online for exact prompt tokens and TTFT)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
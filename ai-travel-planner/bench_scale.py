@@ -0,0 +1,213 @@
+import argparse
+import gc
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import agent
+import synthetic_data
+
+WEATHER_AGENT_PATH = os.path.join(
+    os.path.dirname(__file__), "agents", "weather_agent", "agent.py"
+)
+
+# Each benchmark: the dataset it runs on and the tool call it times
+BENCHMARKS = {
+    "query_flights": lambda data: agent.query_flights_simple("New York", "London", "01-01"),
+    "query_hotels": lambda data: agent.query_hotels("Paris", 4.0, 300, "06-10", "06-15"),
+    "summarize_forecast": lambda data: weather_agent().summarize_forecast("Paris", data),
+}
+DATASETS = {
+    "query_flights": "flights",
+    "query_hotels": "hotels",
+    "summarize_forecast": "forecast",
+}
+
+
+def weather_agent():
+    """The weather agent module (its folder is not an importable package)."""
+    if "weather_agent_module" not in sys.modules:
+        spec = importlib.util.spec_from_file_location("weather_agent_module", WEATHER_AGENT_PATH)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        sys.modules["weather_agent_module"] = module
+    return sys.modules["weather_agent_module"]
+
+
+def data_file(data_dir, kind, rows, seed):
+    """Path of a generated dataset, generating it on first use."""
+    path = os.path.join(data_dir, f"{kind}_{rows}_seed{seed}.json")
+    if not os.path.exists(path):
+        os.makedirs(data_dir, exist_ok=True)
+        if kind == "forecast":
+            with open(path, "w") as f:
+                json.dump(synthetic_data.generate_forecast(rows, seed), f)
+        else:
+            synthetic_data.write_json_array(
+                path, synthetic_data.GENERATORS[kind](rows, seed)
+            )
+    return path
+
+
+def load(kind, path):
+    """Loads a dataset the way the tools do and installs it in agent.py."""
+    if kind == "flights":
+        agent.FLIGHTS_JSON_PATH = path
+        agent.flights_data = agent._load_flights()
+        return agent.flights_data
+    if kind == "hotels":
+        agent.HOTELS_JSON_PATH = path
+        agent.hotels_data = agent._load_hotels()
+        return agent.hotels_data
+    with open(path) as f:
+        return json.load(f)
+
+
+def traced(func):
+    """(result, seconds, peak traced bytes) of one call."""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed, peak
+
+
+def timings(func, rounds, max_seconds):
+    """Round timings, stopping early once `max_seconds` have been spent."""
+    func()  # warm-up
+    samples = []
+    deadline = time.perf_counter() + max_seconds
+    while len(samples) < rounds and (not samples or time.perf_counter() < deadline):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return {
+        "rounds": len(samples),
+        "min": min(samples),
+        "max": max(samples),
+        "mean": statistics.fmean(samples),
+        "median": statistics.median(samples),
+        "stddev": statistics.stdev(samples) if len(samples) > 1 else 0.0,
+    }
+
+
+def run(args):
+    results = []
+    for name, call in BENCHMARKS.items():
+        if args.only and name not in args.only:
+            continue
+        kind = DATASETS[name]
+        if kind == "forecast":
+            weather_agent()  # import ADK before anything is timed or traced
+        for rows in args.sizes:
+            path = data_file(args.data_dir, kind, rows, args.seed)
+            # Load time without tracing overhead, then peak memory with it
+            start = time.perf_counter()
+            data = load(kind, path)
+            load_seconds = time.perf_counter() - start
+            data = None
+            gc.collect()
+            data, _, load_peak = traced(lambda: load(kind, path))
+
+            _, _, call_peak = traced(lambda: call(data))
+            stats = timings(lambda: call(data), args.rounds, args.max_seconds)
+            result = {
+                "name": name,
+                "rows": rows,
+                "file_bytes": os.path.getsize(path),
+                "load_seconds": load_seconds,
+                "load_peak_bytes": load_peak,
+                "call_peak_bytes": call_peak,
+                **stats,
+            }
+            results.append(result)
+            print(
+                f"{name:<20} {rows:>10,} rows  load {load_seconds:8.3f} s "
+                f"{load_peak / 2**20:8.1f} MiB  call median {stats['median'] * 1000:10.3f} ms "
+                f"peak {call_peak / 2**20:7.1f} MiB  ({stats['rounds']} rounds)"
+            )
+            data = None
+            gc.collect()
+    return results
+
+
+def compare(results, baseline_path, threshold):
+    """Prints median latency and memory changes; returns the regressions."""
+    with open(baseline_path) as f:
+        baseline = {(r["name"], r["rows"]): r for r in json.load(f)["results"]}
+
+    regressions = []
+    print(f"\nCompared with {baseline_path} (threshold {threshold:.0%}):")
+    for result in results:
+        before = baseline.get((result["name"], result["rows"]))
+        if not before:
+            continue
+        for metric in ("median", "load_seconds", "load_peak_bytes", "call_peak_bytes"):
+            if not before[metric]:
+                continue
+            change = result[metric] / before[metric] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  ❌ regression"
+                regressions.append((result["name"], result["rows"], metric, change))
+            print(f"  {result['name']:<20} {result['rows']:>10,} {metric:<16} {change:+7.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Latency, memory and load time of the travel tools on synthetic "
+        "datasets of growing size."
+    )
+    parser.add_argument(
+        "--sizes",
+        nargs="+",
+        type=lambda value: int(float(value)),
+        default=[1_000, 10_000, 100_000],
+        help="rows per dataset, e.g. 1e3 1e5 1e7",
+    )
+    parser.add_argument("--only", nargs="+", choices=list(BENCHMARKS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--rounds", type=int, default=20)
+    parser.add_argument("--max-seconds", type=float, default=5, help="time budget per benchmark")
+    parser.add_argument(
+        "--data-dir",
+        default=os.path.join(tempfile.gettempdir(), "travel_bench_data"),
+        help="where generated datasets are cached",
+    )
+    parser.add_argument("--save", help="write results as a JSON baseline")
+    parser.add_argument("--compare", help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+
+    results = run(args)
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "machine": platform.machine(),
+                    "seed": args.seed,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+        print(f"\n💾 Baseline saved to {args.save}")
+
+    if args.compare and compare(results, args.compare, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
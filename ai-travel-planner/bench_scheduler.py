@@ -0,0 +1,208 @@
+import argparse
+import asyncio
+import random
+import time
+from collections import deque
+
+from google.adk.models.google_llm import Gemini
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+from google.genai.errors import ClientError
+
+from model_scheduler import (
+    BACKGROUND,
+    INTERACTIVE,
+    MAX_RATE_LIMIT_RETRIES,
+    ModelCallScheduler,
+    ScheduledGemini,
+)
+
+MODEL = "gemini-2.5-flash"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+class StubProvider:
+    """
+    Stand-in for the Gemini endpoint.
+
+    Accepts `requests_per_second` calls per sliding second and answers the rest
+    with 429 RESOURCE_EXHAUSTED (1s retry delay). Latency grows with the number
+    of calls in flight, like an overloaded backend.
+    """
+
+    def __init__(self, requests_per_second, base_latency=0.2, latency_per_call=0.02):
+        self.requests_per_second = requests_per_second
+        self.base_latency = base_latency
+        self.latency_per_call = latency_per_call
+        self.accepted = deque()
+        self.in_flight = 0
+        self.rejected = 0
+
+    async def generate_content_async(self, llm_request, stream=False):
+        now = time.monotonic()
+        while self.accepted and now - self.accepted[0] > 1.0:
+            self.accepted.popleft()
+        if len(self.accepted) >= self.requests_per_second:
+            self.rejected += 1
+            raise ClientError(
+                429,
+                {
+                    "error": {
+                        "code": 429,
+                        "status": "RESOURCE_EXHAUSTED",
+                        "details": [
+                            {
+                                "@type": "type.googleapis.com/google.rpc.RetryInfo",
+                                "retryDelay": "1s",
+                            }
+                        ],
+                    }
+                },
+            )
+        self.accepted.append(now)
+
+        self.in_flight += 1
+        try:
+            await asyncio.sleep(self.base_latency + self.latency_per_call * self.in_flight)
+        finally:
+            self.in_flight -= 1
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="ok")]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                total_token_count=300
+            ),
+        )
+
+
+def make_request():
+    return LlmRequest(
+        model=MODEL,
+        contents=[types.Content(role="user", parts=[types.Part(text="x" * 400)])],
+        config=types.GenerateContentConfig(max_output_tokens=200),
+    )
+
+
+async def call_with_backoff(model):
+    """What each agent does on its own today: retry 429s with jittered backoff."""
+    for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+        try:
+            async for _ in model.generate_content_async(make_request()):
+                pass
+            return
+        except ClientError as e:
+            if e.code != 429 or attempt == MAX_RATE_LIMIT_RETRIES:
+                raise
+            await asyncio.sleep(0.1 * 2**attempt * random.uniform(0.5, 1.5))
+
+
+async def call_once(model):
+    async for _ in model.generate_content_async(make_request()):
+        pass
+
+
+async def run(mode, args):
+    provider = StubProvider(args.provider_rps)
+    Gemini.generate_content_async = provider.generate_content_async
+
+    if mode == "scheduled":
+        scheduler = ModelCallScheduler(
+            requests_per_minute=args.scheduler_rps * 60,
+            tokens_per_minute=args.scheduler_rps * 60 * 1000,
+            max_concurrency=args.max_concurrency,
+            # The stub limits per sliding second, not per minute like the
+            # real API, so allow almost no burst on top of the rate
+            burst_seconds=0.1,
+        )
+        interactive_model = ScheduledGemini(scheduler, INTERACTIVE, model=MODEL)
+        background_model = ScheduledGemini(scheduler, BACKGROUND, model=MODEL)
+        call = call_once
+    else:
+        scheduler = None
+        interactive_model = background_model = Gemini(model=MODEL)
+        call = call_with_backoff
+
+    latencies = {INTERACTIVE: [], BACKGROUND: []}
+    failures = {INTERACTIVE: 0, BACKGROUND: 0}
+    deadline = time.monotonic() + args.duration
+
+    async def timed(priority, model):
+        start = time.monotonic()
+        try:
+            await call(model)
+            latencies[priority].append(time.monotonic() - start)
+        except ClientError:
+            failures[priority] += 1
+
+    async def background_worker():
+        # Sub-agent work: back-to-back calls
+        while time.monotonic() < deadline:
+            await timed(BACKGROUND, background_model)
+
+    async def interactive_user():
+        # Root-agent turns: a user message every ~2 seconds
+        while time.monotonic() < deadline:
+            await timed(INTERACTIVE, interactive_model)
+            await asyncio.sleep(random.uniform(1, 3))
+
+    start = time.monotonic()
+    await asyncio.gather(
+        *(background_worker() for _ in range(args.background)),
+        *(interactive_user() for _ in range(args.interactive)),
+    )
+    elapsed = time.monotonic() - start
+
+    done = len(latencies[INTERACTIVE]) + len(latencies[BACKGROUND])
+    print(
+        f"\n{mode}: {done / elapsed:.1f} calls/s, "
+        f"{provider.rejected} provider 429s, "
+        f"{failures[INTERACTIVE] + failures[BACKGROUND]} failed calls"
+    )
+    for priority, values in latencies.items():
+        print(
+            f"  {priority:<12} {len(values):>5} calls  "
+            f"p50={percentile(values, 50) * 1000:7.0f} ms  "
+            f"p95={percentile(values, 95) * 1000:7.0f} ms"
+        )
+    if scheduler:
+        metrics = scheduler.metrics()
+        print(f"  concurrency limit: {metrics['concurrency_limit']:.1f}")
+        for priority, queue_time in metrics["queue_time"].items():
+            print(
+                f"  {priority:<12} queue time p50={queue_time['p50_ms']:.0f} ms "
+                f"p95={queue_time['p95_ms']:.0f} ms"
+            )
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Throughput and fairness of model calls against a rate-limited "
+        "stub model, with and without the model-call scheduler."
+    )
+    parser.add_argument("--provider-rps", type=int, default=20)
+    parser.add_argument(
+        "--scheduler-rps",
+        type=float,
+        default=18,
+        help="rate the scheduler is configured for; set it above --provider-rps "
+        "to see how it reacts to 429s",
+    )
+    parser.add_argument("--max-concurrency", type=int, default=16)
+    parser.add_argument("--background", type=int, default=32, help="busy sub-agent loops")
+    parser.add_argument("--interactive", type=int, default=8, help="interactive users")
+    parser.add_argument("--duration", type=float, default=20)
+    args = parser.parse_args()
+
+    for mode in ("uncoordinated", "scheduled"):
+        await run(mode, args)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
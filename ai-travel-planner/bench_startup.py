@@ -0,0 +1,152 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+# entry point -> (import statement, what it touches in agent.py)
+ENTRY_POINTS = {
+    "cli.py": ("import cli", "root_agent"),
+    "test.py:run_cli_attractions": ("import test", "attractions_agent"),
+    "test.py:run_cli_flights": ("import test", "flight_agent"),
+    "test.py:run_cli_hotels": ("import test", "hotel_agent"),
+    "hotel tool only": ("import agent", "query_hotels"),
+}
+
+IMPORT_CODE = """
+{import_statement}
+import agent
+agent.{attr}
+"""
+
+FIRST_REQUEST_CODE = """
+import asyncio, json, time, warnings
+warnings.filterwarnings("ignore")
+start = time.perf_counter()
+{import_statement}
+import agent
+target = agent.{attr}
+ready = time.perf_counter() - start
+is_tool = callable(target) and not hasattr(target, "sub_agents")
+
+if {offline} and not is_tool:
+    from google.adk.models.google_llm import Gemini
+    from google.adk.models.llm_response import LlmResponse
+    from google.genai import types
+
+    async def canned_response(self, llm_request, stream=False):
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text="OK")])
+        )
+
+    Gemini.generate_content_async = canned_response
+
+
+async def first_request():
+    if is_tool:
+        target("Paris")  # plain tool function, no runner involved
+        return time.perf_counter() - start
+
+    from google.adk.apps.app import App
+    from google.adk.runners import Runner
+    from google.adk.sessions.in_memory_session_service import InMemorySessionService
+    from google.genai import types
+
+    runner = Runner(
+        app=App(name="TravelPlanner", root_agent=target),
+        session_service=InMemorySessionService(),
+    )
+    session = await runner.session_service.create_session(
+        app_name="TravelPlanner", user_id="user_1"
+    )
+    content = types.Content(role="user", parts=[types.Part(text="Hello")])
+    async for event in runner.run_async(
+        user_id=session.user_id, session_id=session.id, new_message=content
+    ):
+        elapsed = time.perf_counter() - start
+        break
+    return elapsed
+
+
+first_event = asyncio.run(first_request())
+print(json.dumps({{"ready": ready, "first_event": first_event}}))
+"""
+
+
+def import_time_ms(import_statement, attr):
+    """Total `python -X importtime` cost of the entry point, in milliseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c",
+         IMPORT_CODE.format(import_statement=import_statement, attr=attr)],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total_us = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line.split("|")
+        # Only top-level imports; nested ones are already in their parent's total
+        if cumulative.strip().isdigit() and not module.startswith("  "):
+            total_us += int(cumulative)
+    return total_us / 1000
+
+
+def first_request(import_statement, attr, offline):
+    """Process start to first runner event (or first tool result)."""
+    start = time.perf_counter()
+    result = subprocess.run(
+        [sys.executable, "-c",
+         FIRST_REQUEST_CODE.format(
+             import_statement=import_statement, attr=attr, offline=offline
+         )],
+        cwd=HERE,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    wall = time.perf_counter() - start
+    timings = json.loads(result.stdout.strip().splitlines()[-1])
+    return wall, timings
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Track import cost and first-request latency of the travel planner entry points."
+    )
+    parser.add_argument(
+        "--online",
+        action="store_true",
+        help="call the real model (needs GOOGLE_API_KEY); default is a canned offline response",
+    )
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    results = {}
+    print(f"{'entry point':<30} {'imports':>10} {'ready':>10} {'1st event':>10} {'wall':>10}")
+    for name, (import_statement, attr) in ENTRY_POINTS.items():
+        imports = import_time_ms(import_statement, attr)
+        wall, timings = first_request(import_statement, attr, not args.online)
+        results[name] = {
+            "import_ms": imports,
+            "ready_ms": timings["ready"] * 1000,
+            "first_event_ms": timings["first_event"] * 1000,
+            "wall_ms": wall * 1000,
+        }
+        print(
+            f"{name:<30} {imports:>8.0f}ms {timings['ready'] * 1000:>8.0f}ms "
+            f"{timings['first_event'] * 1000:>8.0f}ms {wall * 1000:>8.0f}ms"
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import argparse
+import asyncio
+import time
+
+import agent
+from tool_executor import ExecutionPolicy, offload, shutdown_executors
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def probe_loop_lag(interval, lags, stop):
+    """Measures how late a short sleep wakes up, i.e. how long the loop was blocked."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(interval)
+        lags.append(time.perf_counter() - start - interval)
+
+
+async def run_mode(mode, sessions, calls, workers):
+    tool = offload(
+        agent.query_flights_simple,
+        ExecutionPolicy(mode=mode, max_workers=workers, max_queue=sessions * calls),
+    )
+    await tool()  # start pools and load the dataset before measuring
+
+    latencies, lags = [], []
+    stop = asyncio.Event()
+    probe = asyncio.create_task(probe_loop_lag(0.005, lags, stop))
+
+    async def session():
+        for _ in range(calls):
+            start = time.perf_counter()
+            await tool()  # full scan of the flight dataset
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(session() for _ in range(sessions)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await probe
+    shutdown_executors()
+
+    print(
+        f"{mode:<8} loop lag p99={percentile(lags, 99) * 1000:7.1f} ms "
+        f"max={max(lags) * 1000:7.1f} ms  "
+        f"tool p50={percentile(latencies, 50) * 1000:7.1f} ms "
+        f"p99={percentile(latencies, 99) * 1000:7.1f} ms  "
+        f"{sessions * calls / elapsed:6.1f} calls/s"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Event loop lag and tool latency with and without tool offload."
+    )
+    parser.add_argument("--sessions", type=int, default=16)
+    parser.add_argument("--calls", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{args.sessions} concurrent sessions x {args.calls} full flight scans\n")
+    for mode in ("inline", "thread", "process"):
+        await run_mode(mode, args.sessions, args.calls, args.workers)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,78 @@
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+import warnings
+
+import httpx
+from a2a.types import Message, Part, Role, TextPart
+
+from remote_agents import WarmRemoteA2aAgent, card_cache
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+DEFAULT_CARD = os.path.join(
+    os.path.dirname(__file__), "agents", "weather_agent", "agent.json"
+)
+
+
+async def send_first_request(agent, text):
+    """Sends one message through the agent's A2A client and drains the reply."""
+    message = Message(
+        message_id=str(uuid.uuid4()),
+        role=Role.user,
+        parts=[Part(root=TextPart(text=text))],
+    )
+    async for _ in agent._a2a_client.send_message(request=message):
+        pass
+
+
+async def cold_first_request(card_source, text):
+    """Fresh process state: resolve card, connect and send on the user's clock."""
+    card_cache.invalidate(card_source)
+    agent = WarmRemoteA2aAgent(name="bench_agent", agent_card=card_source)
+    start = time.perf_counter()
+    await agent._ensure_resolved()
+    await send_first_request(agent, text)
+    elapsed = time.perf_counter() - start
+    await agent.cleanup()
+    return elapsed
+
+
+async def warm_first_request(card_source, text):
+    """Warmed at startup: only the request itself lands on the user's clock."""
+    card_cache.invalidate(card_source)
+    async with httpx.AsyncClient(timeout=600) as http_client:
+        agent = WarmRemoteA2aAgent(name="bench_agent", agent_card=card_source)
+        await agent.warm_up(http_client)
+        start = time.perf_counter()
+        await send_first_request(agent, text)
+        return time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare cold-start and warm first-request latency to a remote A2A agent."
+    )
+    parser.add_argument("--card", default=DEFAULT_CARD, help="agent card URL or path")
+    parser.add_argument("--text", default="What is the weather in Paris?")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    cold, warm = [], []
+    for _ in range(args.runs):
+        cold.append(await cold_first_request(args.card, args.text))
+        warm.append(await warm_first_request(args.card, args.text))
+
+    print(f"🧊 Cold first request: median {statistics.median(cold) * 1000:.1f} ms")
+    print(f"🔥 Warm first request: median {statistics.median(warm) * 1000:.1f} ms")
+    print(
+        f"⏱️  Saved per first request: "
+        f"{(statistics.median(cold) - statistics.median(warm)) * 1000:.1f} ms"
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
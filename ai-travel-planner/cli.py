@@ -2,17 +2,23 @@ import warnings
 from dotenv import load_dotenv
 import asyncio
 from google.genai import types
+from google.adk.agents.run_config import RunConfig, StreamingMode
 from google.adk.runners import Runner
 from google.adk.sessions.in_memory_session_service import InMemorySessionService
-from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
 from google.adk.auth.credential_service.in_memory_credential_service import (
     InMemoryCredentialService,
 )
 from google.adk.apps.app import App
+
+# Before importing agent: building root_agent reads its settings from the environment
+load_dotenv()  # loads .env into os.environ
+
 from agent import root_agent
+from model_routing import ModelUsagePlugin, model_usage
+from remote_agents import RemoteAgentWarmer
+from trip_plans import ContentAddressedArtifactService, TripPlanPlugin
 
 warnings.filterwarnings("ignore", category=UserWarning)
-load_dotenv()  # loads .env into os.environ
 
 # Suppress ADK experimental warnings
 warnings.filterwarnings("ignore", category=UserWarning, module=r"google\.adk\..*")
@@ -23,16 +29,60 @@ warnings.filterwarnings("ignore", message=r".*non-text parts in the response.*")
 # Task 1: Import Libraries
 
 
+async def read_input(prompt):
+    """Reads a line on a worker thread so the event loop keeps running."""
+    return await asyncio.to_thread(input, prompt)
+
+
+async def print_events(agen):
+    """
+    Prints runner events, rendering partial model text as soon as it arrives.
+
+    With SSE streaming each model turn yields partial chunks followed by one
+    aggregated event holding the full text; the aggregated copy is skipped
+    for an author whose chunks were already printed.
+    """
+    streaming_author = None
+
+    async for event in agen:
+        if not (event.content and event.content.parts):
+            continue
+        text = "".join(part.text for part in event.content.parts if part.text)
+        if not text:
+            continue
+
+        if event.partial:
+            if streaming_author != event.author:
+                if streaming_author:
+                    print()
+                print(f"[{event.author}]: ", end="")
+                streaming_author = event.author
+            print(text, end="", flush=True)
+        elif streaming_author == event.author:
+            print()
+            streaming_author = None
+        else:
+            if streaming_author:
+                print()
+                streaming_author = None
+            print(f"[{event.author}]: {text}")
+
+    if streaming_author:
+        print()
+
+
 # Task 9: Connect CLI with Root Agent
 async def run_cli():
-    artifact_service = InMemoryArtifactService()
+    # Finished plans are kept on disk; follow-ups are answered from them
+    artifact_service = ContentAddressedArtifactService()
+    trip_plans = TripPlanPlugin()
     session_service = InMemorySessionService()
     credential_service = InMemoryCredentialService()
 
     session = await session_service.create_session(
         app_name="TravelPlanner", user_id="user_1"
     )
-    app = App(name="TravelPlanner", root_agent=root_agent)
+    app = App(name="TravelPlanner", root_agent=root_agent, plugins=[trip_plans, ModelUsagePlugin()])
 
     runner = Runner(
         app=app,
@@ -41,27 +91,49 @@ async def run_cli():
         credential_service=credential_service,
     )
 
+    # Resolve remote agent cards and open their connections while the user
+    # is still typing the first request
+    warmer = RemoteAgentWarmer(root_agent)
+    warm_up = asyncio.create_task(warmer.start())
+
     print("Welcome to Travel Planner CLI!")
     print("Type 'exit' to quit.")
 
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE)
+
     while True:
-        user_input = input("[You]: ")
+        user_input = await read_input("[You]: ")
         if user_input.lower() in ["exit", "quit"]:
             break
 
         content = types.Content(role="user", parts=[types.Part(text=user_input)])
         agen = runner.run_async(
-            user_id=session.user_id, session_id=session.id, new_message=content
+            user_id=session.user_id,
+            session_id=session.id,
+            new_message=content,
+            run_config=run_config,
         )
+        await print_events(agen)
 
-        async for event in agen:
-            if event.content and event.content.parts:
-                text = "".join(part.text for part in event.content.parts if part.text)
-                if text:
-                    print(f"[{event.author}]: {text}")
-
+    await warm_up
+    await warmer.stop()
     await runner.close()
 
+    for name, usage in model_usage.summary().items():
+        latency = usage["latency_p50_ms"]
+        print(
+            f"📊 {name} ({usage['model']}): {usage['calls']} model calls, "
+            f"{usage['direct_answers']} direct answers, "
+            f"{usage['prompt_tokens']} in / {usage['output_tokens']} out / "
+            f"{usage['thinking_tokens']} thinking tokens"
+            + (f", p50 {latency:.0f} ms" if latency is not None else "")
+        )
+    if trip_plans.plans_saved or trip_plans.follow_ups_served:
+        print(
+            f"🗂️ Trip plans: {trip_plans.plans_saved} versions saved, "
+            f"{trip_plans.follow_ups_served} follow-ups answered from the plan"
+        )
+
 
 if __name__ == "__main__":
     asyncio.run(run_cli())
@@ -0,0 +1,117 @@
+import math
+import re
+from collections import Counter
+
+from google.adk.examples import example_util
+from google.adk.examples.base_example_provider import BaseExampleProvider
+from google.adk.examples.example import Example
+from google.adk.tools.example_tool import ExampleTool
+from pydantic import TypeAdapter
+
+# Rough chars-per-token ratio used to keep selected examples within budget
+CHARS_PER_TOKEN = 4
+
+_STOPWORDS = {
+    "a", "an", "and", "are", "at", "be", "can", "do", "for", "from", "i", "in",
+    "is", "it", "me", "my", "of", "on", "or", "the", "to", "what", "with", "you",
+}
+
+
+def tokenize(text: str) -> list[str]:
+    return [t for t in re.findall(r"[a-z0-9$]+", text.lower()) if t not in _STOPWORDS]
+
+
+def estimate_tokens(text: str) -> int:
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+class BM25Index:
+    """Okapi BM25 over a fixed list of documents, built once."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.doc_terms = [Counter(tokenize(doc)) for doc in documents]
+        self.doc_lengths = [sum(terms.values()) for terms in self.doc_terms]
+        self.avg_length = sum(self.doc_lengths) / max(1, len(self.doc_lengths))
+
+        document_frequency = Counter()
+        for terms in self.doc_terms:
+            document_frequency.update(terms.keys())
+        n = len(documents)
+        self.idf = {
+            term: math.log(1 + (n - df + 0.5) / (df + 0.5))
+            for term, df in document_frequency.items()
+        }
+
+    def scores(self, query: str) -> list[float]:
+        query_terms = [t for t in tokenize(query) if t in self.idf]
+        results = []
+        for terms, length in zip(self.doc_terms, self.doc_lengths):
+            score = 0.0
+            for term in query_terms:
+                tf = terms.get(term, 0)
+                if tf:
+                    norm = self.k1 * (1 - self.b + self.b * length / self.avg_length)
+                    score += self.idf[term] * tf * (self.k1 + 1) / (tf + norm)
+            results.append(score)
+        return results
+
+
+class BM25ExampleProvider(BaseExampleProvider):
+    """
+    Picks the k few-shot examples most relevant to the user message.
+
+    Examples are indexed once by their user input (weighted double) and the
+    text of their outputs. Only examples with a positive score are returned,
+    best first, until `k` examples or `token_budget` estimated tokens are used.
+    """
+
+    def __init__(self, examples, k: int = 2, token_budget: int = 400):
+        self.examples = TypeAdapter(list[Example]).validate_python(examples)
+        self.k = k
+        self.token_budget = token_budget
+
+        documents = []
+        self.example_tokens = []
+        for example in self.examples:
+            user_text = " ".join(p.text for p in example.input.parts if p.text)
+            output_text = " ".join(
+                p.text for content in example.output for p in content.parts if p.text
+            )
+            documents.append(f"{user_text} {user_text} {output_text}")
+            self.example_tokens.append(
+                estimate_tokens(example_util.convert_examples_to_text([example], None))
+            )
+        self.index = BM25Index(documents)
+
+    def get_examples(self, query: str) -> list[Example]:
+        ranked = sorted(
+            ((score, i) for i, score in enumerate(self.index.scores(query))),
+            reverse=True,
+        )
+        selected, used = [], 0
+        for score, i in ranked:
+            if score <= 0 or len(selected) == self.k:
+                break
+            if used + self.example_tokens[i] > self.token_budget:
+                continue
+            selected.append(self.examples[i])
+            used += self.example_tokens[i]
+        return selected
+
+
+class RetrievalExampleTool(ExampleTool):
+    """ExampleTool that adds nothing to the prompt when no example is relevant."""
+
+    async def process_llm_request(self, *, tool_context, llm_request) -> None:
+        parts = tool_context.user_content.parts
+        if not parts or not parts[0].text:
+            return
+
+        examples = self.examples.get_examples(parts[0].text)
+        if not examples:
+            return
+        llm_request.append_instructions(
+            [example_util.convert_examples_to_text(examples, llm_request.model)]
+        )
@@ -0,0 +1,165 @@
+import argparse
+import asyncio
+import random
+import threading
+import time
+import uuid
+import warnings
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+from google.adk.apps.app import App
+from google.adk.runners import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai import types
+
+from remote_agents import WarmRemoteA2aAgent
+from resilience import ResiliencePolicy, ResilientRemoteA2aAgent
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+STUB_PORT = 8010
+
+
+# --- Stub weather agent with injected faults ---
+def create_stub_app(base_latency, slow_rate, slow_latency, error_rate):
+    app = FastAPI()
+
+    @app.get("/.well-known/agent-card.json")
+    def agent_card():
+        return {
+            "name": "stub_weather_agent",
+            "description": "Weather agent stub with injected latency and errors.",
+            "url": f"http://localhost:{STUB_PORT}/",
+            "version": "1.0.0",
+            "protocolVersion": "0.3.0",
+            "capabilities": {},
+            "defaultInputModes": ["text/plain"],
+            "defaultOutputModes": ["text/plain"],
+            "skills": [],
+        }
+
+    @app.post("/")
+    async def handle_message(request: Request):
+        body = await request.json()
+        roll = random.random()
+        if roll < error_rate:
+            return JSONResponse({"detail": "injected failure"}, status_code=500)
+        if roll < error_rate + slow_rate:
+            await asyncio.sleep(slow_latency)
+        else:
+            await asyncio.sleep(random.expovariate(1 / base_latency))
+        return {
+            "jsonrpc": "2.0",
+            "id": body["id"],
+            "result": {
+                "kind": "message",
+                "messageId": str(uuid.uuid4()),
+                "role": "agent",
+                "parts": [{"kind": "text", "text": "Paris: Sunny (High: 22°C, Low: 14°C)"}],
+            },
+        }
+
+    return app
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def measure(agent, requests, concurrency):
+    """Runs `requests` single-turn sessions against the agent and times them."""
+    runner = Runner(
+        app=App(name="FaultInjection", root_agent=agent),
+        session_service=InMemorySessionService(),
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, degraded = [], 0
+
+    async def one(i):
+        nonlocal degraded
+        async with semaphore:
+            session = await runner.session_service.create_session(
+                app_name="FaultInjection", user_id=f"user_{i}"
+            )
+            content = types.Content(
+                role="user", parts=[types.Part(text="Weather in Paris?")]
+            )
+            start = time.perf_counter()
+            async for event in runner.run_async(
+                user_id=session.user_id, session_id=session.id, new_message=content
+            ):
+                if event.custom_metadata and event.custom_metadata.get("degraded"):
+                    degraded += 1
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies, degraded
+
+
+def report(label, latencies, degraded):
+    print(
+        f"{label:<11} p50={percentile(latencies, 50) * 1000:7.1f} ms  "
+        f"p95={percentile(latencies, 95) * 1000:7.1f} ms  "
+        f"p99={percentile(latencies, 99) * 1000:7.1f} ms  degraded={degraded}"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Fault-injection harness for the resilient weather agent call."
+    )
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument(
+        "--warmup", type=int, default=100, help="unmeasured requests run first"
+    )
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--base-latency", type=float, default=0.05)
+    parser.add_argument("--slow-rate", type=float, default=0.05)
+    parser.add_argument("--slow-latency", type=float, default=5.0)
+    parser.add_argument("--error-rate", type=float, default=0.02)
+    args = parser.parse_args()
+
+    stub = uvicorn.Server(
+        uvicorn.Config(
+            create_stub_app(
+                args.base_latency, args.slow_rate, args.slow_latency, args.error_rate
+            ),
+            port=STUB_PORT,
+            log_level="error",
+        )
+    )
+    threading.Thread(target=stub.run, daemon=True).start()
+    while not stub.started:
+        await asyncio.sleep(0.05)
+
+    card = f"http://localhost:{STUB_PORT}/.well-known/agent-card.json"
+    print(
+        f"💥 Injecting {args.slow_rate:.0%} slow ({args.slow_latency:.1f}s) and "
+        f"{args.error_rate:.0%} failed responses\n"
+    )
+
+    # Warm-up requests let the resilient agent learn p95/p99 before measuring
+    baseline = WarmRemoteA2aAgent(name="weather_agent", agent_card=card)
+    await measure(baseline, args.warmup, args.concurrency)
+    report("baseline", *await measure(baseline, args.requests, args.concurrency))
+    await baseline.cleanup()
+
+    resilient = ResilientRemoteA2aAgent(
+        name="weather_agent",
+        agent_card=card,
+        resilience=ResiliencePolicy(min_timeout=1.0),
+    )
+    await measure(resilient, args.warmup, args.concurrency)
+    report("resilient", *await measure(resilient, args.requests, args.concurrency))
+    print(f"\nhedged requests sent: {resilient.hedges_sent}")
+    await resilient.cleanup()
+
+    stub.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,90 @@
+from array import array
+from datetime import date, datetime
+from itertools import accumulate
+from typing import Optional
+
+# Dates are "MM-DD" in a dummy year, as in the flight dataset
+YEAR = 2025
+NIGHTS_IN_YEAR = (date(YEAR + 1, 1, 1) - date(YEAR, 1, 1)).days
+
+# A check_out before check_in is read as the next year (12-30 to 01-02) when
+# the stay is at most this long; longer ones are taken as swapped dates
+MAX_NEW_YEAR_STAY_NIGHTS = 31
+
+
+def night_index(month_day: str) -> int:
+    """Day-of-year index (0-based) of an "MM-DD" date."""
+    parsed = datetime.strptime(f"{month_day}-{YEAR}", "%m-%d-%Y").date()
+    return (parsed - date(YEAR, 1, 1)).days
+
+
+class RateCalendar:
+    """
+    Nightly rates and availability of one hotel for a year.
+
+    Prefix sums over the nightly rates and over the sold-out nights make
+    every stay query O(1): total price is `price[end] - price[start]` and the
+    stay is available when no sold-out night falls in `[start, end)`. A
+    range ending past the year wraps to its start: rates repeat every year.
+    """
+
+    __slots__ = ("_price_prefix", "_sold_out_prefix")
+
+    def __init__(self, nightly_rates, sold_out_nights):
+        self._price_prefix = array("d", accumulate(nightly_rates, initial=0.0))
+        self._sold_out_prefix = array(
+            "i", accumulate((int(s) for s in sold_out_nights), initial=0)
+        )
+
+    @classmethod
+    def from_rules(cls, base_price: float, rates=(), sold_out=()) -> "RateCalendar":
+        """
+        Expands a hotel's rate rules into a calendar.
+
+        Args:
+            base_price: Rate for every night not covered by `rates`.
+            rates: [{"from": "MM-DD", "to": "MM-DD", "price": float}], inclusive
+              night ranges; later rules override earlier ones.
+            sold_out: [{"from": "MM-DD", "to": "MM-DD"}], inclusive night ranges
+              with no rooms left.
+        """
+        nightly = [float(base_price)] * NIGHTS_IN_YEAR
+        for rule in rates:
+            first, last = night_index(rule["from"]), night_index(rule["to"])
+            nightly[first : last + 1] = [float(rule["price"])] * (last - first + 1)
+
+        closed = [False] * NIGHTS_IN_YEAR
+        for rule in sold_out:
+            first, last = night_index(rule["from"]), night_index(rule["to"])
+            closed[first : last + 1] = [True] * (last - first + 1)
+
+        return cls(nightly, closed)
+
+    def total_price(self, start: int, end: int) -> float:
+        """Total for the nights `start` .. `end - 1`."""
+        if end > NIGHTS_IN_YEAR:
+            return self.total_price(start, NIGHTS_IN_YEAR) + self.total_price(0, end - NIGHTS_IN_YEAR)
+        return self._price_prefix[end] - self._price_prefix[start]
+
+    def is_available(self, start: int, end: int) -> bool:
+        if end > NIGHTS_IN_YEAR:
+            return self.is_available(start, NIGHTS_IN_YEAR) and self.is_available(
+                0, end - NIGHTS_IN_YEAR
+            )
+        return self._sold_out_prefix[end] - self._sold_out_prefix[start] == 0
+
+
+def stay_nights(check_in: str, check_out: str) -> Optional[tuple[int, int]]:
+    """
+    Night range `[start, end)` of a stay, or None if the dates are invalid or
+    out of order. A stay over New Year ends past NIGHTS_IN_YEAR.
+    """
+    try:
+        start, end = night_index(check_in), night_index(check_out)
+    except ValueError:
+        return None
+    if end < start and end + NIGHTS_IN_YEAR - start <= MAX_NEW_YEAR_STAY_NIGHTS:
+        end += NIGHTS_IN_YEAR
+    if end <= start:
+        return None
+    return start, end
@@ -0,0 +1,142 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+# Queries cycled through by the simulated users
+QUERIES = [
+    "Plan me a 3-day trip to Paris.",
+    "What hotels are available in Paris under $120?",
+    "Show me flights from New York to London on 01-01.",
+    "Suggest three attractions in Paris that are good for photography.",
+]
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_session(client, base_url, session_number):
+    """
+    Runs one user session as a streamed `message/stream` call.
+
+    Returns:
+        (total latency, time to first event, final state) for the session.
+    """
+    request = {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/stream",
+        "params": {
+            "message": {
+                "kind": "message",
+                "messageId": str(uuid.uuid4()),
+                "role": "user",
+                "parts": [
+                    {"kind": "text", "text": QUERIES[session_number % len(QUERIES)]}
+                ],
+            }
+        },
+    }
+    # Keyed per user only with TRAVEL_PLANNER_TRUST_USER_HEADER=1 on the server
+    headers = {"X-User-Id": f"load_user_{session_number}"}
+
+    start = time.perf_counter()
+    first_event = None
+    state = "unknown"
+    async with client.stream("POST", base_url, json=request, headers=headers) as response:
+        if response.status_code == 503:
+            return time.perf_counter() - start, None, "rejected"
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            if first_event is None:
+                first_event = time.perf_counter() - start
+            event = json.loads(line[len("data:") :])
+            result = event.get("result", {})
+            if "error" in event:
+                state = "error"
+            elif result.get("kind") == "status-update":
+                state = result["status"]["state"]
+    return time.perf_counter() - start, first_event, state
+
+
+async def run_stage(base_url, concurrency, sessions):
+    """Runs `sessions` sessions with at most `concurrency` of them at once."""
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency)
+
+    async with httpx.AsyncClient(timeout=300, limits=limits) as client:
+
+        async def bounded(session_number):
+            async with semaphore:
+                return await run_session(client, base_url, session_number)
+
+        start = time.perf_counter()
+        results = await asyncio.gather(*(bounded(i) for i in range(sessions)))
+        elapsed = time.perf_counter() - start
+
+    completed = [r for r in results if r[2] == "completed"]
+    latencies = [r[0] for r in completed]
+    first_events = [r[1] for r in completed if r[1] is not None]
+    return {
+        "concurrency": concurrency,
+        "completed": len(completed),
+        "rejected": sum(1 for r in results if r[2] == "rejected"),
+        "failed": len(results) - len(completed) - sum(1 for r in results if r[2] == "rejected"),
+        "sessions_per_second": len(completed) / elapsed,
+        "p50": statistics.median(latencies) if latencies else None,
+        "p95": percentile(latencies, 95) if latencies else None,
+        "first_event_p50": statistics.median(first_events) if first_events else None,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Load test the Travel Planner A2A server (server.py)."
+    )
+    parser.add_argument("--url", default="http://localhost:8002/")
+    parser.add_argument("--p95-target", type=float, default=30.0, help="seconds")
+    parser.add_argument("--sessions-per-stage", type=int, default=16)
+    parser.add_argument("--max-concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    print(f"🏋️ Load testing {args.url} (p95 target {args.p95_target:.1f}s)")
+    best = None
+    concurrency = 1
+    while concurrency <= args.max_concurrency:
+        stage = await run_stage(
+            args.url, concurrency, max(args.sessions_per_stage, concurrency)
+        )
+        p95 = stage["p95"]
+        print(
+            f"  c={stage['concurrency']:<3} "
+            f"{stage['sessions_per_second']:.2f} sessions/s  "
+            f"p50={stage['p50'] or 0:.2f}s p95={p95 or 0:.2f}s "
+            f"first-event p50={stage['first_event_p50'] or 0:.2f}s  "
+            f"ok={stage['completed']} rejected={stage['rejected']} failed={stage['failed']}"
+        )
+        if p95 is None or p95 > args.p95_target:
+            break
+        if best is None or stage["sessions_per_second"] > best["sessions_per_second"]:
+            best = stage
+        concurrency *= 2
+
+    if best:
+        print(
+            f"\n✅ {best['sessions_per_second']:.2f} sessions/s at p95 "
+            f"{best['p95']:.2f}s (concurrency {best['concurrency']})"
+        )
+    else:
+        print("\n❌ p95 target was not met at any concurrency level")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
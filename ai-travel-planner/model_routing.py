@@ -0,0 +1,224 @@
+import statistics
+import time
+from collections import OrderedDict, defaultdict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+# Latency samples kept per agent for percentiles
+LATENCY_WINDOW = 1000
+
+# Model calls awaiting their response; a call that raises never reaches
+# after_model, so the oldest start times are dropped past this
+MAX_PENDING_CALLS = 4096
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """
+    Model and token budget of one agent.
+
+    `max_output_tokens` includes thinking tokens on Gemini 2.5. With
+    `direct_answer`, a turn whose only input is tool results the agent has
+    templates for is answered from those templates instead of the model.
+    """
+
+    model: str = "gemini-2.5-flash"
+    max_output_tokens: Optional[int] = None
+    thinking_budget: Optional[int] = None
+    direct_answer: bool = False
+
+    def generate_content_config(self) -> types.GenerateContentConfig:
+        return types.GenerateContentConfig(
+            max_output_tokens=self.max_output_tokens,
+            safety_settings=[
+                types.SafetySetting(
+                    category=types.HarmCategory.HARM_CATEGORY_DANGEROUS_CONTENT,
+                    threshold=types.HarmBlockThreshold.OFF,
+                ),
+            ],
+        )
+
+    def planner(self):
+        """Thinking budget goes through a planner; ADK rejects it in the config."""
+        if self.thinking_budget is None:
+            return None
+        from google.adk.planners.built_in_planner import BuiltInPlanner
+
+        return BuiltInPlanner(
+            thinking_config=types.ThinkingConfig(thinking_budget=self.thinking_budget)
+        )
+
+
+# --- Direct tool answers ---
+class _Missing(dict):
+    def __missing__(self, key):
+        return "?"
+
+
+def render_tool_result(template: dict, response: dict) -> Optional[str]:
+    """
+    Renders one function response with a template, or None to let the model
+    answer (tool errors, unexpected shapes).
+
+    did_you_mean errors go to the model too: the conversation may already
+    name the city, and then the model calls the tool again instead of asking.
+
+    A template has "row" (formatted per result), optional "header"
+    ({count} results), "empty" and "max_rows"; rows matching a key of
+    "variants" (e.g. "total_price") use that variant's row instead.
+    """
+    if "error" in response:
+        return None
+
+    rows = response.get("result", response)
+    if not isinstance(rows, list) or not all(isinstance(row, dict) for row in rows):
+        return None
+    if not rows:
+        return template["empty"]
+
+    max_rows = template.get("max_rows", len(rows))
+    lines = [template.get("header", "").format(count=len(rows))]
+    for row in rows[:max_rows]:
+        row_template = template["row"]
+        for key, variant in template.get("variants", {}).items():
+            if key in row:
+                row_template = variant
+        lines.append(row_template.format_map(_Missing(row)))
+    if len(rows) > max_rows:
+        lines.append(f"…and {len(rows) - max_rows} more.")
+    return "\n".join(line for line in lines if line)
+
+
+def direct_answer(llm_request, templates: dict) -> Optional[str]:
+    """
+    The templated answer to a turn that only carries tool results, if every
+    result is final. A result the model may follow up with another tool call
+    (an error, an ambiguous city) returns None.
+    """
+    if not llm_request.contents:
+        return None
+    parts = llm_request.contents[-1].parts or []
+    responses = [part.function_response for part in parts if part.function_response]
+    if not responses or len(responses) != len(parts):
+        return None
+
+    answers = []
+    for response in responses:
+        template = templates.get(response.name)
+        if template is None:
+            return None
+        answer = render_tool_result(template, response.response or {})
+        if answer is None:
+            return None
+        answers.append(answer)
+    return "\n\n".join(answers)
+
+
+# --- Usage accounting ---
+class ModelUsage:
+    """Model calls, tokens and latency per agent, plus turns answered directly."""
+
+    def __init__(self):
+        self._agents = defaultdict(
+            lambda: {
+                "model": None,
+                "calls": 0,
+                "errors": 0,
+                "direct_answers": 0,
+                "prompt_tokens": 0,
+                "output_tokens": 0,
+                "thinking_tokens": 0,
+                "latency": deque(maxlen=LATENCY_WINDOW),
+            }
+        )
+        self._started = OrderedDict()  # (invocation id, agent name) -> perf_counter at call
+
+    def started(self, callback_context):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._started[key] = time.perf_counter()
+        self._started.move_to_end(key)
+        while len(self._started) > MAX_PENDING_CALLS:
+            self._started.popitem(last=False)
+
+    def finished(self, callback_context, llm_response, model: Optional[str]):
+        # With SSE streaming the partial chunks come first; count the final one
+        if llm_response.partial:
+            return
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        start = self._started.pop(key, None)
+        stats = self._agents[callback_context.agent_name]
+        stats["model"] = model or stats["model"]
+        stats["calls"] += 1
+        if start is not None:
+            stats["latency"].append(time.perf_counter() - start)
+        usage = llm_response.usage_metadata
+        if usage:
+            stats["prompt_tokens"] += usage.prompt_token_count or 0
+            stats["output_tokens"] += usage.candidates_token_count or 0
+            stats["thinking_tokens"] += usage.thoughts_token_count or 0
+
+    def failed(self, callback_context):
+        key = (callback_context.invocation_id, callback_context.agent_name)
+        self._started.pop(key, None)
+        self._agents[callback_context.agent_name]["errors"] += 1
+
+    def answered_directly(self, callback_context):
+        self._agents[callback_context.agent_name]["direct_answers"] += 1
+
+    def summary(self) -> dict:
+        summary = {}
+        for name, stats in self._agents.items():
+            latency = sorted(stats["latency"])
+            summary[name] = {
+                key: value for key, value in stats.items() if key != "latency"
+            }
+            summary[name]["latency_p50_ms"] = (
+                statistics.median(latency) * 1000 if latency else None
+            )
+            summary[name]["latency_p95_ms"] = (
+                latency[int(0.95 * (len(latency) - 1))] * 1000 if latency else None
+            )
+        return summary
+
+
+model_usage = ModelUsage()
+
+
+class ModelUsagePlugin(BasePlugin):
+    """Counts failed model calls; agent callbacks never see a call that raises."""
+
+    def __init__(self, usage: Optional[ModelUsage] = None):
+        super().__init__(name="model_usage")
+        self.usage = usage or model_usage
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error):
+        self.usage.failed(callback_context)
+        return None  # let the error propagate
+
+
+def model_callbacks(route: ModelRoute, templates: Optional[dict] = None, usage: ModelUsage = model_usage):
+    """
+    before/after model callbacks for an agent on `route`: direct tool answers
+    (when the route allows them) and usage accounting.
+    """
+
+    def before_model(callback_context, llm_request):
+        if route.direct_answer and templates:
+            text = direct_answer(llm_request, templates)
+            if text is not None:
+                usage.answered_directly(callback_context)
+                return LlmResponse(
+                    content=types.Content(role="model", parts=[types.Part(text=text)])
+                )
+        usage.started(callback_context)
+        return None
+
+    def after_model(callback_context, llm_response):
+        usage.finished(callback_context, llm_response, route.model)
+        return None
+
+    return before_model, after_model
@@ -0,0 +1,314 @@
+import asyncio
+import re
+import statistics
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Optional
+
+from google.adk.agents.llm_agent import LlmAgent
+from google.adk.models.google_llm import Gemini
+from google.genai.errors import ClientError
+from pydantic import PrivateAttr
+
+from example_store import estimate_tokens
+
+# Priority classes, served in this order
+INTERACTIVE = "interactive"  # root-agent turns a user is waiting on
+BACKGROUND = "background"  # sub-agent work
+PRIORITIES = (INTERACTIVE, BACKGROUND)
+
+# Output tokens assumed for a call that does not set max_output_tokens
+DEFAULT_OUTPUT_TOKENS = 1024
+
+# Times a call rejected with 429 goes back through the scheduler
+MAX_RATE_LIMIT_RETRIES = 5
+
+
+class TokenBucket:
+    """Refills at `rate` units per second up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.level = capacity
+        self.updated = time.monotonic()
+
+    def _refill(self, now: float):
+        self.level = min(self.capacity, self.level + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, amount: float, now: float) -> float:
+        """Seconds until `amount` units are available (0 if they are now)."""
+        self._refill(now)
+        # A request larger than the bucket would wait forever; let it drain it
+        missing = min(amount, self.capacity) - self.level
+        return max(0.0, missing / self.rate)
+
+    def take(self, amount: float, now: float):
+        self._refill(now)
+        self.level -= min(amount, self.capacity)
+
+    def give_back(self, amount: float):
+        """Returns over-reserved units (negative `amount` charges extra)."""
+        self.level = min(self.capacity, self.level + amount)
+
+    def drain(self, now: float):
+        self._refill(now)
+        self.level = min(self.level, 0.0)
+
+
+class ModelCall:
+    """A granted scheduler slot; reports the call's outcome back."""
+
+    def __init__(self, scheduler: "ModelCallScheduler", tokens: int):
+        self._scheduler = scheduler
+        self.reserved_tokens = tokens
+        self.used_tokens: Optional[int] = None
+        self.latency: Optional[float] = None
+        self.rate_limited = False
+        self.started = time.monotonic()
+
+    def first_response(self):
+        """Marks the first response chunk; its latency drives the concurrency limit."""
+        if self.latency is None:
+            self.latency = time.monotonic() - self.started
+
+    def record_tokens(self, used_tokens: int):
+        self.used_tokens = used_tokens
+
+    def record_rate_limited(self, retry_after: float):
+        self.rate_limited = True
+        self._scheduler._rate_limited(retry_after)
+
+
+class ModelCallScheduler:
+    """
+    Process-wide gate in front of model calls.
+
+    - Token buckets for requests and tokens per minute keep the process under
+      the provider's rate limits instead of discovering them through 429s.
+    - Interactive calls are served before background ones; a background call
+      that has waited `max_background_wait` seconds goes next regardless.
+    - The concurrency limit adapts (AIMD): it grows while time-to-first-response
+      stays within `latency_tolerance` × the best observed, and shrinks when
+      latency degrades or the provider answers 429.
+    - A 429 also pauses dispatch for the provider's retry delay and lowers the
+      request rate by 20%; it creeps back to the configured rate on success.
+    - Queue time per priority class is kept for `metrics()`.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: float,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        burst_seconds: float = 10.0,
+        latency_tolerance: float = 2.0,
+        max_background_wait: float = 10.0,
+    ):
+        self.requests_per_minute = requests_per_minute
+        self._requests = TokenBucket(
+            requests_per_minute / 60, max(1.0, requests_per_minute / 60 * burst_seconds)
+        )
+        self._tokens = TokenBucket(
+            tokens_per_minute / 60, max(1.0, tokens_per_minute / 60 * burst_seconds)
+        )
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.latency_tolerance = latency_tolerance
+        self.max_background_wait = max_background_wait
+
+        self.limit = float(max_concurrency)
+        self.in_flight = 0
+        self._best_latency: Optional[float] = None
+        self._paused_until = 0.0
+        self._wakeup: Optional[asyncio.TimerHandle] = None
+        # Waiting calls per priority: (enqueued at, tokens, future)
+        self._queues = {priority: deque() for priority in PRIORITIES}
+
+        self._queue_times = {priority: deque(maxlen=1000) for priority in PRIORITIES}
+        self._served = dict.fromkeys(PRIORITIES, 0)
+        self._rate_limited_calls = 0
+
+    @asynccontextmanager
+    async def slot(self, priority: str, tokens: int):
+        """Waits for a free slot with request and token budget, then holds it."""
+        enqueued = time.monotonic()
+        future = asyncio.get_running_loop().create_future()
+        self._queues[priority].append((enqueued, tokens, future))
+        self._dispatch()
+        try:
+            call = await future
+        except asyncio.CancelledError:
+            if future.done() and not future.cancelled():
+                # Granted just as the caller gave up; hand the slot back
+                self._finish(future.result())
+            raise
+
+        self._queue_times[priority].append(call.started - enqueued)
+        self._served[priority] += 1
+        try:
+            yield call
+        finally:
+            self._finish(call)
+
+    def _next_queue(self, now: float) -> Optional[deque]:
+        for queue in self._queues.values():
+            while queue and queue[0][2].done():  # drop cancelled waiters
+                queue.popleft()
+
+        interactive, background = self._queues[INTERACTIVE], self._queues[BACKGROUND]
+        if background and now - background[0][0] >= self.max_background_wait:
+            return background
+        return interactive or background or None
+
+    def _dispatch(self):
+        """Grants slots to waiting calls while concurrency and budget allow."""
+        if self._wakeup:
+            self._wakeup.cancel()
+            self._wakeup = None
+
+        while self.in_flight < int(self.limit):
+            now = time.monotonic()
+            queue = self._next_queue(now)
+            if queue is None:
+                return
+
+            _, tokens, future = queue[0]
+            wait = max(
+                self._paused_until - now,
+                self._requests.wait_time(1, now),
+                self._tokens.wait_time(tokens, now),
+            )
+            if wait > 0:
+                self._wakeup = asyncio.get_running_loop().call_later(wait, self._dispatch)
+                return
+
+            queue.popleft()
+            self._requests.take(1, now)
+            self._tokens.take(tokens, now)
+            self.in_flight += 1
+            future.set_result(ModelCall(self, tokens))
+
+    def _finish(self, call: ModelCall):
+        self.in_flight -= 1
+        if call.used_tokens is not None:
+            self._tokens.give_back(call.reserved_tokens - call.used_tokens)
+
+        if call.rate_limited:
+            self.limit = max(self.min_concurrency, self.limit / 2)
+            self._dispatch()
+            return
+
+        configured_rate = self.requests_per_minute / 60
+        self._requests.rate = min(
+            configured_rate, self._requests.rate + configured_rate * 0.002
+        )
+        if call.latency is not None:
+            if self._best_latency is None or call.latency < self._best_latency:
+                self._best_latency = call.latency
+            if call.latency > self._best_latency * self.latency_tolerance:
+                self.limit = max(self.min_concurrency, self.limit * 0.9)
+            else:
+                self.limit = min(self.max_concurrency, self.limit + 1 / self.limit)
+        self._dispatch()
+
+    def _rate_limited(self, retry_after: float):
+        now = time.monotonic()
+        self._rate_limited_calls += 1
+        self._paused_until = max(self._paused_until, now + retry_after)
+        self._requests.drain(now)
+        self._requests.rate *= 0.8
+
+    def metrics(self) -> dict:
+        """Queue depth, queue-time percentiles per priority and current limits."""
+        queue_time = {}
+        for priority, samples in self._queue_times.items():
+            ordered = sorted(samples)
+            queue_time[priority] = {
+                "served": self._served[priority],
+                "queued": sum(not f.done() for _, _, f in self._queues[priority]),
+                "p50_ms": statistics.median(ordered) * 1000 if ordered else 0.0,
+                "p95_ms": (
+                    ordered[int(0.95 * (len(ordered) - 1))] * 1000 if ordered else 0.0
+                ),
+            }
+        return {
+            "concurrency_limit": self.limit,
+            "requests_per_minute": self._requests.rate * 60,
+            "in_flight": self.in_flight,
+            "rate_limited_calls": self._rate_limited_calls,
+            "queue_time": queue_time,
+        }
+
+
+# --- ADK integration ---
+def estimate_request_tokens(llm_request) -> int:
+    """Prompt tokens (chars / 4) plus the output token allowance of a request."""
+    text = []
+    config = llm_request.config
+    if config and isinstance(config.system_instruction, str):
+        text.append(config.system_instruction)
+    for content in llm_request.contents:
+        text.extend(part.text for part in content.parts or [] if part.text)
+    max_output = (config and config.max_output_tokens) or DEFAULT_OUTPUT_TOKENS
+    return estimate_tokens("".join(text)) + max_output
+
+
+def retry_delay(error: ClientError, default: float = 1.0) -> float:
+    """Retry delay the provider suggests in a 429 response (RetryInfo.retryDelay)."""
+    details = error.details if isinstance(error.details, dict) else {}
+    for detail in details.get("error", {}).get("details", []):
+        match = re.fullmatch(r"([\d.]+)s", str(detail.get("retryDelay", "")))
+        if match:
+            return float(match.group(1))
+    return default
+
+
+class ScheduledGemini(Gemini):
+    """Gemini model whose calls go through a shared ModelCallScheduler."""
+
+    _scheduler: ModelCallScheduler = PrivateAttr()
+    _priority: str = PrivateAttr()
+
+    def __init__(self, scheduler: ModelCallScheduler, priority: str, **data):
+        super().__init__(**data)
+        self._scheduler = scheduler
+        self._priority = priority
+
+    async def generate_content_async(self, llm_request, stream=False):
+        tokens = estimate_request_tokens(llm_request)
+        for attempt in range(MAX_RATE_LIMIT_RETRIES + 1):
+            async with self._scheduler.slot(self._priority, tokens) as call:
+                yielded = False
+                try:
+                    async for llm_response in super().generate_content_async(
+                        llm_request, stream=stream
+                    ):
+                        call.first_response()
+                        usage = llm_response.usage_metadata
+                        if usage and usage.total_token_count:
+                            call.record_tokens(usage.total_token_count)
+                        yielded = True
+                        yield llm_response
+                    return
+                except ClientError as e:
+                    # Retry through the queue, so retries wait for the pause
+                    # like every other call instead of piling up
+                    if e.code != 429 or yielded or attempt == MAX_RATE_LIMIT_RETRIES:
+                        raise
+                    call.record_rate_limited(retry_delay(e))
+
+
+def schedule_model_calls(agent, scheduler: ModelCallScheduler, priority: str = INTERACTIVE):
+    """
+    Swaps every model name in the agent tree for a ScheduledGemini.
+
+    `agent` itself gets `priority`; its sub-agents run as background work.
+    """
+    if isinstance(agent, LlmAgent) and isinstance(agent.model, str) and agent.model:
+        agent.model = ScheduledGemini(scheduler, priority, model=agent.model)
+    for sub_agent in agent.sub_agents:
+        schedule_model_calls(sub_agent, scheduler, BACKGROUND)
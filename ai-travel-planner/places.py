@@ -0,0 +1,239 @@
+import re
+import unicodedata
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Iterable, Optional
+
+# Other names people use for a city, by the city's name
+ALIASES = {
+    "New York": ["NYC", "NY", "New York City", "Big Apple", "Manhattan"],
+    "London": ["Londres", "Londra"],
+    "Paris": ["Paname", "City of Light"],
+    "Los Angeles": ["LA"],
+    "San Francisco": ["SF", "San Fran"],
+    "Rome": ["Roma"],
+    "Tokyo": ["Tokio"],
+    "Lisbon": ["Lisboa"],
+    "Munich": ["München", "Muenchen"],
+}
+
+# Airports by IATA code, beyond the ones the flight data already names
+AIRPORTS = {
+    "JFK": "New York", "EWR": "New York", "LGA": "New York",
+    "LHR": "London", "LGW": "London", "STN": "London", "LCY": "London", "LTN": "London",
+    "CDG": "Paris", "ORY": "Paris", "BVA": "Paris",
+    "HND": "Tokyo", "NRT": "Tokyo",
+    "FCO": "Rome", "CIA": "Rome",
+    "LAX": "Los Angeles", "SFO": "San Francisco",
+    "ORD": "Chicago", "MDW": "Chicago",
+    "BER": "Berlin", "AMS": "Amsterdam", "BCN": "Barcelona", "MAD": "Madrid",
+    "LIS": "Lisbon", "IST": "Istanbul", "DXB": "Dubai", "SIN": "Singapore",
+    "SYD": "Sydney", "YYZ": "Toronto", "BKK": "Bangkok", "HKG": "Hong Kong",
+    "MUC": "Munich",
+}
+
+# Fuzzy matches need this trigram similarity, and a runner-up within
+# AMBIGUITY_MARGIN of the best makes the input ambiguous
+MIN_SIMILARITY = 0.45
+AMBIGUITY_MARGIN = 0.1
+
+# Short names share too few trigrams for typos ("Lodnon" vs London scores
+# 0.43), so names up to this length that miss fall back to edit distance,
+# with adjacent transpositions counting as one edit
+EDIT_DISTANCE_MAX_LENGTH = 8
+
+
+def place_key(text: str) -> str:
+    """Lowercase ASCII letters and digits only: "New York" and "NewYork" share a key."""
+    text = unicodedata.normalize("NFKD", text).encode("ascii", "ignore").decode()
+    return re.sub(r"[^a-z0-9]", "", text.lower())
+
+
+def max_edits(key: str) -> int:
+    return 1 if len(key) <= 5 else 2
+
+
+def edit_distance(a: str, b: str, limit: int) -> int:
+    """
+    Optimal string alignment distance (Damerau-Levenshtein without repeated
+    edits of a substring), or `limit + 1` once it is known to exceed `limit`.
+    """
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i] + [0] * len(b)
+        for j, char_b in enumerate(b, 1):
+            current[j] = min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (char_a != char_b),
+            )
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                current[j] = min(current[j], before[j - 2] + 1)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def _trigrams(key: str) -> set[str]:
+    padded = f"  {key} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+@dataclass
+class Resolution:
+    """
+    Outcome of resolving a user-supplied place.
+
+    `spellings` are the dataset's own spellings of the resolved city (rows can
+    be matched with a set lookup); it is empty when the input is ambiguous,
+    in which case `candidates` lists the cities it could mean.
+    """
+
+    query: str
+    city: Optional[str] = None
+    match: str = "none"  # exact, alias, airport, prefix, fuzzy, ambiguous, none
+    spellings: frozenset = frozenset()
+    candidates: list = field(default_factory=list)
+
+    @property
+    def ambiguous(self) -> bool:
+        return self.match == "ambiguous"
+
+
+class PlaceIndex:
+    """
+    Resolves city names, aliases, IATA codes and misspellings to the cities of
+    one dataset, in a single lookup instead of a model retry per spelling.
+
+    Built once per dataset: exact keys go in a dict, and every city and alias
+    key is indexed by trigram for fuzzy lookups.
+    """
+
+    def __init__(self, cities: Iterable[str], airports: Optional[dict] = None):
+        # city key -> spellings used in the dataset; the first one seen is shown
+        self._spellings: dict[str, list[str]] = defaultdict(list)
+        for city in cities:
+            key = place_key(city)
+            if key and city not in self._spellings[key]:
+                self._spellings[key].append(city)
+
+        # lookup key -> (city key, match type)
+        self._lookup: dict[str, tuple[str, str]] = {
+            key: (key, "exact") for key in self._spellings
+        }
+        for city, aliases in ALIASES.items():
+            city_key = place_key(city)
+            if city_key in self._spellings:
+                for alias in aliases:
+                    self._lookup.setdefault(place_key(alias), (city_key, "alias"))
+        for code, city in {**AIRPORTS, **(airports or {})}.items():
+            city_key = place_key(city)
+            if city_key in self._spellings:
+                self._lookup.setdefault(place_key(code), (city_key, "airport"))
+
+        # Airport codes are too short to fuzzy-match usefully
+        self._by_trigram: dict[str, set[str]] = defaultdict(set)
+        for key, (_, match) in self._lookup.items():
+            if match != "airport":
+                for gram in _trigrams(key):
+                    self._by_trigram[gram].add(key)
+
+    @classmethod
+    def from_flights(cls, flights) -> "PlaceIndex":
+        cities, airports = [], {}
+        for flight in flights:
+            for side in ("departure", "arrival"):
+                city = flight.get(f"{side}_city")
+                if city:
+                    cities.append(city)
+                    if flight.get(f"{side}_airport"):
+                        airports[flight[f"{side}_airport"]] = city
+        return cls(cities, airports)
+
+    @classmethod
+    def from_hotels(cls, hotels) -> "PlaceIndex":
+        return cls(hotel["city"] for hotel in hotels if hotel.get("city"))
+
+    def _resolved(self, query, city_key, match) -> Resolution:
+        spellings = self._spellings[city_key]
+        return Resolution(query, spellings[0], match, frozenset(spellings))
+
+    def _ambiguous(self, query, city_keys) -> Resolution:
+        candidates = [self._spellings[k][0] for k in dict.fromkeys(city_keys)]
+        return Resolution(query, match="ambiguous", candidates=candidates)
+
+    def resolve(self, text: str) -> Resolution:
+        """Resolves `text`; "Paris, France" is tried as "Paris" too."""
+        keys = [place_key(text.split(",")[0]), place_key(text)]
+        keys = [key for key in dict.fromkeys(keys) if key]
+
+        for key in keys:
+            if key in self._lookup:
+                return self._resolved(text, *self._lookup[key])
+
+        for key in keys:
+            # "lon" or "Pa" -> London, Paris, as the old substring match allowed
+            prefixed = {
+                city_key
+                for k, (city_key, match) in self._lookup.items()
+                if k.startswith(key) and match != "airport"
+            }
+            if len(prefixed) == 1:
+                return self._resolved(text, prefixed.pop(), "prefix")
+            if prefixed:
+                return self._ambiguous(text, sorted(prefixed))
+
+        for key in keys:
+            resolution = self._fuzzy(text, key)
+            if resolution.match != "none":
+                return resolution
+
+        for key in keys:
+            if 3 <= len(key) <= EDIT_DISTANCE_MAX_LENGTH:
+                resolution = self._nearest(text, key)
+                if resolution.match != "none":
+                    return resolution
+        return Resolution(text)
+
+    def _nearest(self, query: str, key: str) -> Resolution:
+        """Cities within `max_edits(key)` edits; the closest ones tie as ambiguous."""
+        limit = max_edits(key)
+        distances = {}
+        for candidate, (city_key, match) in self._lookup.items():
+            if match == "airport":
+                continue
+            distance = edit_distance(key, candidate, limit)
+            if distance <= limit:
+                distances[city_key] = min(distance, distances.get(city_key, limit))
+        if not distances:
+            return Resolution(query)
+        best = min(distances.values())
+        closest = sorted(k for k, d in distances.items() if d == best)
+        if len(closest) > 1:
+            return self._ambiguous(query, closest)
+        return self._resolved(query, closest[0], "fuzzy")
+
+    def _fuzzy(self, query: str, key: str) -> Resolution:
+        grams = _trigrams(key)
+        shared = defaultdict(int)
+        for gram in grams:
+            for candidate in self._by_trigram.get(gram, ()):
+                shared[candidate] += 1
+
+        # Best Dice similarity per city (a city may match via several aliases)
+        scores = {}
+        for candidate, count in shared.items():
+            score = 2 * count / (len(grams) + len(_trigrams(candidate)))
+            city_key = self._lookup[candidate][0]
+            scores[city_key] = max(score, scores.get(city_key, 0.0))
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)
+        if not ranked or ranked[0][1] < MIN_SIMILARITY:
+            return Resolution(query)
+        close = [k for k, score in ranked if score >= ranked[0][1] - AMBIGUITY_MARGIN]
+        if len(close) > 1:
+            return self._ambiguous(query, close)
+        return self._resolved(query, ranked[0][0], "fuzzy")
@@ -0,0 +1,314 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import httpx
+from a2a.types import AgentCard
+from google.adk import __version__ as adk_version
+from google.adk.agents.remote_a2a_agent import (
+    AGENT_CARD_WELL_KNOWN_PATH,
+    RemoteA2aAgent,
+)
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+# How long a resolved agent card is served without revalidation
+CARD_TTL_SECONDS = 300.0
+
+# How often the warmer re-checks every remote agent in the background
+HEALTH_CHECK_INTERVAL_SECONDS = 30.0
+
+# Cards kept in the cache, least recently used dropped
+MAX_CACHED_CARDS = 256
+
+# RemoteA2aAgent methods WarmRemoteA2aAgent overrides or calls, along with
+# the attributes they set (_agent_card, _a2a_client, _is_resolved,
+# _httpx_client), as of google-adk 1.18. Fail at import rather than silently
+# bypassing the card cache after an upgrade renames them.
+_ADK_INTERNALS = (
+    "_resolve_agent_card",
+    "_ensure_resolved",
+    "_ensure_httpx_client",
+    "_validate_agent_card",
+)
+_missing = [name for name in _ADK_INTERNALS if not callable(getattr(RemoteA2aAgent, name, None))]
+if _missing:
+    raise ImportError(
+        f"remote_agents.py needs RemoteA2aAgent.{', '.join(_missing)}, "
+        f"missing in google-adk {adk_version}; it was written against google-adk 1.18"
+    )
+
+
+# --- Agent Card Cache ---
+@dataclass
+class _CardEntry:
+    card: AgentCard
+    validator: Optional[str]  # ETag for URLs, mtime for files
+    fetched_at: float
+    ttl: float
+
+
+class AgentCardCache:
+    """
+    Process-wide agent card cache shared by the remote agents.
+
+    Cards are served from memory for `ttl` seconds. After that, URL sources are
+    revalidated with `If-None-Match` (a 304 only refreshes the timestamp) and
+    file sources are re-read only when their mtime changed.
+    """
+
+    def __init__(self, ttl: float = CARD_TTL_SECONDS, max_cards: int = MAX_CACHED_CARDS):
+        self.ttl = ttl
+        self.max_cards = max_cards
+        self._entries: OrderedDict[str, _CardEntry] = OrderedDict()
+        # Fetches in progress, so concurrent callers share one; removed when done
+        self._fetches: dict[str, asyncio.Task] = {}
+
+    def _is_fresh(self, entry: Optional[_CardEntry]) -> bool:
+        return entry is not None and time.monotonic() - entry.fetched_at < entry.ttl
+
+    def is_fresh(self, source: str) -> bool:
+        """Whether `source` would be served from memory without revalidation."""
+        return self._is_fresh(self._entries.get(source))
+
+    async def get(
+        self,
+        source: str,
+        http_client: Optional[httpx.AsyncClient] = None,
+        force_revalidate: bool = False,
+    ) -> AgentCard:
+        """
+        Returns the agent card for a URL or file path, fetching it at most once
+        per TTL window even when many callers ask at the same time.
+        """
+        entry = self._entries.get(source)
+        if not force_revalidate and self._is_fresh(entry):
+            self._entries.move_to_end(source)
+            return entry.card
+
+        fetch = self._fetches.get(source)
+        if fetch is None:
+            fetch = asyncio.ensure_future(self._refresh(source, entry, http_client))
+            self._fetches[source] = fetch
+            fetch.add_done_callback(lambda _: self._fetches.pop(source, None))
+        return (await asyncio.shield(fetch)).card
+
+    async def _refresh(self, source, entry, http_client) -> _CardEntry:
+        if source.startswith(("http://", "https://")):
+            entry = await self._fetch_url(source, entry, http_client)
+        else:
+            entry = self._read_file(source, entry)
+        self._entries[source] = entry
+        self._entries.move_to_end(source)
+        while len(self._entries) > self.max_cards:
+            self._entries.popitem(last=False)
+        return entry
+
+    def invalidate(self, source: str):
+        self._entries.pop(source, None)
+
+    async def _fetch_url(self, url, entry, http_client):
+        headers = {}
+        if entry and entry.validator:
+            headers["If-None-Match"] = entry.validator
+
+        if http_client is None:
+            async with httpx.AsyncClient() as client:
+                response = await client.get(url, headers=headers)
+        else:
+            response = await http_client.get(url, headers=headers)
+
+        ttl = self._max_age(response) or self.ttl
+        if response.status_code == 304 and entry:
+            return _CardEntry(entry.card, entry.validator, time.monotonic(), ttl)
+
+        response.raise_for_status()
+        return _CardEntry(
+            card=AgentCard.model_validate(response.json()),
+            validator=response.headers.get("ETag"),
+            fetched_at=time.monotonic(),
+            ttl=ttl,
+        )
+
+    def _read_file(self, path, entry):
+        mtime = str(os.stat(path).st_mtime_ns)
+        if entry and entry.validator == mtime:
+            return _CardEntry(entry.card, mtime, time.monotonic(), self.ttl)
+
+        with open(path, "r", encoding="utf-8") as f:
+            card = AgentCard(**json.load(f))
+        return _CardEntry(card, mtime, time.monotonic(), self.ttl)
+
+    @staticmethod
+    def _max_age(response) -> Optional[float]:
+        for directive in response.headers.get("Cache-Control", "").split(","):
+            name, _, value = directive.strip().partition("=")
+            if name == "max-age" and value.isdigit():
+                return float(value)
+        return None
+
+
+card_cache = AgentCardCache()
+
+
+# --- Warm Remote Agent ---
+class WarmRemoteA2aAgent(RemoteA2aAgent):
+    """
+    RemoteA2aAgent that resolves its card through the shared card cache and
+    can be warmed up and health-checked ahead of the first user request.
+    """
+
+    _healthy: Optional[bool] = PrivateAttr(default=None)
+    _last_check_latency: Optional[float] = PrivateAttr(default=None)
+
+    @property
+    def healthy(self) -> Optional[bool]:
+        """Result of the last health check, or None if never checked."""
+        return self._healthy
+
+    @property
+    def last_check_latency(self) -> Optional[float]:
+        return self._last_check_latency
+
+    async def _resolve_agent_card(self) -> AgentCard:
+        return await card_cache.get(
+            self._agent_card_source, await self._ensure_httpx_client()
+        )
+
+    async def _ensure_resolved(self) -> None:
+        # Resolved agents re-resolve their card once its cache entry expired
+        source = getattr(self, "_agent_card_source", None)
+        if self._is_resolved and source and not card_cache.is_fresh(source):
+            await self.refresh_card()
+        await super()._ensure_resolved()
+
+    async def refresh_card(self) -> bool:
+        """
+        Re-resolves the agent card through the cache and, if it changed,
+        rebuilds the A2A client from it. A failed refresh keeps the old card.
+        """
+        source = getattr(self, "_agent_card_source", None)
+        if not source:
+            return False
+        try:
+            card = await card_cache.get(source, await self._ensure_httpx_client())
+            if card == self._agent_card:
+                return False
+            await self._validate_agent_card(card)
+        except Exception as e:
+            logger.warning("Refreshing the agent card of %s failed: %s", self.name, e)
+            return False
+        logger.info("Agent card of %s changed; reconnecting", self.name)
+        self._agent_card = card
+        self._a2a_client = None
+        self._is_resolved = False
+        return True
+
+    async def warm_up(self, http_client: Optional[httpx.AsyncClient] = None):
+        """
+        Resolves the agent card, creates the A2A client and opens a pooled
+        connection to the remote agent's host.
+
+        Args:
+            http_client: Shared pooled client to use, unless this agent already
+              created its own.
+        """
+        if http_client is not None and self._httpx_client is None:
+            self._httpx_client = http_client
+            self._httpx_client_needs_cleanup = False
+        await self._ensure_resolved()
+        await self.health_check()
+
+    async def health_check(self) -> bool:
+        """Fetches the agent card from the RPC host, keeping its connection warm."""
+        http_client = await self._ensure_httpx_client()
+        card_url = str(self._agent_card.url).rstrip("/") + AGENT_CARD_WELL_KNOWN_PATH
+
+        start = time.perf_counter()
+        try:
+            response = await http_client.get(card_url)
+            healthy = response.status_code == 200
+        except httpx.HTTPError as e:
+            logger.debug("Health check for %s failed: %s", self.name, e)
+            healthy = False
+        self._last_check_latency = time.perf_counter() - start
+
+        if healthy != self._healthy:
+            logger.info(
+                "Remote agent %s is %s", self.name, "up" if healthy else "down"
+            )
+        self._healthy = healthy
+        return healthy
+
+
+def find_remote_agents(agent) -> list[WarmRemoteA2aAgent]:
+    """Collects every warmable remote agent in an agent tree."""
+    found = [agent] if isinstance(agent, WarmRemoteA2aAgent) else []
+    for sub_agent in agent.sub_agents:
+        found.extend(find_remote_agents(sub_agent))
+    return found
+
+
+class RemoteAgentWarmer:
+    """Warms up all remote agents of a tree and health-checks them periodically."""
+
+    def __init__(
+        self,
+        root_agent,
+        health_check_interval: float = HEALTH_CHECK_INTERVAL_SECONDS,
+        timeout: float = 600.0,
+    ):
+        self.remote_agents = find_remote_agents(root_agent)
+        self.health_check_interval = health_check_interval
+        self.timeout = timeout
+        self.warm_up_seconds: Optional[float] = None
+        self._http_client: Optional[httpx.AsyncClient] = None
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self):
+        """Warms every remote agent concurrently, then starts health checks."""
+        self._http_client = httpx.AsyncClient(
+            timeout=httpx.Timeout(timeout=self.timeout),
+            limits=httpx.Limits(max_keepalive_connections=20, keepalive_expiry=60),
+        )
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(agent.warm_up(self._http_client) for agent in self.remote_agents),
+            return_exceptions=True,
+        )
+        self.warm_up_seconds = time.perf_counter() - start
+
+        for agent, result in zip(self.remote_agents, results):
+            if isinstance(result, Exception):
+                logger.warning("Warm-up of %s failed: %s", agent.name, result)
+
+        self._health_task = asyncio.create_task(self._health_check_loop())
+
+    async def _health_check_loop(self):
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for agent in self.remote_agents:
+                if agent._agent_card is None:
+                    # Card never resolved (remote was down at startup); retry
+                    try:
+                        await agent.warm_up(self._http_client)
+                    except Exception as e:
+                        logger.debug("Warm-up retry of %s failed: %s", agent.name, e)
+                else:
+                    await agent.refresh_card()
+                    await agent.health_check()
+
+    async def stop(self):
+        if self._health_task:
+            self._health_task.cancel()
+            self._health_task = None
+        if self._http_client:
+            await self._http_client.aclose()
+            self._http_client = None
@@ -0,0 +1,611 @@
+"""
+Record/replay harness for end-to-end latency regression tests.
+
+`record` runs a scenario live and writes every model call, tool call and
+A2A HTTP exchange to a trace (JSON Lines, gzipped for .gz paths). `replay`
+runs the same turns offline: models answer from the trace, the remote
+agents' HTTP client is served from the trace, and tools run for real (or
+from the trace with --stub-tools). It reports latency and allocations per
+stage, and with --compare exits non-zero on regressions or when the run
+diverges from the trace, so it can gate CI without API keys or servers.
+"""
+
+import argparse
+import asyncio
+import gzip
+import hashlib
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+import warnings
+from collections import defaultdict, deque
+from typing import AsyncGenerator, Optional
+
+import httpx
+from google.adk.apps.app import App
+from google.adk.artifacts.in_memory_artifact_service import InMemoryArtifactService
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.adk.runners import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from google.genai import types
+from pydantic import PrivateAttr
+
+import agent as agents
+from remote_agents import WarmRemoteA2aAgent, find_remote_agents
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+TRACE_VERSION = 1
+
+# Tools that act on the session (agent transfer) rather than return data;
+# they always run, even with --stub-tools
+CONTROL_TOOLS = {"transfer_to_agent", "exit_loop"}
+
+# The queries of test.py, plus a full multi-agent plan
+SCENARIOS = {
+    "attractions": (
+        "attractions_agent",
+        ["Suggest three attractions in Paris that are good for photography."],
+    ),
+    "flights": ("flight_agent", ["Show flights from New York to London on 01-01"]),
+    "hotels": ("hotel_agent", ["Suggest hotels in Paris with at least 4 stars and under $120"]),
+    "trip": (
+        "root_agent",
+        [
+            "Plan a trip from New York to Paris on 01-01, staying until 01-05.",
+            "Summarize the full itinerary.",
+        ],
+    ),
+}
+
+
+class ReplayError(Exception):
+    """The run asked for something the trace does not contain."""
+
+
+# --- Trace ---
+def _open(path, mode):
+    return gzip.open(path, mode + "t") if path.endswith(".gz") else open(path, mode)
+
+
+def fingerprint(value) -> str:
+    """Short hash of a JSON-able value, ignoring per-run ids."""
+
+    def strip_ids(v):
+        if isinstance(v, dict):
+            return {k: strip_ids(x) for k, x in v.items() if k != "id"}
+        if isinstance(v, list):
+            return [strip_ids(x) for x in v]
+        return v
+
+    text = json.dumps(strip_ids(value), sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()[:16]
+
+
+class Trace:
+    """
+    Records of one session, in the order they happened. Each line is one
+    JSON object with a "type": session, turn, model, tool or http.
+    """
+
+    def __init__(self, records: Optional[list] = None):
+        self.records = records or []
+
+    def add(self, record: dict):
+        self.records.append(record)
+
+    def save(self, path):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with _open(path, "w") as f:
+            for record in self.records:
+                f.write(json.dumps(record, separators=(",", ":"), default=str) + "\n")
+
+    @classmethod
+    def load(cls, path) -> "Trace":
+        with _open(path, "r") as f:
+            return cls([json.loads(line) for line in f if line.strip()])
+
+    def of_type(self, record_type) -> list:
+        return [r for r in self.records if r["type"] == record_type]
+
+    @property
+    def session(self) -> dict:
+        return self.of_type("session")[0]
+
+
+# --- Stage timing and allocations ---
+class StageProfiler:
+    """
+    Wall time per stage call, and with `allocations`, the net new memory
+    blocks (sys.getallocatedblocks) and peak traced bytes (tracemalloc) of
+    each call. Stages of one kind may overlap; each call is keyed.
+    """
+
+    def __init__(self, allocations: bool = False):
+        self.allocations = allocations
+        self.seconds = defaultdict(list)
+        self.blocks = defaultdict(list)
+        self.peak_bytes = defaultdict(list)
+        self._open = {}
+
+    def start(self, stage, key=None):
+        if self.allocations:
+            tracemalloc.reset_peak()
+            base = (sys.getallocatedblocks(), tracemalloc.get_traced_memory()[0])
+        else:
+            base = None
+        self._open[(stage, key)] = (time.perf_counter(), base)
+
+    def stop(self, stage, key=None):
+        started = self._open.pop((stage, key), None)
+        if started is None:
+            return
+        start, base = started
+        self.seconds[stage].append(time.perf_counter() - start)
+        if base:
+            self.blocks[stage].append(sys.getallocatedblocks() - base[0])
+            self.peak_bytes[stage].append(max(0, tracemalloc.get_traced_memory()[1] - base[1]))
+
+
+class TracePlugin(BasePlugin):
+    """Records (or, with `stub_tools`, replays) tool calls and times tools and remote agents."""
+
+    def __init__(self, trace: Trace, profiler: StageProfiler, recording: bool, stub_tools=False):
+        super().__init__(name="trace_plugin")
+        self.trace = trace
+        self.profiler = profiler
+        self.recording = recording
+        self.stub_tools = stub_tools
+        self.tool_mismatches = 0
+        # Per tool, in recorded order; parallel calls of different tools may interleave
+        self._tools = defaultdict(deque)
+        for record in trace.of_type("tool") if not recording else []:
+            self._tools[record["tool"]].append(record)
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context):
+        self.profiler.start(f"tool:{tool.name}", tool_context.function_call_id)
+        if self.stub_tools and tool.name not in CONTROL_TOOLS:
+            recorded = self._next_tool(tool.name)
+            result = recorded["result"]
+            return result if isinstance(result, dict) else {"result": result}
+        return None
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result):
+        self.profiler.stop(f"tool:{tool.name}", tool_context.function_call_id)
+        if self.recording:
+            self.trace.add(
+                {
+                    "type": "tool",
+                    "agent": tool_context.agent_name,
+                    "tool": tool.name,
+                    "args": tool_args,
+                    "result": result,
+                    "ms": self.profiler.seconds[f"tool:{tool.name}"][-1] * 1000,
+                }
+            )
+        elif not self.stub_tools or tool.name in CONTROL_TOOLS:
+            recorded = self._next_tool(tool.name)
+            if fingerprint(json.loads(json.dumps(result, default=str))) != fingerprint(recorded["result"]):
+                self.tool_mismatches += 1
+        return None
+
+    def _next_tool(self, name):
+        if not self._tools[name]:
+            raise ReplayError(f"No recorded call of {name} left in the trace")
+        return self._tools[name].popleft()
+
+    async def before_agent_callback(self, *, agent, callback_context):
+        if isinstance(agent, WarmRemoteA2aAgent):
+            self.profiler.start(f"a2a:{agent.name}", callback_context.invocation_id)
+        return None
+
+    async def after_agent_callback(self, *, agent, callback_context):
+        if isinstance(agent, WarmRemoteA2aAgent):
+            self.profiler.stop(f"a2a:{agent.name}", callback_context.invocation_id)
+        return None
+
+
+# --- Models ---
+class RecordingLlm(BaseLlm):
+    """Calls the agent's real model and records each call's request and responses."""
+
+    _inner: BaseLlm = PrivateAttr()
+    _agent_name: str = PrivateAttr()
+    _trace: Trace = PrivateAttr()
+
+    def __init__(self, inner: BaseLlm, agent_name: str, trace: Trace):
+        super().__init__(model=inner.model)
+        self._inner = inner
+        self._agent_name = agent_name
+        self._trace = trace
+
+    async def generate_content_async(self, llm_request, stream=False) -> AsyncGenerator[LlmResponse, None]:
+        # Only time spent waiting on the model counts; the flow runs tools and
+        # transfers while this generator is suspended at `yield`
+        waited = 0.0
+        responses = []
+        start = time.perf_counter()
+        async for response in self._inner.generate_content_async(llm_request, stream):
+            waited += time.perf_counter() - start
+            if not response.partial:
+                responses.append(response.model_dump(mode="json", exclude_none=True))
+            yield response
+            start = time.perf_counter()
+        waited += time.perf_counter() - start
+        self._trace.add(
+            {
+                "type": "model",
+                "agent": self._agent_name,
+                "model": self.model,
+                "key": request_fingerprint(llm_request),
+                "ms": waited * 1000,
+                "responses": responses,
+            }
+        )
+
+
+class ReplayLlm(BaseLlm):
+    """Answers an agent's model calls with its recorded responses, in order."""
+
+    _calls: deque = PrivateAttr()
+    _agent_name: str = PrivateAttr()
+    _profiler: StageProfiler = PrivateAttr()
+    _divergences: list = PrivateAttr()
+
+    def __init__(self, model, agent_name, calls, profiler, divergences):
+        super().__init__(model=model)
+        self._calls = calls
+        self._agent_name = agent_name
+        self._profiler = profiler
+        self._divergences = divergences
+
+    async def generate_content_async(self, llm_request, stream=False) -> AsyncGenerator[LlmResponse, None]:
+        stage = f"model:{self._agent_name}"
+        self._profiler.start(stage, id(llm_request))
+        if not self._calls:
+            raise ReplayError(f"No recorded model call left for {self._agent_name}")
+        call = self._calls.popleft()
+        if request_fingerprint(llm_request) != call["key"]:
+            # The prompt changed (instructions, tools, history); answers are still replayed
+            self._divergences.append(f"{self._agent_name} model request #{call['index']}")
+        responses = [LlmResponse.model_validate(r) for r in call["responses"]]
+        self._profiler.stop(stage, id(llm_request))
+        for response in responses:
+            yield response
+
+
+def request_fingerprint(llm_request) -> str:
+    return fingerprint(
+        {
+            "contents": [c.model_dump(mode="json", exclude_none=True) for c in llm_request.contents],
+            "system": llm_request.config.system_instruction if llm_request.config else None,
+            "tools": sorted(llm_request.tools_dict),
+        }
+    )
+
+
+def _llm_agents(root):
+    if hasattr(root, "canonical_model") and root.model:
+        yield root
+    for sub_agent in root.sub_agents:
+        yield from _llm_agents(sub_agent)
+
+
+def record_model_calls(root, trace: Trace):
+    for llm_agent in _llm_agents(root):
+        llm_agent.model = RecordingLlm(llm_agent.canonical_model, llm_agent.name, trace)
+
+
+def replay_model_calls(root, trace: Trace, profiler: StageProfiler, divergences: list):
+    calls = defaultdict(deque)
+    for index, call in enumerate(trace.of_type("model")):
+        calls[call["agent"]].append({**call, "index": index})
+    for llm_agent in _llm_agents(root):
+        model = llm_agent.model if isinstance(llm_agent.model, str) else llm_agent.model.model
+        llm_agent.model = ReplayLlm(model, llm_agent.name, calls[llm_agent.name], profiler, divergences)
+
+
+# --- A2A HTTP exchanges ---
+def exchange_key(request: httpx.Request) -> str:
+    """Method, path and JSON-RPC method; request ids differ on every run."""
+    rpc_method = ""
+    if request.method == "POST":
+        try:
+            rpc_method = json.loads(request.content).get("method", "")
+        except (ValueError, AttributeError, httpx.RequestNotRead):
+            pass
+    return f"{request.method} {request.url.path} {rpc_method}".strip()
+
+
+class RecordingTransport(httpx.AsyncBaseTransport):
+    def __init__(self, trace: Trace):
+        self.trace = trace
+        self.inner = httpx.AsyncHTTPTransport()
+
+    async def handle_async_request(self, request):
+        record = {"type": "http", "key": exchange_key(request), "url": str(request.url)}
+        start = time.perf_counter()
+        try:
+            response = await self.inner.handle_async_request(request)
+            body = await response.aread()
+        except httpx.TransportError as e:
+            record.update(ms=(time.perf_counter() - start) * 1000, error=type(e).__name__, message=str(e))
+            self.trace.add(record)
+            raise
+        content_type = response.headers.get("content-type", "")
+        record.update(
+            ms=(time.perf_counter() - start) * 1000,
+            status=response.status_code,
+            content_type=content_type,
+            body=body.decode("utf-8", "replace"),
+        )
+        self.trace.add(record)
+        return httpx.Response(
+            response.status_code, headers={"content-type": content_type}, content=body
+        )
+
+    async def aclose(self):
+        await self.inner.aclose()
+
+
+class ReplayTransport(httpx.AsyncBaseTransport):
+    """Serves recorded exchanges per key in recorded order; no network."""
+
+    def __init__(self, trace: Trace, divergences: list):
+        self.divergences = divergences
+        self.exchanges = defaultdict(deque)
+        for record in trace.of_type("http"):
+            self.exchanges[record["key"]].append(record)
+
+    async def handle_async_request(self, request):
+        key = exchange_key(request)
+        if not self.exchanges[key]:
+            self.divergences.append(f"unrecorded HTTP exchange {key}")
+            raise httpx.ConnectError(f"No recorded exchange for {key}", request=request)
+        record = self.exchanges[key].popleft()
+        if "error" in record:
+            error = getattr(httpx, record["error"], httpx.TransportError)
+            raise error(record["message"], request=request)
+        return httpx.Response(
+            record["status"],
+            headers={"content-type": record["content_type"]},
+            content=record["body"].encode(),
+        )
+
+
+def route_remote_agents(root, transport):
+    """Points every remote agent's HTTP client at `transport`."""
+    client = httpx.AsyncClient(transport=transport, timeout=httpx.Timeout(600))
+    for remote in find_remote_agents(root):
+        remote._httpx_client = client
+        remote._httpx_client_needs_cleanup = False
+    return client
+
+
+# --- Sessions ---
+async def run_turns(root, queries, plugin, profiler, verbose=False) -> list:
+    """Runs the queries as turns of one session; returns each turn's final text."""
+    runner = Runner(
+        app=App(name="TravelPlanner", root_agent=root, plugins=[plugin]),
+        artifact_service=InMemoryArtifactService(),
+        session_service=InMemorySessionService(),
+    )
+    session = await runner.session_service.create_session(
+        app_name="TravelPlanner", user_id="replay"
+    )
+    finals = []
+    for index, query in enumerate(queries):
+        content = types.Content(role="user", parts=[types.Part(text=query)])
+        final = ""
+        profiler.start("turn", index)
+        async for event in runner.run_async(
+            user_id=session.user_id, session_id=session.id, new_message=content
+        ):
+            if event.content and event.content.parts and not event.partial:
+                text = "".join(part.text for part in event.content.parts if part.text)
+                if text:
+                    final = text
+                    if verbose:
+                        print(f"[{event.author}]: {text}")
+        profiler.stop("turn", index)
+        finals.append(final)
+    await runner.close()
+    return finals
+
+
+async def record(args):
+    agent_name, queries = (args.agent, args.query) if args.query else SCENARIOS[args.scenario]
+    root = getattr(agents, agent_name)
+    trace = Trace()
+    trace.add(
+        {
+            "type": "session",
+            "version": TRACE_VERSION,
+            "agent": agent_name,
+            "queries": queries,
+            "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+    )
+    record_model_calls(root, trace)
+    client = route_remote_agents(root, RecordingTransport(trace))
+    profiler = StageProfiler()
+    finals = await run_turns(root, queries, TracePlugin(trace, profiler, recording=True), profiler, verbose=True)
+    await client.aclose()
+
+    for index, (query, final) in enumerate(zip(queries, finals)):
+        trace.add(
+            {"type": "turn", "query": query, "final": final, "ms": profiler.seconds["turn"][index] * 1000}
+        )
+    trace.save(args.trace)
+    counts = {t: len(trace.of_type(t)) for t in ("model", "tool", "http")}
+    print(f"\n💾 Trace saved to {args.trace}: {counts['model']} model calls, "
+          f"{counts['tool']} tool calls, {counts['http']} HTTP exchanges")
+
+
+async def replay_once(trace, profiler, stub_tools):
+    """One offline run of the trace; returns its divergences from the recording."""
+    session = trace.session
+    # Fresh agents each round, so replayed models and clients do not carry over
+    for name in list(agents._AGENT_BUILDERS):
+        agents.__dict__.pop(name, None)
+    root = getattr(agents, session["agent"])
+
+    divergences = []
+    replay_model_calls(root, trace, profiler, divergences)
+    client = route_remote_agents(root, ReplayTransport(trace, divergences))
+    plugin = TracePlugin(trace, profiler, recording=False, stub_tools=stub_tools)
+    try:
+        finals = await run_turns(root, session["queries"], plugin, profiler)
+    finally:
+        await client.aclose()
+
+    if plugin.tool_mismatches:
+        divergences.append(f"{plugin.tool_mismatches} tool result(s) differ from the trace")
+    for turn, final in zip(trace.of_type("turn"), finals):
+        if final != turn["final"]:
+            divergences.append(f"final answer to {turn['query']!r} differs")
+    return divergences
+
+
+def stage_report(profiler, rounds, traced, trace):
+    """Per-stage calls, p50 and per-round total; orchestration is what remains of a turn."""
+    recorded = defaultdict(float)
+    for record in trace.records:
+        if record["type"] in ("model", "tool"):
+            name = record["agent"] if record["type"] == "model" else record["tool"]
+            recorded[f"{record['type']}:{name}"] += record["ms"] / 1000
+    recorded["turn"] = sum(t["ms"] for t in trace.of_type("turn")) / 1000
+
+    report = {}
+    for stage, samples in profiler.seconds.items():
+        report[stage] = {
+            "calls": len(samples) / rounds,
+            "p50_ms": statistics.median(samples) * 1000,
+            "total_ms": sum(samples) / rounds * 1000,
+            "recorded_ms": recorded.get(stage, 0) * 1000 or None,
+            "net_blocks": statistics.median(traced.blocks[stage]) if traced.blocks[stage] else None,
+            "peak_kib": max(traced.peak_bytes[stage]) / 1024 if traced.peak_bytes[stage] else None,
+        }
+    staged = sum(row["total_ms"] for stage, row in report.items() if stage != "turn")
+    if "turn" in report:
+        report["orchestration"] = {
+            "calls": report["turn"]["calls"],
+            "p50_ms": None,
+            "total_ms": max(0.0, report["turn"]["total_ms"] - staged),
+            "recorded_ms": None,
+            "net_blocks": None,
+            "peak_kib": None,
+        }
+    return report
+
+
+def _fmt(value, spec):
+    return format(value, spec) if value is not None else "-".rjust(int(spec.split(".")[0] or 0))
+
+
+async def replay(args):
+    trace = Trace.load(args.trace)
+    if trace.session.get("version") != TRACE_VERSION:
+        sys.exit(f"❌ Unsupported trace version {trace.session.get('version')}")
+
+    # Timed rounds without tracing, then one traced round for allocations.
+    # Divergences of every round count: a flaky one may show up in one only.
+    profiler = StageProfiler()
+    divergences = defaultdict(int)  # divergence -> rounds it occurred in
+    for _ in range(args.rounds):
+        for divergence in dict.fromkeys(await replay_once(trace, profiler, args.stub_tools)):
+            divergences[divergence] += 1
+    tracemalloc.start()
+    traced = StageProfiler(allocations=True)
+    try:
+        traced_divergences = await replay_once(trace, traced, args.stub_tools)
+    finally:
+        tracemalloc.stop()
+    for divergence in dict.fromkeys(traced_divergences):
+        divergences[divergence] += 1
+
+    report = stage_report(profiler, args.rounds, traced, trace)
+    print(f"🔁 Replayed {args.trace} ({args.rounds} rounds, tools {'stubbed' if args.stub_tools else 'live'})\n")
+    print(f"{'stage':<32} {'calls':>6} {'p50 ms':>9} {'total ms':>10} {'recorded ms':>12} {'net blocks':>11} {'peak KiB':>9}")
+    for stage, row in sorted(report.items()):
+        print(
+            f"{stage:<32} {row['calls']:>6g} {_fmt(row['p50_ms'], '9.3f')} {row['total_ms']:>10.3f} "
+            f"{_fmt(row['recorded_ms'], '12.1f')} {_fmt(row['net_blocks'], '11.0f')} {_fmt(row['peak_kib'], '9.1f')}"
+        )
+
+    failed = False
+    if divergences:
+        failed = True
+        print("\n⚠️ Replay diverged from the trace:")
+        for divergence, rounds in divergences.items():
+            print(f"  - {divergence} ({rounds} of {args.rounds + 1} rounds)")
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(
+                {"python": platform.python_version(), "machine": platform.machine(), "stages": report},
+                f,
+                indent=2,
+            )
+        print(f"\n💾 Baseline saved to {args.save}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["stages"]
+        print(f"\nCompared with {args.compare} (threshold {args.threshold:.0%}, min {args.min_ms} ms):")
+        for stage, row in sorted(report.items()):
+            before = baseline.get(stage)
+            if not before:
+                continue
+            for metric in ("total_ms", "peak_kib"):
+                if not before.get(metric) or row[metric] is None:
+                    continue
+                change = row[metric] / before[metric] - 1
+                flag = ""
+                small = metric == "total_ms" and row[metric] - before[metric] < args.min_ms
+                if change > args.threshold and not small:
+                    flag = "  ❌ regression"
+                    failed = True
+                print(f"  {stage:<32} {metric:<9} {change:+7.1%}{flag}")
+
+    if failed:
+        sys.exit(1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    rec = commands.add_parser("record", help="run a scenario live and save its trace")
+    rec.add_argument("trace", help="trace path (.jsonl or .jsonl.gz)")
+    rec.add_argument("--scenario", choices=list(SCENARIOS), default="trip")
+    rec.add_argument("--agent", default="root_agent", help="agent for --query")
+    rec.add_argument("--query", nargs="+", help="turns to record instead of a scenario")
+
+    rep = commands.add_parser("replay", help="replay a trace offline and report per-stage cost")
+    rep.add_argument("trace")
+    rep.add_argument("--rounds", type=int, default=5)
+    rep.add_argument("--stub-tools", action="store_true", help="answer tools from the trace too")
+    rep.add_argument("--save", help="write the stage report as a JSON baseline")
+    rep.add_argument("--compare", help="baseline JSON to compare against")
+    rep.add_argument("--threshold", type=float, default=0.2)
+    rep.add_argument("--min-ms", type=float, default=1.0, help="ignore latency changes below this")
+    args = parser.parse_args()
+
+    if args.command == "record":
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        asyncio.run(record(args))
+    else:
+        asyncio.run(replay(args))
+
+
+if __name__ == "__main__":
+    main()
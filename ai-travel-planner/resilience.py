@@ -0,0 +1,324 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Optional
+
+from google.adk.events.event import Event
+from google.genai import types
+from pydantic import PrivateAttr
+
+from places import ALIASES, place_key
+from remote_agents import WarmRemoteA2aAgent
+
+logger = logging.getLogger(__name__)
+
+# "weather in Paris", "trip from New York to Tokyo on 06-10": the place is
+# the words after the last of these, up to punctuation or a STOP_WORD
+_PLACE_AFTER = re.compile(
+    r"\b(?:in|to|for|at)\s+(?=([^\W\d_][\w'-]*(?:\s+[^\W\d_][\w'-]*){0,2}))", re.IGNORECASE
+)
+STOP_WORDS = {
+    "a", "an", "the", "my", "our", "this", "that", "next", "on", "from", "in", "to",
+    "for", "at", "and", "with", "during", "between", "until", "tomorrow", "today",
+    "please", "week", "weekend", "january", "february", "march", "april", "may", "june",
+    "july", "august", "september", "october", "november", "december",
+}
+
+# Alias keys ("nyc", "londres") to the key of the city they name
+_ALIAS_KEYS = {
+    place_key(alias): place_key(city) for city, aliases in ALIASES.items() for alias in aliases
+}
+
+
+def location_key(text: str) -> Optional[str]:
+    """Normalized key of the place a weather request is about, if one is named."""
+    for match in reversed(list(_PLACE_AFTER.finditer(text))):
+        words = []
+        for word in match.group(1).split():
+            if word.lower() in STOP_WORDS:
+                break
+            words.append(word)
+        key = place_key(" ".join(words))
+        if key:
+            return _ALIAS_KEYS.get(key, key)
+    return None
+
+
+class RemoteAgentError(Exception):
+    """Raised when a remote agent attempt returns an error event."""
+
+
+@dataclass
+class ResiliencePolicy:
+    """Tuning knobs for ResilientRemoteA2aAgent."""
+
+    # Timeout is `timeout_multiplier` x observed p99, clamped to these bounds
+    min_timeout: float = 5.0
+    max_timeout: float = 60.0
+    timeout_multiplier: float = 2.0
+    default_timeout: float = 30.0  # until enough latency samples exist
+
+    # A duplicate request is sent once the first one outlives the observed p95
+    hedging: bool = True
+    min_hedge_delay: float = 0.05
+
+    # Circuit breaker
+    failure_threshold: int = 5
+    reset_timeout: float = 30.0
+
+    # Latency samples needed before percentiles are trusted
+    min_samples: int = 20
+
+    # Last good forecasts kept for degraded answers, by location
+    max_cached_forecasts: int = 256
+
+
+# --- Latency tracking ---
+class LatencyTracker:
+    """
+    Rolling window of request latencies, one per attempt. Timed-out calls
+    count as the timeout, so slow periods push the percentiles up.
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.samples = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float):
+        self.samples.append(seconds)
+
+    def percentile(self, pct: float) -> Optional[float]:
+        """Nearest-rank percentile, or None while the window is too small."""
+        if len(self.samples) < self.min_samples:
+            return None
+        ordered = sorted(self.samples)
+        index = max(0, min(len(ordered) - 1, math.ceil(pct / 100 * len(ordered)) - 1))
+        return ordered[index]
+
+
+# --- Circuit breaker ---
+class CircuitBreaker:
+    """
+    Classic closed / open / half-open breaker.
+
+    After `failure_threshold` consecutive failures the breaker opens and calls
+    fail fast. Once `reset_timeout` has passed, a single trial call is let
+    through; its outcome closes or re-opens the breaker.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+
+    def allow_request(self) -> bool:
+        if self.state == self.CLOSED:
+            return True
+        if self.state == self.OPEN and (
+            time.monotonic() - self.opened_at >= self.reset_timeout
+        ):
+            self.state = self.HALF_OPEN
+            return True
+        # Open, or half-open with the trial call already in flight
+        return False
+
+    def record_success(self):
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        if (
+            self.state == self.HALF_OPEN
+            or self.consecutive_failures >= self.failure_threshold
+        ):
+            if self.state != self.OPEN:
+                logger.warning("Circuit opened after %d failures", self.consecutive_failures)
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+
+# --- Resilient remote agent ---
+class ResilientRemoteA2aAgent(WarmRemoteA2aAgent):
+    """
+    Remote agent call with bounded tail latency.
+
+    Each call gets a latency-aware timeout, a hedged duplicate request once
+    the observed p95 has passed, and a circuit breaker. When the remote agent
+    fails, times out or the breaker is open, a degraded answer is returned:
+    the last good forecast for the same location, or a plain statement that
+    no forecast is available.
+    """
+
+    _policy: ResiliencePolicy = PrivateAttr()
+    _breaker: CircuitBreaker = PrivateAttr()
+    _latency: LatencyTracker = PrivateAttr()
+    _last_good: OrderedDict = PrivateAttr(default_factory=OrderedDict)  # LRU
+    _hedges_sent: int = PrivateAttr(default=0)
+
+    def __init__(self, *args, resilience: Optional[ResiliencePolicy] = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._policy = resilience or ResiliencePolicy()
+        self._breaker = CircuitBreaker(
+            self._policy.failure_threshold, self._policy.reset_timeout
+        )
+        self._latency = LatencyTracker(min_samples=self._policy.min_samples)
+
+    @property
+    def breaker(self) -> CircuitBreaker:
+        return self._breaker
+
+    @property
+    def hedges_sent(self) -> int:
+        return self._hedges_sent
+
+    def current_timeout(self) -> float:
+        p99 = self._latency.percentile(99)
+        if p99 is None:
+            return self._policy.default_timeout
+        return min(
+            self._policy.max_timeout,
+            max(self._policy.min_timeout, p99 * self._policy.timeout_multiplier),
+        )
+
+    def current_hedge_delay(self) -> Optional[float]:
+        if not self._policy.hedging:
+            return None
+        p95 = self._latency.percentile(95)
+        if p95 is None:
+            return None
+        return max(self._policy.min_hedge_delay, p95)
+
+    async def _attempt(self, ctx) -> tuple[list[Event], float]:
+        """
+        Runs one remote request to completion, raising on error events.
+        Returns its events and how long this attempt took.
+        """
+        start = time.perf_counter()
+        events = []
+        async for event in super()._run_async_impl(ctx):
+            if event.error_message:
+                raise RemoteAgentError(event.error_message)
+            events.append(event)
+        return events, time.perf_counter() - start
+
+    async def _hedged_call(self, ctx) -> list[Event]:
+        start = time.perf_counter()
+        timeout = self.current_timeout()
+        hedge_delay = self.current_hedge_delay()
+
+        started = {asyncio.create_task(self._attempt(ctx)): start}
+        pending = set(started)
+        last_error: Exception = TimeoutError(
+            f"{self.name} did not answer within {timeout:.1f}s"
+        )
+        try:
+            if hedge_delay is not None and hedge_delay < timeout:
+                done, _ = await asyncio.wait(pending, timeout=hedge_delay)
+                if not done:
+                    self._hedges_sent += 1
+                    hedge = asyncio.create_task(self._attempt(ctx))
+                    started[hedge] = time.perf_counter()
+                    pending.add(hedge)
+
+            while pending:
+                remaining = timeout - (time.perf_counter() - start)
+                if remaining <= 0:
+                    break
+                done, pending = await asyncio.wait(
+                    pending, timeout=remaining, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    if task.exception() is None:
+                        events, elapsed = task.result()
+                        self._latency.record(elapsed)
+                        # A slower attempt still running takes at least this long
+                        now = time.perf_counter()
+                        for other in pending:
+                            self._latency.record(now - started[other])
+                        return events
+                    last_error = task.exception()
+            if pending:
+                # Timed out: count it as the timeout, not as a missing sample
+                self._latency.record(timeout)
+            raise last_error
+        finally:
+            for task in pending:
+                task.cancel()
+
+    def _location_key(self, ctx) -> Optional[str]:
+        """
+        Place named in the message sent to the remote agent: the session
+        events since its last reply, as RemoteA2aAgent builds it.
+        """
+        texts = []
+        for event in reversed(ctx.session.events):
+            if event.author == self.name:
+                break
+            if event.content and event.content.parts:
+                texts.append("".join(part.text or "" for part in event.content.parts))
+        return location_key(" ".join(reversed(texts)))
+
+    def _remember(self, key: Optional[str], text: str):
+        if key is None:
+            return
+        self._last_good[key] = text
+        self._last_good.move_to_end(key)
+        while len(self._last_good) > self._policy.max_cached_forecasts:
+            self._last_good.popitem(last=False)
+
+    def _fallback_event(self, ctx, reason: str) -> Event:
+        key = self._location_key(ctx)
+        cached = self._last_good.get(key) if key else None
+        if cached:
+            self._last_good.move_to_end(key)
+            text = f"(Live forecast unavailable: {reason}. Showing the last known forecast.)\n{cached}"
+        else:
+            text = (
+                f"No weather forecast is available right now ({reason}). "
+                "Plan without one or try again later."
+            )
+        return Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            branch=ctx.branch,
+            content=types.Content(role="model", parts=[types.Part(text=text)]),
+            custom_metadata={"degraded": True, "degraded_reason": reason},
+        )
+
+    async def _run_async_impl(self, ctx):
+        if not self._breaker.allow_request():
+            yield self._fallback_event(ctx, "circuit breaker is open")
+            return
+
+        try:
+            events = await self._hedged_call(ctx)
+        except Exception as e:
+            logger.warning("Remote agent %s failed: %s", self.name, e)
+            self._breaker.record_failure()
+            yield self._fallback_event(ctx, str(e) or type(e).__name__)
+            return
+
+        self._breaker.record_success()
+        text = "".join(
+            part.text
+            for event in events
+            if event.content and event.content.parts
+            for part in event.content.parts
+            if part.text
+        )
+        if text:
+            self._remember(self._location_key(ctx), text)
+        for event in events:
+            yield event
+
@@ -0,0 +1,352 @@
+import asyncio
+import logging
+import os
+import warnings
+from contextlib import asynccontextmanager
+
+import httpx
+import uvicorn
+from a2a.auth.user import User
+from a2a.server.apps.jsonrpc.fastapi_app import A2AFastAPIApplication
+from a2a.server.apps.jsonrpc.jsonrpc_app import DefaultCallContextBuilder
+from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler
+from a2a.server.tasks.base_push_notification_sender import (
+    BasePushNotificationSender,
+)
+from a2a.server.tasks.inmemory_push_notification_config_store import (
+    InMemoryPushNotificationConfigStore,
+)
+from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    AgentSkill,
+    InvalidParamsError,
+    TaskState,
+)
+from a2a.utils.errors import ServerError
+from dotenv import load_dotenv
+from google.adk.a2a.converters.request_converter import (
+    convert_a2a_request_to_agent_run_request,
+)
+from google.adk.a2a.executor.a2a_agent_executor import (
+    A2aAgentExecutor,
+    A2aAgentExecutorConfig,
+)
+from google.adk.agents.run_config import StreamingMode
+from google.adk.apps.app import App
+from google.adk.auth.credential_service.in_memory_credential_service import (
+    InMemoryCredentialService,
+)
+from google.adk.runners import Runner
+from google.adk.sessions.in_memory_session_service import InMemorySessionService
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse
+
+# Before importing agent: building root_agent reads its settings from the environment
+load_dotenv()  # loads .env into os.environ
+
+from a2a_common.webhooks import WebhookNotAllowed, WebhookPolicy, check_webhook_url
+from agent import root_agent
+from model_routing import ModelUsagePlugin, model_usage
+from model_scheduler import ModelCallScheduler, schedule_model_calls
+from remote_agents import RemoteAgentWarmer
+from trip_plans import ContentAddressedArtifactService, TripPlanPlugin
+
+warnings.filterwarnings("ignore", category=UserWarning)
+
+logger = logging.getLogger(__name__)
+
+PORT = int(os.getenv("TRAVEL_PLANNER_PORT", "8002"))
+
+# Bearer tokens mapped to user ids on the server ("token1:alice,token2:bob").
+# Requests with a known token get that user's ADK sessions; an unknown token
+# is rejected, and without one every A2A context is an anonymous user of its own.
+API_TOKENS = dict(
+    entry.strip().split(":", 1)
+    for entry in os.getenv("TRAVEL_PLANNER_API_TOKENS", "").split(",")
+    if ":" in entry
+)
+
+# Only behind a proxy that authenticates callers and sets this header itself:
+# with TRAVEL_PLANNER_TRUST_USER_HEADER=1 requests without a token are keyed
+# on it. Anyone reaching the server directly could claim any user id.
+USER_ID_HEADER = "X-User-Id"
+TRUST_USER_HEADER = os.getenv("TRAVEL_PLANNER_TRUST_USER_HEADER") == "1"
+
+# Admission control: JSON-RPC calls (including open SSE streams) allowed in
+# flight at once. Anything beyond this is rejected with 503 instead of queued.
+MAX_IN_FLIGHT_REQUESTS = int(os.getenv("TRAVEL_PLANNER_MAX_IN_FLIGHT", "64"))
+
+# Model calls allowed in flight at once across all sessions and agents; the
+# scheduler adapts the actual limit below this to the observed latency.
+MAX_CONCURRENT_MODEL_CALLS = int(os.getenv("TRAVEL_PLANNER_MAX_MODEL_CALLS", "8"))
+
+# Provider rate limits shared by every model call of the process
+MODEL_REQUESTS_PER_MINUTE = float(os.getenv("TRAVEL_PLANNER_MODEL_RPM", "1000"))
+MODEL_TOKENS_PER_MINUTE = float(os.getenv("TRAVEL_PLANNER_MODEL_TPM", "1000000"))
+
+# Webhooks only go to public addresses, plus the hosts listed in
+# TRAVEL_PLANNER_WEBHOOK_ALLOWED_HOSTS (e.g. "localhost:9002" for submit_plan.py);
+# TRAVEL_PLANNER_WEBHOOK_ALLOW_PRIVATE=1 accepts any host, for trusted networks only
+WEBHOOK_POLICY = WebhookPolicy.from_env("TRAVEL_PLANNER")
+
+# Trip plans executed at once. Accepted tasks wait in `submitted` state for a
+# free worker, so non-blocking callers get their answer right away.
+PLAN_WORKERS = int(os.getenv("TRAVEL_PLANNER_WORKERS", "16"))
+
+
+# --- Agent Card ---
+trip_planning_skill = AgentSkill(
+    id="plan_trip",
+    name="Trip Planning",
+    description="Plans trips with flights, hotels, weather forecasts and attractions.",
+    tags=["travel", "flights", "hotels", "weather", "attractions"],
+    examples=[
+        "Plan me a 3-day trip to Paris.",
+        "Show me flights from New York to London on 01-01.",
+    ],
+)
+
+agent_card = AgentCard(
+    name="TravelPlanner",
+    description="Multi-agent travel planner that coordinates flight, hotel, weather and attractions agents.",
+    url=f"http://localhost:{PORT}",
+    version="1.0.0",
+    protocol_version="0.3.0",
+    skills=[trip_planning_skill],
+    default_input_modes=["text/plain"],
+    default_output_modes=["text/plain"],
+    capabilities=AgentCapabilities(streaming=True, push_notifications=True),
+)
+
+
+# --- Per-user sessions ---
+class TokenUser(User):
+    """A2A user authenticated by a bearer token from API_TOKENS."""
+
+    def __init__(self, user_name: str):
+        self._user_name = user_name
+
+    @property
+    def is_authenticated(self) -> bool:
+        return True
+
+    @property
+    def user_name(self) -> str:
+        return self._user_name
+
+
+class HeaderUser(TokenUser):
+    """A2A user named by a trusted proxy's `X-User-Id` header; not verified here."""
+
+    @property
+    def is_authenticated(self) -> bool:
+        return False
+
+
+class PerUserCallContextBuilder(DefaultCallContextBuilder):
+    """Attaches the calling user so ADK keys sessions by (user, context)."""
+
+    def __init__(self, tokens: dict = API_TOKENS, trust_user_header: bool = TRUST_USER_HEADER):
+        self.tokens = tokens
+        self.trust_user_header = trust_user_header
+
+    def build(self, request):
+        context = super().build(request)
+        scheme, _, token = request.headers.get("Authorization", "").partition(" ")
+        if scheme.lower() == "bearer" and token:
+            user_id = self.tokens.get(token.strip())
+            if user_id is None:
+                raise HTTPException(status_code=401, detail="Unknown bearer token")
+            context.user = TokenUser(user_id)
+        elif self.trust_user_header and request.headers.get(USER_ID_HEADER):
+            context.user = HeaderUser(request.headers[USER_ID_HEADER])
+        return context
+
+
+def streaming_request_converter(request, part_converter):
+    """Runs every request with SSE model streaming so partial text is forwarded."""
+    run_request = convert_a2a_request_to_agent_run_request(request, part_converter)
+    run_request.run_config.streaming_mode = StreamingMode.SSE
+    return run_request
+
+
+# --- Background execution and push notifications ---
+class QueuedA2aAgentExecutor(A2aAgentExecutor):
+    """
+    A2aAgentExecutor that runs at most `workers` agent runs at once.
+
+    `execute` publishes the `submitted` status before running the agent, so a
+    non-blocking `message/send` returns as soon as the task is queued.
+    """
+
+    def __init__(self, *, workers: int, **kwargs):
+        super().__init__(**kwargs)
+        self._workers = asyncio.Semaphore(workers)
+
+    async def _handle_request(self, context, event_queue):
+        async with self._workers:
+            await super()._handle_request(context, event_queue)
+
+
+class CheckedPushNotificationConfigStore(InMemoryPushNotificationConfigStore):
+    """Rejects webhook URLs WEBHOOK_POLICY does not allow when they are registered."""
+
+    def __init__(self, policy: WebhookPolicy = WEBHOOK_POLICY):
+        super().__init__()
+        self.policy = policy
+
+    async def set_info(self, task_id, notification_config):
+        try:
+            await check_webhook_url(notification_config.url, self.policy)
+        except WebhookNotAllowed as e:
+            raise ServerError(error=InvalidParamsError(message=str(e))) from None
+        await super().set_info(task_id, notification_config)
+
+
+class FinalResultPushNotificationSender(BasePushNotificationSender):
+    """
+    Notifies a task's webhook only once the task has finished, re-checking
+    the URL first: its host may resolve elsewhere than when it was registered.
+    """
+
+    def __init__(self, httpx_client, config_store, policy: WebhookPolicy = WEBHOOK_POLICY):
+        super().__init__(httpx_client, config_store)
+        self.policy = policy
+
+    FINAL_STATES = {
+        TaskState.completed,
+        TaskState.failed,
+        TaskState.canceled,
+        TaskState.rejected,
+        TaskState.input_required,
+        TaskState.auth_required,
+    }
+
+    async def send_notification(self, task):
+        if task.status.state in self.FINAL_STATES:
+            await super().send_notification(task)
+
+    async def _dispatch_notification(self, task, push_info) -> bool:
+        try:
+            await check_webhook_url(push_info.url, self.policy)
+        except WebhookNotAllowed as e:
+            logger.warning("Not notifying task %s: %s", task.id, e)
+            return False
+        return await super()._dispatch_notification(task, push_info)
+
+
+# --- Admission control ---
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that bounds the number of JSON-RPC calls in flight.
+
+    A call stays in flight until its response (or SSE stream) has been fully
+    sent, so long-running streams count against the limit for their lifetime.
+    """
+
+    def __init__(self, app, max_in_flight: int):
+        self.app = app
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        if self.in_flight >= self.max_in_flight:
+            response = JSONResponse(
+                {
+                    "jsonrpc": "2.0",
+                    "id": None,
+                    "error": {"code": -32000, "message": "Server busy, retry later"},
+                },
+                status_code=503,
+                headers={"Retry-After": "1"},
+            )
+            await response(scope, receive, send)
+            return
+
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+
+
+def create_app():
+    """Create the A2A application serving root_agent to many concurrent users."""
+
+    # Root-agent turns are interactive, sub-agent calls background work
+    scheduler = ModelCallScheduler(
+        requests_per_minute=MODEL_REQUESTS_PER_MINUTE,
+        tokens_per_minute=MODEL_TOKENS_PER_MINUTE,
+        max_concurrency=MAX_CONCURRENT_MODEL_CALLS,
+    )
+    schedule_model_calls(root_agent, scheduler)
+
+    # One runner shared by every session; sessions are isolated per user id.
+    # Each session's plan is kept on disk and answers its follow-ups.
+    runner = Runner(
+        app=App(name="TravelPlanner", root_agent=root_agent, plugins=[TripPlanPlugin(), ModelUsagePlugin()]),
+        artifact_service=ContentAddressedArtifactService(),
+        session_service=InMemorySessionService(),
+        credential_service=InMemoryCredentialService(),
+    )
+
+    executor = QueuedA2aAgentExecutor(
+        workers=PLAN_WORKERS,
+        runner=runner,
+        config=A2aAgentExecutorConfig(request_converter=streaming_request_converter),
+    )
+
+    # Webhooks registered with `message/send` (blocking: false) or
+    # tasks/pushNotificationConfig/set get the finished task POSTed to them
+    webhook_client = httpx.AsyncClient(timeout=10)
+    push_config_store = CheckedPushNotificationConfigStore()
+    request_handler = DefaultRequestHandler(
+        agent_executor=executor,
+        task_store=InMemoryTaskStore(),
+        push_config_store=push_config_store,
+        push_sender=FinalResultPushNotificationSender(webhook_client, push_config_store),
+    )
+
+    warmer = RemoteAgentWarmer(root_agent)
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Resolve remote agent cards and open pooled connections before the
+        # first request; health checks keep running in the background
+        await warmer.start()
+        yield
+        await warmer.stop()
+        await runner.close()
+        await webhook_client.aclose()
+
+    app = A2AFastAPIApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+        context_builder=PerUserCallContextBuilder(),
+    ).build(lifespan=lifespan)
+    app.add_middleware(AdmissionControlMiddleware, max_in_flight=MAX_IN_FLIGHT_REQUESTS)
+    # Per-agent model calls, tokens, latency and direct tool answers
+    app.add_api_route(
+        "/model-usage", lambda: JSONResponse(model_usage.summary()), methods=["GET"]
+    )
+    # Model call queue depth, queue time per priority and current limits
+    app.add_api_route(
+        "/scheduler", lambda: JSONResponse(scheduler.metrics()), methods=["GET"]
+    )
+    return app
+
+
+if __name__ == "__main__":
+    print("🚀 Starting Travel Planner A2A server...")
+    print(f"📡 Agent Card: http://localhost:{PORT}/.well-known/agent-card.json")
+    print(f"🔗 A2A Endpoint: http://localhost:{PORT}/")
+    print(f"📊 Model usage: http://localhost:{PORT}/model-usage")
+    print(f"⏱️ Model call scheduler: http://localhost:{PORT}/scheduler")
+
+    uvicorn.run(create_app(), host="0.0.0.0", port=PORT, log_level="info")
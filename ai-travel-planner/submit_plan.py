@@ -0,0 +1,131 @@
+import argparse
+import asyncio
+import os
+import secrets
+import time
+import uuid
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Header, HTTPException
+
+SERVER_URL = "http://localhost:8002"
+WEBHOOK_PORT = 9002
+
+
+def create_webhook_app(token, finished: asyncio.Queue):
+    """Local webhook receiver; puts every notified task on `finished`."""
+    app = FastAPI()
+
+    @app.post("/webhook")
+    async def receive_task(task: dict, x_a2a_notification_token: str = Header(None)):
+        if x_a2a_notification_token != token:
+            raise HTTPException(status_code=401, detail="Invalid notification token")
+        await finished.put(task)
+        return {"ok": True}
+
+    return app
+
+
+def plan_text(task):
+    """Final answer of a task: its artifacts, or the status message."""
+    texts = [
+        part["text"]
+        for artifact in task.get("artifacts", [])
+        for part in artifact.get("parts", [])
+        if part.get("kind") == "text"
+    ]
+    if not texts:
+        message = task["status"].get("message") or {}
+        texts = [p["text"] for p in message.get("parts", []) if p.get("kind") == "text"]
+    return "\n".join(texts)
+
+
+async def submit(client, server_url, query, webhook_url, token, headers):
+    """Sends a non-blocking `message/send` and returns the accepted task."""
+    request = {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "kind": "message",
+                "messageId": str(uuid.uuid4()),
+                "role": "user",
+                "parts": [{"kind": "text", "text": query}],
+            },
+            "configuration": {
+                "blocking": False,
+                "pushNotificationConfig": {"url": webhook_url, "token": token},
+            },
+        },
+    }
+    response = await client.post(server_url, json=request, headers=headers)
+    response.raise_for_status()
+    body = response.json()
+    if "error" in body:
+        raise RuntimeError(body["error"].get("message", "Unknown error"))
+    return body["result"]
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Submit trip plans to server.py without holding a connection open; "
+        "results arrive on a local webhook."
+    )
+    parser.add_argument("queries", nargs="*", default=["Plan me a 3-day trip to Paris."])
+    parser.add_argument("--url", default=SERVER_URL)
+    parser.add_argument("--webhook-port", type=int, default=WEBHOOK_PORT)
+    parser.add_argument("--timeout", type=float, default=600)
+    parser.add_argument(
+        "--api-token",
+        default=os.getenv("TRAVEL_PLANNER_API_TOKEN"),
+        help="bearer token from the server's TRAVEL_PLANNER_API_TOKENS",
+    )
+    args = parser.parse_args()
+    headers = {"Authorization": f"Bearer {args.api_token}"} if args.api_token else {}
+
+    token = secrets.token_urlsafe(16)
+    webhook_url = f"http://localhost:{args.webhook_port}/webhook"
+    finished = asyncio.Queue()
+    server = uvicorn.Server(
+        uvicorn.Config(
+            create_webhook_app(token, finished),
+            port=args.webhook_port,
+            log_level="warning",
+        )
+    )
+    receiver = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    try:
+        async with httpx.AsyncClient(timeout=30) as client:
+            submitted_at = {}
+            for query in args.queries:
+                start = time.perf_counter()
+                task = await submit(client, args.url, query, webhook_url, token, headers)
+                submitted_at[task["id"]] = start
+                print(
+                    f"📋 {task['id'][:8]} {task['status']['state']} in "
+                    f"{(time.perf_counter() - start) * 1000:.0f} ms: {query}"
+                )
+
+        # Connections are closed; wait for the agent to call back
+        while submitted_at:
+            task = await asyncio.wait_for(finished.get(), timeout=args.timeout)
+            start = submitted_at.pop(task["id"], None)
+            if start is None:
+                continue
+            print(
+                f"\n📬 {task['id'][:8]} {task['status']['state']} after "
+                f"{time.perf_counter() - start:.1f} s"
+            )
+            print(plan_text(task))
+    finally:
+        server.should_exit = True
+        await receiver
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,210 @@
+"""
+Seeded synthetic travel data in the same schemas as the bundled datasets.
+
+- flights: rows of flights_dataset.json
+- hotels: rows of mock_hotels.json, including `rates` and `sold_out` rules
+- forecast: an OpenWeatherMap /forecast payload (3-hourly `list` items), as
+  consumed by the weather agent's `summarize_forecast`
+
+Rows are produced lazily, so files of 10^7 rows are written in constant memory:
+
+    uv run synthetic_data.py flights 1000000 --seed 7 --output flights_1e6.json
+"""
+
+import argparse
+import json
+import math
+import random
+from datetime import datetime, timedelta
+
+YEAR = 2025
+
+# (city, airport, latitude, longitude, hotel price level)
+CITIES = [
+    ("New York", "JFK", 40.64, -73.78, 1.6),
+    ("London", "LHR", 51.47, -0.45, 1.5),
+    ("Paris", "CDG", 49.01, 2.55, 1.4),
+    ("Tokyo", "HND", 35.55, 139.78, 1.3),
+    ("Rome", "FCO", 41.80, 12.25, 1.1),
+    ("Barcelona", "BCN", 41.30, 2.08, 1.0),
+    ("Amsterdam", "AMS", 52.31, 4.76, 1.3),
+    ("Berlin", "BER", 52.37, 13.50, 1.0),
+    ("Dubai", "DXB", 25.25, 55.36, 1.4),
+    ("Singapore", "SIN", 1.36, 103.99, 1.4),
+    ("Sydney", "SYD", -33.95, 151.18, 1.3),
+    ("Los Angeles", "LAX", 33.94, -118.41, 1.5),
+    ("San Francisco", "SFO", 37.62, -122.38, 1.7),
+    ("Chicago", "ORD", 41.98, -87.90, 1.2),
+    ("Toronto", "YYZ", 43.68, -79.63, 1.2),
+    ("Madrid", "MAD", 40.47, -3.57, 1.0),
+    ("Lisbon", "LIS", 38.77, -9.13, 0.9),
+    ("Istanbul", "IST", 41.26, 28.74, 0.8),
+    ("Bangkok", "BKK", 13.69, 100.75, 0.6),
+    ("Hong Kong", "HKG", 22.31, 113.91, 1.4),
+]
+
+AIRLINES = [
+    ("Delta Air Lines", "DL"),
+    ("Air France", "AF"),
+    ("British Airways", "BA"),
+    ("Lufthansa", "LH"),
+    ("United Airlines", "UA"),
+    ("American Airlines", "AA"),
+    ("Emirates", "EK"),
+    ("KLM", "KL"),
+    ("Japan Airlines", "JL"),
+    ("Singapore Airlines", "SQ"),
+]
+
+# Most flights in the dataset are in the future or on time
+STATUSES = ["scheduled", "on time", "delayed", "landed", "cancelled"]
+STATUS_WEIGHTS = [60, 20, 12, 6, 2]
+
+HOTEL_PREFIXES = ["Grand", "Royal", "Hotel", "The", "Little", "City", "Park", "Old Town"]
+HOTEL_NAMES = ["Lumiere", "Stay", "Comfort", "Plaza", "Harbor", "Garden", "Central",
+               "Palace", "Loft", "Residence", "Inn", "Suites", "View", "House"]
+
+WEATHER = ["clear sky", "few clouds", "scattered clouds", "broken clouds",
+           "overcast clouds", "light rain", "moderate rain", "light snow"]
+
+
+def _distance_km(a, b):
+    """Great-circle distance between two CITIES entries."""
+    lat1, lon1, lat2, lon2 = map(math.radians, (a[2], a[3], b[2], b[3]))
+    h = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lon2 - lon1) / 2) ** 2
+    )
+    return 6371 * 2 * math.asin(math.sqrt(h))
+
+
+def generate_flights(count: int, seed: int = 0):
+    """Yields `count` flights; departures on a 30-minute grid across the year."""
+    rng = random.Random(seed)
+    start = datetime(YEAR, 1, 1)
+    for _ in range(count):
+        departure, arrival = rng.sample(CITIES, 2)
+        airline, code = rng.choice(AIRLINES)
+        # Cruise at ~800 km/h plus taxi and climb
+        minutes = int((_distance_km(departure, arrival) / 800 + 0.5) * 60)
+        dep_time = start + timedelta(
+            days=rng.randrange(365), minutes=30 * rng.randrange(48)
+        )
+        arr_time = dep_time + timedelta(minutes=minutes - minutes % 5)
+        yield {
+            "airline": airline,
+            "flight_number": f"{code}{rng.randint(100, 9999)}",
+            "departure_airport": departure[1],
+            "departure_city": departure[0],
+            "arrival_airport": arrival[1],
+            "arrival_city": arrival[0],
+            "departure_time": dep_time.strftime("%m-%d %H:%M"),
+            "arrival_time": arr_time.strftime("%m-%d %H:%M"),
+            "status": rng.choices(STATUSES, STATUS_WEIGHTS)[0],
+        }
+
+
+def _month_day(day_of_year: int) -> str:
+    return (datetime(YEAR, 1, 1) + timedelta(days=day_of_year)).strftime("%m-%d")
+
+
+def generate_hotels(count: int, seed: int = 0):
+    """Yields `count` hotels with a summer and a year-end rate rule and sold-out nights."""
+    rng = random.Random(seed)
+    for number in range(count):
+        city = rng.choice(CITIES)
+        rating = round(rng.triangular(2.5, 5.0, 4.2), 2)
+        price = round(city[4] * (40 + 30 * rating) * rng.uniform(0.8, 1.3))
+
+        rates = [
+            {"from": "06-01", "to": "08-31", "price": round(price * rng.uniform(1.1, 1.4))},
+            {"from": "12-20", "to": "12-31", "price": round(price * rng.uniform(1.2, 1.6))},
+        ]
+        sold_out = []
+        for _ in range(rng.randint(0, 3)):
+            first = rng.randrange(360)
+            sold_out.append(
+                {"from": _month_day(first), "to": _month_day(first + rng.randint(0, 4))}
+            )
+
+        yield {
+            "city": city[0],
+            "name": f"{rng.choice(HOTEL_PREFIXES)} {rng.choice(HOTEL_NAMES)} {number}",
+            "rating": rating,
+            "price": price,
+            "rates": rates,
+            "sold_out": sold_out,
+        }
+
+
+def generate_forecast_items(count: int, seed: int = 0, latitude: float = 48.9):
+    """Yields `count` 3-hourly OpenWeatherMap forecast items from Jan 1st."""
+    rng = random.Random(seed)
+    start = datetime(YEAR, 1, 1)
+    # Colder winters further from the equator
+    mean = 28 - abs(latitude) * 0.35
+    swing = abs(latitude) * 0.25
+    for step in range(count):
+        moment = start + timedelta(hours=3 * step)
+        seasonal = -math.cos(2 * math.pi * (moment.timetuple().tm_yday - 15) / 365)
+        diurnal = -math.cos(2 * math.pi * (moment.hour - 3) / 24)
+        temp = mean + swing * seasonal + 4 * diurnal + rng.gauss(0, 1.5)
+        description = WEATHER[min(len(WEATHER) - 1, int(rng.expovariate(0.6)))]
+        if description == "light snow" and temp > 2:
+            description = "light rain"
+        yield {
+            "dt": int(moment.timestamp()),
+            "main": {"temp": round(temp, 2), "humidity": rng.randint(40, 95)},
+            "weather": [{"main": description.split()[-1].title(), "description": description}],
+            "wind": {"speed": round(rng.uniform(0, 12), 1)},
+            "dt_txt": moment.strftime("%Y-%m-%d %H:%M:%S"),
+        }
+
+
+def generate_forecast(count: int, seed: int = 0, location: str = "Paris") -> dict:
+    """A /forecast payload with `count` items for one of CITIES."""
+    city = next((c for c in CITIES if c[0] == location), CITIES[2])
+    return {
+        "cod": "200",
+        "cnt": count,
+        "list": list(generate_forecast_items(count, seed, city[2])),
+        "city": {"name": city[0], "coord": {"lat": city[2], "lon": city[3]}},
+    }
+
+
+def write_json_array(path: str, rows):
+    """Writes rows as a JSON array one row at a time."""
+    with open(path, "w") as f:
+        f.write("[\n")
+        for index, row in enumerate(rows):
+            if index:
+                f.write(",\n")
+            f.write(json.dumps(row))
+        f.write("\n]\n")
+
+
+GENERATORS = {
+    "flights": generate_flights,
+    "hotels": generate_hotels,
+}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate seeded synthetic travel data.")
+    parser.add_argument("kind", choices=["flights", "hotels", "forecast"])
+    parser.add_argument("rows", type=lambda value: int(float(value)), help="e.g. 1000 or 1e6")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--location", default="Paris", help="forecast city")
+    parser.add_argument("--output", required=True)
+    args = parser.parse_args()
+
+    if args.kind == "forecast":
+        with open(args.output, "w") as f:
+            json.dump(generate_forecast(args.rows, args.seed, args.location), f)
+    else:
+        write_json_array(args.output, GENERATORS[args.kind](args.rows, args.seed))
+    print(f"✅ Wrote {args.rows:,} {args.kind} rows to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -7,7 +7,6 @@ from google.adk.auth.credential_service.in_memory_credential_service import (
     InMemoryCredentialService,
 )
 from google.adk.apps.app import App
-from agent import attractions_agent, flight_agent, hotel_agent
 
 
 import warnings
@@ -28,6 +27,8 @@ load_dotenv()  # loads .env into os.environ
 
 # Task 2: Connect CLI with Attractions Agent
 async def run_cli_attractions():
+    from agent import attractions_agent  # builds only this agent
+
     artifact_service = InMemoryArtifactService()
     session_service = InMemorySessionService()
     credential_service = InMemoryCredentialService()
@@ -64,6 +65,8 @@ async def run_cli_attractions():
 
 # Task 3: Connect CLI with Flight Agent
 async def run_cli_flights():
+    from agent import flight_agent  # builds only this agent
+
     artifact_service = InMemoryArtifactService()
     session_service = InMemorySessionService()
     credential_service = InMemoryCredentialService()
@@ -107,6 +110,8 @@ async def run_cli_flights():
 
 # Task 4: Connect CLI with Flight Agent
 async def run_cli_hotels():
+    from agent import hotel_agent  # builds only this agent
+
     artifact_service = InMemoryArtifactService()
     session_service = InMemorySessionService()
     credential_service = InMemoryCredentialService()
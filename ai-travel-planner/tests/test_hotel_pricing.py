@@ -0,0 +1,47 @@
+import pytest
+
+from hotel_pricing import NIGHTS_IN_YEAR, RateCalendar, night_index, stay_nights
+
+
+@pytest.fixture
+def calendar():
+    return RateCalendar.from_rules(
+        100,
+        rates=[
+            {"from": "06-01", "to": "08-31", "price": 150},
+            {"from": "07-14", "to": "07-14", "price": 300},
+            {"from": "12-30", "to": "12-31", "price": 200},
+        ],
+        sold_out=[{"from": "06-12", "to": "06-13"}],
+    )
+
+
+def test_total_price_sums_nightly_rates(calendar):
+    start, end = stay_nights("07-13", "07-16")
+    assert calendar.total_price(start, end) == 150 + 300 + 150
+
+
+def test_later_rules_override_earlier_ones(calendar):
+    start = night_index("07-14")
+    assert calendar.total_price(start, start + 1) == 300
+
+
+def test_sold_out_nights_block_the_stay(calendar):
+    assert not calendar.is_available(*stay_nights("06-10", "06-13"))
+    # Checking out on the first sold-out night is fine
+    assert calendar.is_available(*stay_nights("06-10", "06-12"))
+
+
+def test_stay_over_new_year_wraps(calendar):
+    start, end = stay_nights("12-30", "01-02")
+    assert end - start == 3 and end > NIGHTS_IN_YEAR
+    assert calendar.total_price(start, end) == 200 + 200 + 100
+    assert calendar.is_available(start, end)
+
+
+@pytest.mark.parametrize(
+    "check_in, check_out",
+    [("06-15", "06-10"), ("06-10", "06-10"), ("13-01", "13-02"), ("06-10", "tomorrow")],
+)
+def test_invalid_stays(check_in, check_out):
+    assert stay_nights(check_in, check_out) is None
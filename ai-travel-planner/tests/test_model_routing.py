@@ -0,0 +1,62 @@
+from google.adk.models.llm_request import LlmRequest
+from google.genai import types
+
+from agent import TOOL_ANSWER_TEMPLATES
+from model_routing import direct_answer
+
+
+def request_with(*responses, text=None):
+    parts = [
+        types.Part(function_response=types.FunctionResponse(name=name, response=response))
+        for name, response in responses
+    ]
+    if text:
+        parts.append(types.Part(text=text))
+    return LlmRequest(contents=[types.Content(role="user", parts=parts)])
+
+
+FLIGHT = {
+    "airline": "Air Test",
+    "flight_number": "AT1",
+    "departure_city": "Paris",
+    "departure_airport": "CDG",
+    "departure_time": "08:00",
+    "arrival_city": "Rome",
+    "arrival_airport": "FCO",
+    "arrival_time": "10:00",
+    "status": "On Time",
+}
+
+
+def test_final_results_are_rendered():
+    answer = direct_answer(
+        request_with(("query_flights_simple", {"result": [FLIGHT]})), TOOL_ANSWER_TEMPLATES
+    )
+    assert answer.startswith("Found 1 flight(s):")
+    assert "AT1" in answer
+
+
+def test_empty_result_is_final():
+    answer = direct_answer(
+        request_with(("query_hotels", {"result": []})), TOOL_ANSWER_TEMPLATES
+    )
+    assert answer == TOOL_ANSWER_TEMPLATES["query_hotels"]["empty"]
+
+
+def test_ambiguous_city_goes_back_to_the_model():
+    # The model may call the tool again with the city the conversation names
+    ambiguous = {
+        "error": "'Sa' could refer to several cities.",
+        "did_you_mean": ["Sao Paulo", "San Diego"],
+    }
+    request = request_with(
+        ("query_flights_simple", {"result": [FLIGHT]}),
+        ("query_flights_simple", ambiguous),
+    )
+    assert direct_answer(request, TOOL_ANSWER_TEMPLATES) is None
+
+
+def test_other_parts_or_unknown_tools_go_to_the_model():
+    flights = ("query_flights_simple", {"result": [FLIGHT]})
+    assert direct_answer(request_with(flights, text="and hotels?"), TOOL_ANSWER_TEMPLATES) is None
+    assert direct_answer(request_with(("get_weather", {"result": []})), TOOL_ANSWER_TEMPLATES) is None
@@ -0,0 +1,50 @@
+import pytest
+
+import agent
+from places import PlaceIndex, edit_distance
+
+CITIES = ["Paris", "London", "New York", "Tokyo", "Rome", "Lisbon"]
+
+
+@pytest.fixture
+def index():
+    return PlaceIndex(CITIES, airports={"CDG": "Paris"})
+
+
+@pytest.mark.parametrize(
+    "text, city, match",
+    [
+        ("paris", "Paris", "exact"),
+        ("Paris, France", "Paris", "exact"),
+        ("NYC", "New York", "alias"),
+        ("cdg", "Paris", "airport"),
+        ("lon", "London", "prefix"),
+        ("Pa", "Paris", "prefix"),
+        ("Lodnon", "London", "fuzzy"),
+        ("Lisbn", "Lisbon", "fuzzy"),
+    ],
+)
+def test_resolves(index, text, city, match):
+    resolution = index.resolve(text)
+    assert (resolution.city, resolution.match) == (city, match)
+
+
+def test_shared_prefix_is_ambiguous(index):
+    resolution = index.resolve("L")
+    assert resolution.ambiguous
+    assert resolution.candidates == ["Lisbon", "London"]
+
+
+def test_unknown_place_matches_nothing(index):
+    assert index.resolve("Atlantis").match == "none"
+
+
+def test_edit_distance_counts_transpositions():
+    assert edit_distance("lodnon", "london", 2) == 1
+    assert edit_distance("paris", "tokyo", 2) > 2
+
+
+def test_query_hotels_accepts_short_city_prefixes():
+    hotels = agent.query_hotels("Pa")
+    assert hotels
+    assert {hotel["city"] for hotel in hotels} == {"Paris"}
@@ -0,0 +1,50 @@
+import argparse
+import asyncio
+import json
+import os
+
+import pytest
+
+import replay
+
+TRACE = os.path.join(os.path.dirname(__file__), "traces", "flights.jsonl")
+
+
+def run_replay(trace, capsys, **options):
+    args = argparse.Namespace(
+        trace=trace,
+        rounds=2,
+        stub_tools=False,
+        save=None,
+        compare=None,
+        # Timing varies across machines; only divergences fail these runs
+        threshold=1000.0,
+        min_ms=1000.0,
+    )
+    vars(args).update(options)
+    asyncio.run(replay.replay(args))
+    return capsys.readouterr().out
+
+
+def test_recorded_trace_replays_without_divergence(tmp_path, capsys):
+    baseline = str(tmp_path / "baseline.json")
+    run_replay(TRACE, capsys, save=baseline)
+    with open(baseline) as f:
+        assert "tool:query_flights_simple" in json.load(f)["stages"]
+
+    out = run_replay(TRACE, capsys, compare=baseline)
+    assert "diverged" not in out
+    assert "regression" not in out
+
+
+def test_divergence_in_every_round_is_reported(tmp_path, capsys):
+    trace = replay.Trace.load(TRACE)
+    trace.of_type("turn")[0]["final"] = "Something else"
+    changed = str(tmp_path / "changed.jsonl")
+    trace.save(changed)
+
+    with pytest.raises(SystemExit) as exit:
+        run_replay(changed, capsys)
+    assert exit.value.code == 1
+    out = capsys.readouterr().out
+    assert "differs (3 of 3 rounds)" in out
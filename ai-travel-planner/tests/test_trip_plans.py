@@ -0,0 +1,213 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.genai import types
+
+import trip_plans
+from trip_plans import (
+    EXPORT_REQUEST,
+    SUMMARY_REQUEST,
+    ContentAddressedArtifactService,
+    merge_turn,
+    render_markdown,
+)
+
+SCOPE = {"app_name": "TravelPlanner", "user_id": "u1", "session_id": "s1"}
+
+
+# --- merge_turn ---
+def test_first_turn_creates_a_plan():
+    plan = merge_turn(None, "Plan a trip to Paris", {"flight_agent": "f1", "hotel_agent": "h1"}, "o1")
+    assert plan["revision"] == 1
+    assert plan["destination"] == "paris"
+    assert {name: s["text"] for name, s in plan["sections"].items()} == {"flights": "f1", "hotels": "h1"}
+    assert plan["overview"] == {"text": "o1", "revision": 1}
+
+
+def test_turn_without_sub_agent_answers_keeps_the_plan():
+    plan = merge_turn(None, "Plan a trip to Paris", {"hotel_agent": "h1"}, None)
+    assert merge_turn(plan, "Thanks!", {}, "You're welcome") is plan
+
+
+def test_unchanged_answers_keep_the_plan():
+    plan = merge_turn(None, "Plan a trip to Paris", {"hotel_agent": "h1"}, "o1")
+    assert merge_turn(plan, "Same hotels again", {"hotel_agent": "h1"}, "o1") is plan
+
+
+def test_follow_up_replaces_only_its_section():
+    plan = merge_turn(None, "Plan a trip to Paris", {"flight_agent": "f1", "hotel_agent": "h1"}, "o1")
+    updated = merge_turn(plan, "Cheaper hotels please", {"hotel_agent": "h2"}, None)
+    assert updated["revision"] == 2
+    assert updated["request"] == "Plan a trip to Paris"
+    assert updated["sections"]["flights"] == {"text": "f1", "revision": 1}
+    assert updated["sections"]["hotels"] == {"text": "h2", "revision": 2}
+
+
+def test_return_flight_stays_in_the_plan():
+    plan = merge_turn(
+        None,
+        "Plan a trip from New York to Paris on 01-01",
+        {"flight_agent": "f1", "hotel_agent": "h1", "weather_agent": "w1"},
+        "o1",
+    )
+    updated = merge_turn(
+        plan, "Now find my return flight from Paris to New York on 01-05", {"flight_agent": "f2"}, None
+    )
+    assert updated["destination"] == "paris"
+    assert {name: s["text"] for name, s in updated["sections"].items()} == {
+        "flights": "f2",
+        "hotels": "h1",
+        "weather": "w1",
+    }
+    assert updated["overview"]["text"] == "o1"
+
+
+def test_day_trip_weather_stays_in_the_plan():
+    plan = merge_turn(None, "Plan a trip to Paris", {"flight_agent": "f1", "hotel_agent": "h1"}, "o1")
+    updated = merge_turn(plan, "Weather in Versailles for a day trip", {"weather_agent": "w1"}, None)
+    assert updated["destination"] == "paris"
+    assert set(updated["sections"]) == {"flights", "hotels", "weather"}
+
+
+@pytest.mark.parametrize(
+    "request_text, answers",
+    [
+        ("Flights and hotels in Rome on 02-01", {"flight_agent": "f2", "hotel_agent": "h2"}),
+        ("Let's plan a new trip: hotels in Rome", {"hotel_agent": "h2"}),
+        ("Start over with hotels in Rome", {"hotel_agent": "h2"}),
+    ],
+)
+def test_new_destination_starts_a_new_plan(request_text, answers):
+    plan = merge_turn(None, "Plan a trip to Paris", {"flight_agent": "f1", "hotel_agent": "h1"}, "o1")
+    updated = merge_turn(plan, request_text, answers, None)
+    assert updated["destination"] == "rome"
+    assert updated["request"] == request_text
+    assert set(updated["sections"]) == {trip_plans.PLAN_SECTIONS[agent] for agent in answers}
+    assert updated["overview"] is None
+    assert updated["revision"] == 2
+
+
+def test_render_markdown_drops_an_overview_older_than_a_section():
+    plan = merge_turn(None, "Plan a trip to Paris", {"flight_agent": "f1"}, "overview text")
+    assert "overview text" in render_markdown(plan)
+    plan = merge_turn(plan, "Hotels too", {"hotel_agent": "h1"}, None)
+    markdown = render_markdown(plan)
+    assert "overview text" not in markdown
+    assert markdown.index("## Flights") < markdown.index("## Hotels")
+
+
+@pytest.mark.parametrize(
+    "text, expected",
+    [
+        ("Summarize the full itinerary.", True),
+        ("Show my trip plan", True),
+        ("please recap the trip!", True),
+        ("Show me hotels in Rome for my trip", False),
+        ("Give me a plan for a trip to Tokyo", False),
+        ("Summarize the plan and add a museum day", False),
+    ],
+)
+def test_summary_requests(text, expected):
+    assert bool(SUMMARY_REQUEST.match(text)) is expected
+
+
+def test_export_request_format():
+    assert EXPORT_REQUEST.match("Export the plan as json").group("format") == "json"
+    assert EXPORT_REQUEST.match("export").group("format") is None
+    assert not EXPORT_REQUEST.match("Export my flights to a spreadsheet")
+
+
+# --- ContentAddressedArtifactService ---
+@pytest.fixture
+def service(tmp_path):
+    return ContentAddressedArtifactService(directory=str(tmp_path), max_age_days=7)
+
+
+def save(service, text, filename="plan.txt", **scope):
+    return asyncio.run(
+        service.save_artifact(filename=filename, artifact=types.Part(text=text), **{**SCOPE, **scope})
+    )
+
+
+def load(service, filename="plan.txt", **scope):
+    return asyncio.run(service.load_artifact(filename=filename, **{**SCOPE, **scope}))
+
+
+def test_versions_and_content_addressing(service):
+    assert save(service, "v0") == 0
+    assert save(service, "v1") == 1
+    assert save(service, "v0") == 2
+    assert service.blobs_written == 2 and service.blobs_reused == 1
+
+    assert load(service).text == "v0"
+    assert load(service, version=1).text == "v1"
+    assert asyncio.run(service.list_versions(filename="plan.txt", **SCOPE)) == [0, 1, 2]
+
+
+def test_inline_data_round_trip(service):
+    part = types.Part(inline_data=types.Blob(mime_type="application/json", data=b'{"a": 1}'))
+    asyncio.run(service.save_artifact(filename="plan.json", artifact=part, **SCOPE))
+    loaded = load(service, filename="plan.json")
+    assert loaded.inline_data.data == b'{"a": 1}'
+    assert loaded.inline_data.mime_type == "application/json"
+
+
+def test_user_artifacts_are_shared_across_sessions(service):
+    save(service, "prefs", filename="user:prefs")
+    save(service, "plan")
+    assert asyncio.run(service.list_artifact_keys(**{**SCOPE, "session_id": "s2"})) == ["user:prefs"]
+    assert asyncio.run(service.list_artifact_keys(**SCOPE)) == ["plan.txt", "user:prefs"]
+
+
+def test_artifacts_survive_a_restart(service, tmp_path):
+    save(service, "kept")
+    restarted = ContentAddressedArtifactService(directory=str(tmp_path))
+    assert load(restarted).text == "kept"
+
+
+def test_delete_then_collect_garbage(service, monkeypatch):
+    save(service, "gone")
+    asyncio.run(service.delete_artifact(filename="plan.txt", **SCOPE))
+    assert load(service) is None
+    monkeypatch.setattr(trip_plans, "GC_GRACE_SECONDS", -1)
+    assert service.collect_garbage() == 1
+
+
+def test_prune_removes_old_sessions_only(service, tmp_path, monkeypatch):
+    save(service, "old session")
+    save(service, "prefs", filename="user:prefs")
+    monkeypatch.setattr(trip_plans, "GC_GRACE_SECONDS", -1)
+    service.max_age_seconds = -1  # everything is too old
+    assert service.prune() == 1
+    assert load(service) is None
+    assert load(service, filename="user:prefs").text == "prefs"
+
+
+def test_session_scope_needs_a_session_id(service):
+    with pytest.raises(ValueError):
+        save(service, "x", session_id=None)
+
+
+def test_empty_artifacts_load_as_empty_parts(service):
+    save(service, "")
+    assert load(service).text == ""
+    part = types.Part(inline_data=types.Blob(mime_type="application/octet-stream", data=b""))
+    asyncio.run(service.save_artifact(filename="empty.bin", artifact=part, **SCOPE))
+    assert load(service, filename="empty.bin").inline_data.data == b""
+
+
+def test_concurrent_writes_and_prune(service, tmp_path):
+    # Writers on threads share neither temp files nor directories prune removed
+    def write(n):
+        path = service._index_path("TravelPlanner", "u1", "plan.txt", f"s{n % 4}")
+        service._replace(path, b"[]")
+        service._replace(service._blob_path(f"{n:064x}"), b"blob")
+
+    with ThreadPoolExecutor(8) as pool:
+        futures = [pool.submit(write, n) for n in range(200)]
+        for _ in range(50):
+            service.prune()
+        for future in futures:
+            future.result()
+    assert not list(tmp_path.rglob("*.tmp"))
@@ -0,0 +1,114 @@
+import asyncio
+import functools
+import multiprocessing
+import weakref
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+INLINE = "inline"
+THREAD = "thread"
+PROCESS = "process"
+
+
+@dataclass(frozen=True)
+class ExecutionPolicy:
+    """
+    Where a sync function tool runs.
+
+    inline:  on the event loop (blocks every other session while it runs)
+    thread:  in a thread pool; frees the loop, still shares the GIL
+    process: in a process pool; for CPU-heavy scans held back by the GIL.
+             The function and its arguments and result must be picklable.
+    """
+
+    mode: str = THREAD
+    max_workers: int = 4
+    # Calls allowed to wait for a worker on top of the running ones; further
+    # calls are rejected right away instead of piling up.
+    max_queue: int = 16
+    # Seconds before the caller gets a timeout error. The worker itself
+    # cannot be interrupted and finishes in the background, holding its slot.
+    timeout: Optional[float] = 30.0
+
+
+_executors: dict[tuple[str, str], Executor] = {}
+
+
+def _executor_for(name: str, policy: ExecutionPolicy) -> Executor:
+    key = (name, policy.mode)
+    if key not in _executors:
+        if policy.mode == PROCESS:
+            # spawn: workers re-import agent.py, which is cheap since it loads lazily
+            _executors[key] = ProcessPoolExecutor(
+                max_workers=policy.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        else:
+            _executors[key] = ThreadPoolExecutor(
+                max_workers=policy.max_workers, thread_name_prefix=f"tool-{name}"
+            )
+    return _executors[key]
+
+
+def _release_soon(loop, slots: asyncio.BoundedSemaphore):
+    """Releases a slot on its loop; called from the worker's done callback."""
+    try:
+        loop.call_soon_threadsafe(slots.release)
+    except RuntimeError:
+        pass  # loop already closed
+
+
+def offload(func: Callable, policy: ExecutionPolicy) -> Callable:
+    """
+    Wraps a sync tool function in an async one that runs per `policy`.
+
+    The wrapper keeps the function's name, docstring and signature, so ADK
+    builds the same function declaration for it. Rejected and timed-out calls
+    return an error dict the model can read instead of raising.
+
+    A call holds its slot until the worker is done with it, so calls that
+    timed out but still run count against `max_workers + max_queue`.
+    """
+    if policy.mode not in (INLINE, THREAD, PROCESS):
+        raise ValueError(f"Unknown execution mode: {policy.mode}")
+
+    name = func.__name__
+    # Event loop -> slots, created on the loop's first call
+    slots_by_loop = weakref.WeakKeyDictionary()
+
+    @functools.wraps(func)
+    async def run_tool(*args, **kwargs):
+        if policy.mode == INLINE:
+            return func(*args, **kwargs)
+
+        loop = asyncio.get_running_loop()
+        slots = slots_by_loop.get(loop)
+        if slots is None:
+            slots = slots_by_loop[loop] = asyncio.BoundedSemaphore(
+                policy.max_workers + policy.max_queue
+            )
+        if slots.locked():
+            return {"error": f"{name} is overloaded, please retry shortly."}
+
+        await slots.acquire()  # a slot is free, so this does not wait
+        try:
+            future = _executor_for(name, policy).submit(func, *args, **kwargs)
+        except BaseException:
+            slots.release()
+            raise
+        future.add_done_callback(lambda _: _release_soon(loop, slots))
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout=policy.timeout)
+        except asyncio.TimeoutError:
+            # Cancels the call if it is still queued; a running one keeps its slot
+            return {"error": f"{name} timed out after {policy.timeout:.0f}s."}
+
+    return run_tool
+
+
+def shutdown_executors():
+    """Stops all worker pools; call on process shutdown."""
+    for executor in _executors.values():
+        executor.shutdown(wait=False, cancel_futures=True)
+    _executors.clear()
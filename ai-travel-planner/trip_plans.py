@@ -0,0 +1,639 @@
+"""
+Finalized trip plans as artifacts, and follow-ups answered from them.
+
+Every turn that produces sub-agent results merges them into a structured
+plan (one section per sub-agent plus the root agent's overview) saved as the
+session's `trip_plan.json` artifact. Once the plan covers at least two
+sub-agents, "Summarize the full itinerary" and "export the plan as markdown"
+are answered from the latest version of that artifact, without a model call
+or another multi-agent pass. A later turn that only re-runs, say, the hotel
+agent updates only that section.
+
+Artifacts live in a disk-backed, content-addressed store: each version
+points at a blob named by its SHA-256, so identical content (an unchanged
+plan, a repeated export) is stored once. Session artifacts untouched for
+TRAVEL_PLANNER_ARTIFACT_MAX_AGE_DAYS are removed with their blobs.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+import tempfile
+import time
+from collections import OrderedDict
+from typing import Any, Optional
+from urllib.parse import quote, unquote
+
+from google.adk.artifacts import artifact_util
+from google.adk.artifacts.base_artifact_service import (
+    ArtifactVersion,
+    BaseArtifactService,
+)
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+from resilience import location_key
+
+DEFAULT_ARTIFACT_DIR = os.path.join(tempfile.gettempdir(), "travel_planner_artifacts")
+
+# Session-scoped artifacts whose index was not written for this long are
+# removed; "user:" artifacts are kept
+DEFAULT_MAX_AGE_DAYS = 7.0
+# Expired sessions are looked for on startup and then at most this often
+PRUNE_INTERVAL_SECONDS = 3600
+# Unreferenced blobs younger than this are kept: a save may have written the
+# blob but not yet the index that refers to it
+GC_GRACE_SECONDS = 300
+# Artifact indexes (and their locks) kept in memory, least recently used dropped
+MAX_CACHED_INDEXES = 1024
+
+PLAN_FILENAME = "trip_plan.json"
+
+# Sub-agents whose answers become plan sections, in the order they are rendered
+PLAN_SECTIONS = {
+    "flight_agent": "flights",
+    "hotel_agent": "hotels",
+    "weather_agent": "weather",
+    "attractions_agent": "attractions",
+}
+
+# Follow-ups are answered from a plan once it has results from this many
+# sub-agents; before that the agents answer them
+MIN_PLAN_SECTIONS = 2
+
+# Follow-ups answered from the plan artifact. The whole message must be the
+# request, so "Show me hotels in Rome for my trip" or "Summarize the plan and
+# add a museum day" still go to the agents.
+_PLAN_NOUN = r"(?:(?:me|my|our|the|this|full|whole|entire|complete|current|final|trip)\s+)*(?:itinerary|plan|trip)"
+SUMMARY_REQUEST = re.compile(
+    rf"^\s*(?:please\s+)?(?:summari[sz]e|recap|show)\s+{_PLAN_NOUN}\s*[.!?]*\s*$",
+    re.IGNORECASE,
+)
+EXPORT_REQUEST = re.compile(
+    rf"^\s*(?:please\s+)?export(?:\s+{_PLAN_NOUN})?"
+    r"(?:\s+(?:as|to|in)\s+(?P<format>markdown|md|json))?\s*[.!?]*\s*$",
+    re.IGNORECASE,
+)
+
+# A request naming another destination starts a new plan only when it asks
+# for one, or when its turn re-runs most of the plan's sections; a return
+# flight or a day trip elsewhere stays part of the current plan
+NEW_PLAN_REQUEST = re.compile(
+    r"\b(?:new|another|different|separate|next)\s+(?:trip|plan|itinerary|vacation|holiday)\b"
+    r"|\bplan\s+(?:a|my)\s+(?:trip|vacation|holiday)\b|\bstart\s+over\b",
+    re.IGNORECASE,
+)
+
+EXPORT_FORMATS = {
+    "markdown": ("trip_plan.md", "text/markdown"),
+    "json": (PLAN_FILENAME, "application/json"),
+}
+
+
+# --- Content-addressed artifact service ---
+class ContentAddressedArtifactService(BaseArtifactService):
+    """
+    ADK artifact service storing versions on disk under `directory`.
+
+    blobs/<sha256> holds each distinct content once; index/... holds one JSON
+    list of versions per artifact, each with the digest of its blob.
+    User-scoped artifacts ("user:" filenames) survive restarts; sessions not
+    written for `max_age_days` are pruned on startup and hourly after that.
+    Deleting an artifact drops its index only; `collect_garbage` removes
+    blobs no version refers to.
+
+    `directory` and `max_age_days` default to TRAVEL_PLANNER_ARTIFACT_DIR and
+    TRAVEL_PLANNER_ARTIFACT_MAX_AGE_DAYS, read when the service is created.
+    """
+
+    def __init__(self, directory: Optional[str] = None, max_age_days: Optional[float] = None):
+        self.directory = directory or os.getenv("TRAVEL_PLANNER_ARTIFACT_DIR", DEFAULT_ARTIFACT_DIR)
+        if max_age_days is None:
+            max_age_days = float(
+                os.getenv("TRAVEL_PLANNER_ARTIFACT_MAX_AGE_DAYS", str(DEFAULT_MAX_AGE_DAYS))
+            )
+        self.max_age_seconds = max_age_days * 86400
+        self.blob_dir = os.path.join(self.directory, "blobs")
+        self.index_dir = os.path.join(self.directory, "index")
+        os.makedirs(self.blob_dir, exist_ok=True)
+        os.makedirs(self.index_dir, exist_ok=True)
+        self._indexes: OrderedDict[str, list[dict]] = OrderedDict()  # index path -> versions
+        self._locks: OrderedDict[str, asyncio.Lock] = OrderedDict()
+        self.blobs_written = 0
+        self.blobs_reused = 0
+        self.artifacts_pruned = 0
+        self.prune()
+
+    # Paths
+    def _scope_dir(self, app_name, user_id) -> str:
+        return os.path.join(self.index_dir, quote(app_name, safe=""), quote(user_id, safe=""))
+
+    def _index_path(self, app_name, user_id, filename, session_id) -> str:
+        if filename.startswith("user:"):
+            scope = "user"
+        elif session_id is None:
+            raise ValueError("Session ID must be provided for session-scoped artifacts.")
+        else:
+            scope = os.path.join("sessions", quote(session_id, safe=""))
+        return os.path.join(
+            self._scope_dir(app_name, user_id), scope, quote(filename, safe="") + ".json"
+        )
+
+    def _blob_path(self, digest: str) -> str:
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    # Blobs and indexes (blocking; called on a worker thread)
+    @staticmethod
+    def _replace(path: str, data: bytes):
+        """
+        Writes `path` through a uniquely named temp file beside it, so
+        concurrent writers never share one. prune() may remove the empty
+        directory between makedirs and mkstemp; it is then created again.
+        """
+        directory = os.path.dirname(path)
+        for attempt in range(3):
+            os.makedirs(directory, exist_ok=True)
+            try:
+                fd, tmp = tempfile.mkstemp(
+                    dir=directory, prefix=os.path.basename(path) + ".", suffix=".tmp"
+                )
+                break
+            except FileNotFoundError:
+                if attempt == 2:
+                    raise
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+
+    def _write_blob(self, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if os.path.exists(path):
+            os.utime(path)  # keeps collect_garbage off it until the index refers to it
+            self.blobs_reused += 1
+            return digest
+        self._replace(path, data)
+        self.blobs_written += 1
+        return digest
+
+    def _read_blob(self, digest: str) -> bytes:
+        with open(self._blob_path(digest), "rb") as f:
+            return f.read()
+
+    def _load_index(self, path: str) -> list[dict]:
+        if path in self._indexes:
+            self._indexes.move_to_end(path)
+            return self._indexes[path]
+        try:
+            with open(path) as f:
+                versions = json.load(f)
+        except FileNotFoundError:
+            versions = []
+        self._cache_index(path, versions)
+        return versions
+
+    def _cache_index(self, path: str, versions: list[dict]):
+        self._indexes[path] = versions
+        self._indexes.move_to_end(path)
+        while len(self._indexes) > MAX_CACHED_INDEXES:
+            self._indexes.popitem(last=False)
+
+    def _store_index(self, path: str, versions: list[dict]):
+        self._replace(path, json.dumps(versions).encode())
+        self._cache_index(path, versions)
+
+    def _save(self, path, artifact: types.Part, custom_metadata) -> int:
+        if artifact.inline_data is not None:
+            kind, data = "inline", artifact.inline_data.data or b""
+            mime_type = artifact.inline_data.mime_type
+        elif artifact.text is not None:
+            kind, data, mime_type = "text", artifact.text.encode(), "text/plain"
+        elif artifact.file_data is not None:
+            if artifact_util.is_artifact_ref(artifact) and not artifact_util.parse_artifact_uri(
+                artifact.file_data.file_uri
+            ):
+                raise ValueError(f"Invalid artifact reference URI: {artifact.file_data.file_uri}")
+            kind = "file_data"
+            data = artifact.file_data.model_dump_json(exclude_none=True).encode()
+            mime_type = None if artifact_util.is_artifact_ref(artifact) else artifact.file_data.mime_type
+        else:
+            raise ValueError("Not supported artifact type.")
+
+        digest = self._write_blob(data)
+        versions = list(self._load_index(path))
+        versions.append(
+            {
+                "version": len(versions),
+                "sha256": digest,
+                "kind": kind,
+                "mime_type": mime_type,
+                "custom_metadata": custom_metadata or {},
+                "create_time": time.time(),
+            }
+        )
+        self._store_index(path, versions)
+        return len(versions) - 1
+
+    def _version_entry(self, path, version) -> Optional[dict]:
+        versions = self._load_index(path)
+        if not versions:
+            return None
+        try:
+            return versions[-1 if version is None else version]
+        except IndexError:
+            return None
+
+    def _artifact_version(self, entry: dict) -> ArtifactVersion:
+        return ArtifactVersion(
+            version=entry["version"],
+            canonical_uri=f"file://{self._blob_path(entry['sha256'])}",
+            custom_metadata=entry["custom_metadata"],
+            create_time=entry["create_time"],
+            mime_type=entry["mime_type"],
+        )
+
+    def _lock(self, path) -> asyncio.Lock:
+        lock = self._locks.setdefault(path, asyncio.Lock())
+        self._locks.move_to_end(path)
+        if len(self._locks) > MAX_CACHED_INDEXES:
+            # Held locks stay: a waiter must get the same lock as the holder
+            for stale in [p for p, other in self._locks.items() if not other.locked() and p != path]:
+                del self._locks[stale]
+                if len(self._locks) <= MAX_CACHED_INDEXES:
+                    break
+        return lock
+
+    # BaseArtifactService
+    async def save_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        artifact: types.Part,
+        session_id: Optional[str] = None,
+        custom_metadata: Optional[dict[str, Any]] = None,
+    ) -> int:
+        path = self._index_path(app_name, user_id, filename, session_id)
+        if time.monotonic() - self._last_prune > PRUNE_INTERVAL_SECONDS:
+            self._last_prune = time.monotonic()
+            await asyncio.to_thread(self.prune)
+        async with self._lock(path):
+            return await asyncio.to_thread(self._save, path, artifact, custom_metadata)
+
+    async def load_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[types.Part]:
+        path = self._index_path(app_name, user_id, filename, session_id)
+        entry = await asyncio.to_thread(self._version_entry, path, version)
+        if entry is None:
+            return None
+        data = await asyncio.to_thread(self._read_blob, entry["sha256"])
+        # Empty content loads as an empty part, like InMemoryArtifactService
+        if entry["kind"] == "text":
+            return types.Part(text=data.decode())
+        if entry["kind"] == "inline":
+            return types.Part(inline_data=types.Blob(mime_type=entry["mime_type"], data=data))
+
+        part = types.Part(file_data=types.FileData.model_validate_json(data))
+        if artifact_util.is_artifact_ref(part):
+            ref = artifact_util.parse_artifact_uri(part.file_data.file_uri)
+            return await self.load_artifact(
+                app_name=ref.app_name,
+                user_id=ref.user_id,
+                filename=ref.filename,
+                session_id=ref.session_id,
+                version=ref.version,
+            )
+        return part
+
+    async def list_artifact_keys(
+        self, *, app_name: str, user_id: str, session_id: Optional[str] = None
+    ) -> list[str]:
+        scope_dir = self._scope_dir(app_name, user_id)
+        scopes = [os.path.join(scope_dir, "user")]
+        if session_id:
+            scopes.append(os.path.join(scope_dir, "sessions", quote(session_id, safe="")))
+
+        def list_keys():
+            keys = []
+            for directory in scopes:
+                if os.path.isdir(directory):
+                    keys.extend(
+                        unquote(name[: -len(".json")])
+                        for name in os.listdir(directory)
+                        if name.endswith(".json")
+                    )
+            return sorted(keys)
+
+        return await asyncio.to_thread(list_keys)
+
+    async def delete_artifact(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> None:
+        path = self._index_path(app_name, user_id, filename, session_id)
+        async with self._lock(path):
+            self._indexes.pop(path, None)
+            if os.path.exists(path):
+                await asyncio.to_thread(os.remove, path)
+
+    async def list_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> list[int]:
+        path = self._index_path(app_name, user_id, filename, session_id)
+        versions = await asyncio.to_thread(self._load_index, path)
+        return [entry["version"] for entry in versions]
+
+    async def list_artifact_versions(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+    ) -> list[ArtifactVersion]:
+        path = self._index_path(app_name, user_id, filename, session_id)
+        versions = await asyncio.to_thread(self._load_index, path)
+        return [self._artifact_version(entry) for entry in versions]
+
+    async def get_artifact_version(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        filename: str,
+        session_id: Optional[str] = None,
+        version: Optional[int] = None,
+    ) -> Optional[ArtifactVersion]:
+        path = self._index_path(app_name, user_id, filename, session_id)
+        entry = await asyncio.to_thread(self._version_entry, path, version)
+        return self._artifact_version(entry) if entry else None
+
+    def prune(self) -> int:
+        """
+        Removes session-scoped indexes not written for `max_age_seconds`, then
+        the blobs nothing refers to any more; returns how many indexes.
+        """
+        self._last_prune = time.monotonic()
+        cutoff = time.time() - self.max_age_seconds
+        removed = 0
+        for root, _, names in os.walk(self.index_dir):
+            if os.path.basename(os.path.dirname(root)) != "sessions":
+                continue
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    if os.path.getmtime(path) < cutoff:
+                        os.remove(path)
+                        self._indexes.pop(path, None)
+                        removed += 1
+                except FileNotFoundError:
+                    pass
+            try:
+                if not os.listdir(root):
+                    os.rmdir(root)
+            except OSError:
+                pass  # a concurrent save wrote into it, or removed it first
+        self.artifacts_pruned += removed
+        self.collect_garbage()
+        return removed
+
+    def collect_garbage(self) -> int:
+        """Removes blobs no artifact version refers to; returns how many."""
+        referenced = set()
+        for root, _, names in os.walk(self.index_dir):
+            for name in names:
+                if name.endswith(".json"):
+                    try:
+                        with open(os.path.join(root, name)) as f:
+                            referenced.update(entry["sha256"] for entry in json.load(f))
+                    except FileNotFoundError:
+                        pass
+        removed = 0
+        recent = time.time() - GC_GRACE_SECONDS
+        for root, _, names in os.walk(self.blob_dir):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    if name not in referenced and os.path.getmtime(path) < recent:
+                        os.remove(path)
+                        removed += 1
+                except FileNotFoundError:
+                    pass  # a temp file renamed by a concurrent save
+        return removed
+
+
+# --- Plans ---
+def merge_turn(plan: Optional[dict], request: str, answers: dict, overview: Optional[str]) -> Optional[dict]:
+    """
+    The plan after a turn, given the final answers of the sub-agents that ran
+    in it (agent name -> text) and the root agent's final text. Returns the
+    previous plan object itself when the turn changed nothing.
+
+    A request naming another destination than the plan's starts a new plan
+    when it asks for one (NEW_PLAN_REQUEST) or re-runs more than half of the
+    plan's sections; otherwise its sections update the current plan. In a
+    new plan, revisions keep counting so exports of the old plan are never
+    reused.
+    """
+    sections = {
+        PLAN_SECTIONS[agent]: text for agent, text in answers.items() if agent in PLAN_SECTIONS
+    }
+    if not sections:
+        return plan
+    destination = location_key(request)
+    if plan and destination and plan.get("destination") not in (None, destination):
+        reruns_most = (
+            len(sections) >= MIN_PLAN_SECTIONS and len(sections) * 2 > len(plan["sections"])
+        )
+        if reruns_most or NEW_PLAN_REQUEST.search(request):
+            plan = {**plan, "request": request, "destination": destination, "sections": {}, "overview": None}
+    plan = plan or {
+        "request": request,
+        "destination": destination,
+        "revision": 0,
+        "sections": {},
+        "overview": None,
+    }
+    if destination and not plan.get("destination"):
+        plan = {**plan, "destination": destination}
+    changed = {
+        name: text
+        for name, text in sections.items()
+        if plan["sections"].get(name, {}).get("text") != text
+    }
+    new_overview = overview and (plan["overview"] or {}).get("text") != overview
+    if not changed and not new_overview:
+        return plan
+
+    revision = plan["revision"] + 1
+    merged = {
+        **plan,
+        "revision": revision,
+        "updated": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "sections": {
+            **plan["sections"],
+            **{name: {"text": text, "revision": revision} for name, text in changed.items()},
+        },
+    }
+    if new_overview:
+        merged["overview"] = {"text": overview, "revision": revision}
+    return merged
+
+
+def render_markdown(plan: dict) -> str:
+    """The plan as markdown; the overview is left out once a section is newer."""
+    lines = [f"# Trip plan (revision {plan['revision']})", "", f"> {plan['request']}", ""]
+    overview = plan.get("overview")
+    newest = max(section["revision"] for section in plan["sections"].values())
+    if overview and overview["revision"] >= newest:
+        lines += ["## Overview", "", overview["text"], ""]
+    for name in PLAN_SECTIONS.values():
+        section = plan["sections"].get(name)
+        if section:
+            lines += [f"## {name.capitalize()}", "", section["text"], ""]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _plan_part(plan: dict) -> types.Part:
+    data = json.dumps(plan, indent=2, ensure_ascii=False).encode()
+    return types.Part(inline_data=types.Blob(mime_type="application/json", data=data))
+
+
+class TripPlanPlugin(BasePlugin):
+    """
+    Saves each turn's plan updates as the `trip_plan.json` artifact and
+    answers summary and export requests from it in place of the first agent
+    of the turn.
+    """
+
+    def __init__(self):
+        super().__init__(name="trip_plans")
+        self.plans_saved = 0
+        self.follow_ups_served = 0
+        self._served: set[str] = set()  # invocations answered from a plan
+
+    @staticmethod
+    def _scope(invocation_context) -> dict:
+        return {
+            "app_name": invocation_context.app_name,
+            "user_id": invocation_context.user_id,
+            "session_id": invocation_context.session.id,
+        }
+
+    async def _load_plan(self, invocation_context) -> Optional[dict]:
+        service = invocation_context.artifact_service
+        if service is None:
+            return None
+        part = await service.load_artifact(
+            filename=PLAN_FILENAME, **self._scope(invocation_context)
+        )
+        if part is None or part.inline_data is None:
+            return None
+        return json.loads(part.inline_data.data)
+
+    async def before_agent_callback(self, *, agent, callback_context) -> Optional[types.Content]:
+        # Answering here rather than in before_run keeps the reply authored by
+        # an agent, so the next turn still knows which agent to resume
+        invocation_context = callback_context._invocation_context
+        content = invocation_context.user_content
+        text = "".join(part.text or "" for part in content.parts) if content and content.parts else ""
+        summary = SUMMARY_REQUEST.match(text)
+        export = EXPORT_REQUEST.match(text)
+        if not (summary or export):
+            return None
+        plan = await self._load_plan(invocation_context)
+        if plan is None or len(plan["sections"]) < MIN_PLAN_SECTIONS:
+            return None
+
+        if summary:
+            answer = render_markdown(plan)
+        else:
+            answer = await self._export(invocation_context, plan, export.group("format"))
+        self.follow_ups_served += 1
+        self._served.add(invocation_context.invocation_id)
+        return types.Content(role="model", parts=[types.Part(text=answer)])
+
+    async def _export(self, invocation_context, plan: dict, requested: Optional[str]) -> str:
+        fmt = "json" if requested and requested.lower() == "json" else "markdown"
+        filename, mime_type = EXPORT_FORMATS[fmt]
+        scope = self._scope(invocation_context)
+        service = invocation_context.artifact_service
+        if fmt == "json":
+            # The plan artifact is already the JSON export
+            version = len(await service.list_versions(filename=filename, **scope)) - 1
+            body = json.dumps(plan, indent=2, ensure_ascii=False)
+        else:
+            body = render_markdown(plan)
+            latest = await service.get_artifact_version(filename=filename, **scope)
+            if latest and latest.custom_metadata.get("plan_revision") == plan["revision"]:
+                version = latest.version
+            else:
+                version = await service.save_artifact(
+                    filename=filename,
+                    artifact=types.Part(
+                        inline_data=types.Blob(mime_type=mime_type, data=body.encode())
+                    ),
+                    custom_metadata={"plan_revision": plan["revision"]},
+                    **scope,
+                )
+        return f"Exported as {filename} (version {version}):\n\n{body}"
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        if invocation_context.invocation_id in self._served:
+            self._served.discard(invocation_context.invocation_id)
+            return
+        if invocation_context.artifact_service is None:
+            return
+        answers, overview = {}, None
+        for event in invocation_context.session.events:
+            if event.invocation_id != invocation_context.invocation_id:
+                continue
+            if event.partial or not event.is_final_response() or not event.content:
+                continue
+            text = "".join(part.text for part in event.content.parts or [] if part.text)
+            if not text:
+                continue
+            if event.author in PLAN_SECTIONS:
+                answers[event.author] = text
+            elif event.author == invocation_context.agent.root_agent.name:
+                overview = text
+        if not answers:
+            return
+
+        plan = await self._load_plan(invocation_context)
+        content = invocation_context.user_content
+        request = "".join(part.text or "" for part in content.parts) if content and content.parts else ""
+        merged = merge_turn(plan, request, answers, overview)
+        if merged is plan:
+            return
+        await invocation_context.artifact_service.save_artifact(
+            filename=PLAN_FILENAME,
+            artifact=_plan_part(merged),
+            custom_metadata={"revision": merged["revision"]},
+            **self._scope(invocation_context),
+        )
+        self.plans_saved += 1
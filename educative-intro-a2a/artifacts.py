@@ -0,0 +1,355 @@
+"""
+Disk-backed artifacts for file parts, and a streaming JSON-RPC body reader.
+
+Large file parts never live in memory whole: uploads are written to disk as
+they arrive, and base64 `file.bytes` inside a `message/send` body are decoded
+to disk while the body is read, leaving a small JSON document behind. Echoes
+and task history then carry a `uri` to the stored bytes instead of another
+base64 copy.
+"""
+
+import asyncio
+import base64
+import binascii
+import hmac
+import os
+import re
+import shutil
+import tempfile
+import threading
+import uuid
+import weakref
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, Request
+from fastapi.responses import FileResponse
+
+# Bytes written per file write / decoded per base64 block
+CHUNK_SIZE = 1 << 16
+
+
+class PayloadTooLarge(Exception):
+    pass
+
+
+class InvalidBody(Exception):
+    pass
+
+
+@dataclass
+class Artifact:
+    id: str
+    path: str
+    size: int
+    name: Optional[str] = None
+    mime_type: Optional[str] = None
+
+    def file(self, base_url: str) -> dict:
+        """The A2A FileWithUri object referencing this artifact."""
+        file = {"uri": f"{base_url.rstrip('/')}/artifacts/{self.id}"}
+        if self.name:
+            file["name"] = self.name
+        if self.mime_type:
+            file["mimeType"] = self.mime_type
+        return file
+
+
+class ArtifactWriter:
+    """Writes one artifact in chunks, enforcing the per-file size limit."""
+
+    def __init__(self, store: "ArtifactStore"):
+        self.store = store
+        self.id = uuid.uuid4().hex
+        self.path = os.path.join(store.directory, self.id)
+        self.size = 0
+        self._file = open(self.path, "wb")
+
+    def write(self, data: bytes):
+        self.size += len(data)
+        if self.size > self.store.max_file_bytes:
+            self.abort()
+            raise PayloadTooLarge(f"File exceeds {self.store.max_file_bytes} bytes")
+        self._file.write(data)
+
+    def close(self, name=None, mime_type=None) -> Artifact:
+        self._file.close()
+        return self.store._add(Artifact(self.id, self.path, self.size, name, mime_type))
+
+    def abort(self):
+        self._file.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class Base64Writer:
+    """Decodes base64 fed in arbitrary pieces straight into an ArtifactWriter."""
+
+    def __init__(self, writer: ArtifactWriter):
+        self.writer = writer
+        self._pending = b""
+
+    def feed(self, data: bytes):
+        data = self._pending + data.translate(None, b" \t\r\n")
+        whole = len(data) - len(data) % 4
+        try:
+            self.writer.write(base64.b64decode(data[:whole], validate=True))
+        except binascii.Error as e:
+            raise InvalidBody(f"Invalid base64 in file bytes: {e}")
+        self._pending = data[whole:]
+
+    def close(self) -> ArtifactWriter:
+        if self._pending:
+            raise InvalidBody("Truncated base64 in file bytes")
+        return self.writer
+
+
+class ArtifactStore:
+    """
+    Artifacts as files in a private directory, oldest evicted beyond
+    `max_total_bytes`.
+
+    The directory is created under `parent` (the system temp dir by default)
+    for this store alone, so several agents can share a parent. It is
+    removed on close(), or at exit like a TemporaryDirectory. Only metadata is kept in memory; bytes are streamed from disk
+    on download. Writers may run in worker threads.
+    """
+
+    def __init__(
+        self,
+        parent: Optional[str] = None,
+        max_file_bytes: int = 64 << 20,
+        max_total_bytes: int = 512 << 20,
+    ):
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.directory = tempfile.mkdtemp(prefix="artifacts-", dir=parent)
+        self.max_file_bytes = max_file_bytes
+        self.max_total_bytes = max_total_bytes
+        self.total_bytes = 0
+        self._artifacts: dict[str, Artifact] = {}  # insertion order = age
+        self._lock = threading.Lock()
+        self._cleanup = weakref.finalize(
+            self, shutil.rmtree, self.directory, ignore_errors=True
+        )
+
+    def writer(self) -> ArtifactWriter:
+        return ArtifactWriter(self)
+
+    def _add(self, artifact: Artifact) -> Artifact:
+        with self._lock:
+            self._artifacts[artifact.id] = artifact
+            self.total_bytes += artifact.size
+            while self.total_bytes > self.max_total_bytes and len(self._artifacts) > 1:
+                oldest = self._artifacts.pop(next(iter(self._artifacts)))
+                self.total_bytes -= oldest.size
+                os.remove(oldest.path)
+        return artifact
+
+    def get(self, artifact_id: str) -> Optional[Artifact]:
+        with self._lock:
+            return self._artifacts.get(artifact_id)
+
+    def close(self):
+        """Removes this store's directory and every artifact in it."""
+        with self._lock:
+            self._artifacts.clear()
+            self.total_bytes = 0
+        self._cleanup()
+
+    def save_base64(self, data: str, name=None, mime_type=None) -> Artifact:
+        """Decodes an in-memory base64 string block by block into a new artifact."""
+        writer = Base64Writer(self.writer())
+        try:
+            for i in range(0, len(data), CHUNK_SIZE):
+                try:
+                    piece = data[i : i + CHUNK_SIZE].encode("ascii")
+                except UnicodeEncodeError:
+                    raise InvalidBody("Invalid base64 in file bytes")
+                writer.feed(piece)
+            return writer.close().close(name, mime_type)
+        except BaseException:
+            writer.writer.abort()
+            raise
+
+    async def save_stream(
+        self, chunks: AsyncIterator[bytes], name=None, mime_type=None
+    ) -> Artifact:
+        """Writes `chunks` to a new artifact; file I/O runs off the event loop."""
+        writer = await asyncio.to_thread(self.writer)
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(writer.write, chunk)
+        except BaseException:
+            writer.abort()
+            raise
+        return await asyncio.to_thread(writer.close, name, mime_type)
+
+
+def add_artifact_routes(app, store: ArtifactStore, upload_token: Optional[str] = None):
+    """
+    POST /artifacts streams a request body into the store (name from the
+    `name` query parameter, type from Content-Type) and returns a file
+    object to put in a file part; GET /artifacts/{id} streams it back.
+
+    With `upload_token`, uploads need an `Authorization: Bearer` header
+    carrying it.
+    """
+    expected = f"Bearer {upload_token}".encode() if upload_token else None
+
+    async def upload(request: Request, name: Optional[str] = None):
+        if expected is not None and not hmac.compare_digest(
+            request.headers.get("authorization", "").encode(), expected
+        ):
+            raise HTTPException(status_code=401, detail="Invalid upload token")
+        try:
+            artifact = await store.save_stream(
+                request.stream(), name, request.headers.get("content-type")
+            )
+        except PayloadTooLarge as e:
+            raise HTTPException(status_code=413, detail=str(e))
+        return {**artifact.file(str(request.base_url)), "size": artifact.size}
+
+    async def download(artifact_id: str):
+        artifact = store.get(artifact_id)
+        if artifact is None:
+            raise HTTPException(status_code=404, detail="Artifact not found")
+        return FileResponse(
+            artifact.path,
+            media_type=artifact.mime_type or "application/octet-stream",
+            filename=artifact.name,
+        )
+
+    app.add_api_route("/artifacts", upload, methods=["POST"])
+    app.add_api_route("/artifacts/{artifact_id}", download, methods=["GET"])
+
+
+# --- Streaming JSON-RPC body reader ---
+_STRUCTURE = re.compile(rb'["{}\[\]]')
+
+# Containers from the document root to a file part's `file` object (None for
+# the root object and array elements)
+_FILE_PATH = [None, b"params", b"message", b"parts", None, b"file"]
+
+
+def _string_event(chunk: bytes, pos: int) -> int:
+    """Index of the next quote or backslash, or -1 (memchr beats a regex here)."""
+    quote = chunk.find(b'"', pos)
+    backslash = chunk.find(b"\\", pos, len(chunk) if quote == -1 else quote)
+    return quote if backslash == -1 else backslash
+
+
+class JSONRPCBodyReader:
+    """
+    Reads a JSON-RPC request body chunk by chunk, decoding each
+    params.message.parts[*].file.bytes string to an artifact as it streams.
+
+    Only the JSON structure is tokenized (quotes, backslashes and brackets);
+    base64 runs contain none of them, so they are handed to the decoder a
+    whole chunk at a time. The rest of the body is buffered, up to
+    `max_body_bytes`, with each spooled string replaced by its artifact id.
+    """
+
+    def __init__(self, store: ArtifactStore, max_body_bytes: int):
+        self.store = store
+        self.max_body_bytes = max_body_bytes
+        self.artifacts: dict[str, ArtifactWriter] = {}
+        self._out = bytearray()
+        self._stack = []  # key of each open container
+        self._in_string = False
+        self._escape = False
+        self._spool: Optional[Base64Writer] = None
+        self._string_start = 0
+        self._last_string = None  # short strings only; candidates for keys
+        self._last_string_end = 0
+
+    def _key_before(self, end: int) -> Optional[bytes]:
+        """The key a value starting at `end` belongs to, if any."""
+        between = self._out[self._last_string_end : end]
+        if len(between) < 16 and between.strip() == b":":
+            return self._last_string
+        return None
+
+    def feed(self, chunk: bytes):
+        pos, out = 0, self._out
+        while pos < len(chunk):
+            if self._spool is not None:
+                if self._escape:
+                    # JSON may escape "/" as "\/"; other escapes are whitespace
+                    if chunk[pos : pos + 1] == b"/":
+                        self._spool.feed(b"/")
+                    self._escape = False
+                    pos += 1
+                    continue
+                end = _string_event(chunk, pos)
+                if end == -1:
+                    self._spool.feed(chunk[pos:] if pos else chunk)
+                    break
+                self._spool.feed(chunk[pos:end])
+                if chunk[end] == 0x22:  # closing quote
+                    writer = self._spool.close()
+                    self.artifacts[writer.id] = writer
+                    out += writer.id.encode() + b'"'
+                    self._spool = None
+                    self._last_string = None
+                else:
+                    self._escape = True
+                pos = end + 1
+            elif self._in_string:
+                if self._escape:
+                    out += chunk[pos : pos + 1]
+                    self._escape = False
+                    pos += 1
+                    continue
+                event = _string_event(chunk, pos)
+                end = len(chunk) if event == -1 else event + 1
+                out += chunk[pos:end]
+                if event != -1 and chunk[event] == 0x22:
+                    self._in_string = False
+                    content = out[self._string_start : len(out) - 1]
+                    self._last_string = bytes(content) if len(content) <= 16 else None
+                    self._last_string_end = len(out)
+                elif event != -1:
+                    self._escape = True
+                pos = end
+            else:
+                match = _STRUCTURE.search(chunk, pos)
+                end = match.end() if match else len(chunk)
+                out += chunk[pos:end]
+                pos = end
+                token = match.group() if match else None
+                if token == b'"':
+                    key = self._key_before(len(out) - 1)
+                    if key == b"bytes" and self._stack == _FILE_PATH:
+                        self._spool = Base64Writer(self.store.writer())
+                    else:
+                        self._in_string = True
+                        self._string_start = len(out)
+                elif token in (b"{", b"["):
+                    self._stack.append(self._key_before(len(out) - 1))
+                elif token and self._stack:
+                    self._stack.pop()
+            if len(out) > self.max_body_bytes:
+                raise PayloadTooLarge(f"Request body exceeds {self.max_body_bytes} bytes")
+
+    def close(self) -> bytes:
+        if self._spool is not None or self._in_string or self._stack:
+            raise InvalidBody("Truncated JSON body")
+        return bytes(self._out)
+
+    def abort(self):
+        if self._spool is not None:
+            self._spool.writer.abort()
+        for writer in self.artifacts.values():
+            if not writer._file.closed:
+                writer.abort()
+
+    async def read(self, chunks: AsyncIterator[bytes]) -> bytes:
+        """Feeds `chunks` in a worker thread, keeping decoding and writes off the loop."""
+        try:
+            async for chunk in chunks:
+                await asyncio.to_thread(self.feed, chunk)
+            return self.close()
+        except BaseException:
+            self.abort()
+            raise
@@ -0,0 +1,83 @@
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+from a2a_common.metrics import A2AMetrics, Registry
+
+import echo_agent
+import sdk_echo_agent
+
+
+def message_send():
+    return {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "kind": "message",
+                "messageId": str(uuid.uuid4()),
+                "role": "user",
+                "parts": [{"kind": "text", "text": "Hello A2A world!"}],
+            }
+        },
+    }
+
+
+def recording_cost(calls):
+    """Nanoseconds per A2AMetrics.record call (counter + histogram)."""
+    metrics = A2AMetrics(Registry())
+    start = time.perf_counter()
+    for _ in range(calls):
+        metrics.record("message/send", time.perf_counter(), "ok")
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+async def requests_per_second(app, requests):
+    """Sequential message/send calls against the app in-process (no network)."""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://echo") as client:
+        start = time.perf_counter()
+        for _ in range(requests):
+            response = await client.post("/", json=message_send())
+            response.raise_for_status()
+        return requests / (time.perf_counter() - start)
+
+
+def set_raw_metrics(enabled):
+    echo_agent.METRICS_ENABLED = enabled
+    return echo_agent.app
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Overhead of /metrics recording on the echo agents' request path."
+    )
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"A2AMetrics.record: {recording_cost(200_000):.0f} ns per call\n")
+
+    agents = {
+        "echo_agent.py": set_raw_metrics,
+        "sdk_echo_agent.py": lambda enabled: sdk_echo_agent.create_app(metrics_enabled=enabled),
+    }
+    for name, build in agents.items():
+        rates = {False: [], True: []}
+        # Interleave the variants so drift affects both alike
+        for _ in range(args.rounds):
+            for enabled in (False, True):
+                rates[enabled].append(await requests_per_second(build(enabled), args.requests))
+        off, on = statistics.median(rates[False]), statistics.median(rates[True])
+        print(
+            f"{name:<18} metrics off {off:7.0f} req/s  on {on:7.0f} req/s  "
+            f"overhead {(1 - on / off):+.1%} ({(1 / on - 1 / off) * 1e6:+.1f} µs/request)"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,186 @@
+import argparse
+import base64
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+
+import httpx
+
+PORT = 8010
+
+# How each variant starts its server, and how it sends a file of `size` bytes
+SERVERS = {
+    "echo_agent.py": f"import uvicorn, echo_agent; uvicorn.run(echo_agent.app, port={PORT}, log_level='warning')",
+    "sdk_echo_agent.py": (
+        "import uvicorn, sdk_echo_agent; "
+        f"uvicorn.run(sdk_echo_agent.create_app(), port={PORT}, log_level='warning')"
+    ),
+}
+
+
+def file_bytes(size, chunk=1 << 20):
+    """`size` pseudo-random bytes, generated a chunk at a time."""
+    block = os.urandom(chunk)
+    for offset in range(0, size, chunk):
+        yield block[: min(chunk, size - offset)]
+
+
+def message_body(parts):
+    return {
+        "jsonrpc": "2.0",
+        "id": str(uuid.uuid4()),
+        "method": "message/send",
+        "params": {
+            "message": {
+                "kind": "message",
+                "messageId": str(uuid.uuid4()),
+                "role": "user",
+                "parts": parts,
+            }
+        },
+    }
+
+
+def inline_body(size):
+    """A message/send body with the file inline as base64, streamed in pieces."""
+    placeholder = "@BYTES@"
+    text = json.dumps(
+        message_body(
+            [
+                {"kind": "text", "text": "Here is a file"},
+                {"kind": "file", "file": {"name": "payload.bin", "bytes": placeholder}},
+            ]
+        )
+    )
+    head, tail = text.split(placeholder)
+    yield head.encode()
+    # 3-byte aligned chunks keep the base64 of each chunk free of padding
+    for chunk in file_bytes(size, chunk=3 << 18):
+        yield base64.b64encode(chunk)
+    yield tail.encode()
+
+
+def send_inline(client, size):
+    response = client.post("/", content=inline_body(size))
+    response.raise_for_status()
+    return response.json()
+
+
+def send_upload(client, size):
+    """Streams the file to /artifacts, then sends a message referencing it."""
+    upload = client.post(
+        "/artifacts",
+        params={"name": "payload.bin"},
+        content=file_bytes(size),
+        headers={"Content-Type": "application/octet-stream"},
+    )
+    upload.raise_for_status()
+    file = {k: v for k, v in upload.json().items() if k != "size"}
+    response = client.post(
+        "/", json=message_body([{"kind": "file", "file": file}])
+    )
+    response.raise_for_status()
+    return response.json()
+
+
+VARIANTS = {
+    "echo_agent.py inline": ("echo_agent.py", send_inline),
+    "echo_agent.py upload": ("echo_agent.py", send_upload),
+    "sdk_echo_agent.py inline": ("sdk_echo_agent.py", send_inline),
+}
+
+
+def memory_kib(pid):
+    """(current RSS, peak RSS) of a process in KiB, from /proc."""
+    values = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            key, _, value = line.partition(":")
+            if key in ("VmRSS", "VmHWM"):
+                values[key] = int(value.split()[0])
+    return values["VmRSS"], values["VmHWM"]
+
+
+def start_server(name, max_body_bytes, max_file_bytes):
+    env = {
+        **os.environ,
+        "ECHO_AGENT_MAX_BODY_BYTES": str(max_body_bytes),
+        # The 100 MB runs exceed the default per-file limit
+        "ECHO_AGENT_MAX_FILE_BYTES": str(max_file_bytes),
+    }
+    env.pop("ECHO_AGENT_UPLOAD_TOKEN", None)
+    server = subprocess.Popen(
+        [sys.executable, "-c", SERVERS[name]], cwd=os.path.dirname(os.path.abspath(__file__)), env=env
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://localhost:{PORT}/.well-known/agent-card.json")
+            return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError(f"{name} did not start")
+
+
+def run(variant, size, repeat, max_body_bytes):
+    server_name, send = VARIANTS[variant]
+    server = start_server(server_name, max_body_bytes, size)
+    try:
+        baseline, _ = memory_kib(server.pid)
+        seconds = []
+        with httpx.Client(base_url=f"http://localhost:{PORT}", timeout=600) as client:
+            for _ in range(repeat):
+                start = time.perf_counter()
+                result = send(client, size)
+                seconds.append(time.perf_counter() - start)
+                if "error" in result:
+                    raise RuntimeError(result["error"]["message"])
+        current, peak = memory_kib(server.pid)
+        return statistics.median(seconds), baseline, current, peak
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Server RSS and throughput of file parts from 1 MB to 100 MB."
+    )
+    parser.add_argument("--sizes", nargs="+", type=float, default=[1, 10, 100], help="MB")
+    parser.add_argument("--variants", nargs="+", choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--max-body-bytes",
+        type=int,
+        default=8 << 20,
+        help="ECHO_AGENT_MAX_BODY_BYTES for echo_agent.py",
+    )
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/status"):
+        sys.exit("❌ Reading server RSS needs /proc (Linux)")
+
+    print(f"{'variant':<26} {'size':>7} {'MB/s':>8} {'RSS idle':>10} {'peak':>10} {'peak Δ':>10}")
+    for variant in args.variants:
+        for size_mb in args.sizes:
+            size = int(size_mb * 1_000_000)
+            try:
+                seconds, baseline, current, peak = run(
+                    variant, size, args.repeat, args.max_body_bytes
+                )
+            except (RuntimeError, httpx.HTTPError) as e:
+                print(f"{variant:<26} {size_mb:>5g}MB  ❌ {e}")
+                continue
+            print(
+                f"{variant:<26} {size_mb:>5g}MB {size / seconds / 1e6:>8.1f} "
+                f"{baseline / 1024:>8.1f}MB {peak / 1024:>8.1f}MB {(peak - baseline) / 1024:>8.1f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
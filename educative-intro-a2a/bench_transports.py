@@ -0,0 +1,103 @@
+import argparse
+import asyncio
+import time
+import uuid
+
+import httpx
+from a2a.client import ClientConfig, ClientFactory
+from a2a.types import AgentCard, Message, Part, Role, TextPart, TransportProtocol
+
+from simple_a2a_client_sdk import grpc_channel
+
+PORT = 8000
+
+PAYLOADS = {
+    "small": 32,
+    "large": 256 * 1024,
+}
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def create_client(agent_card, transport, httpx_client):
+    """SDK client restricted to one transport."""
+    config = ClientConfig(
+        streaming=False,
+        supported_transports=[transport],
+        httpx_client=httpx_client,
+        grpc_channel_factory=grpc_channel,
+    )
+    return ClientFactory(config).create(agent_card)
+
+
+async def send(client, text):
+    message = Message(
+        message_id=str(uuid.uuid4()),
+        role=Role.user,
+        parts=[Part(root=TextPart(text=text))],
+    )
+    async for _ in client.send_message(message):
+        pass
+
+
+async def run(client, text, requests, concurrency):
+    """Latencies of `requests` messages sent by `concurrency` workers, and the wall time."""
+    latencies = []
+    remaining = iter(range(requests))
+
+    async def worker():
+        for _ in remaining:
+            start = time.perf_counter()
+            await send(client, text)
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return latencies, time.perf_counter() - start
+
+
+async def main():
+    parser = argparse.ArgumentParser(
+        description="Compare JSON-RPC and gRPC latency and throughput against sdk_echo_agent.py."
+    )
+    parser.add_argument("--url", default=f"http://localhost:{PORT}")
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=20)
+    args = parser.parse_args()
+
+    async with httpx.AsyncClient(timeout=30) as httpx_client:
+        response = await httpx_client.get(f"{args.url}/.well-known/agent-card.json")
+        agent_card = AgentCard.model_validate(response.json())
+
+        print(f"{args.requests} messages, {args.concurrency} concurrent\n")
+        print(
+            f"{'transport':<10} {'payload':<18} {'p50':>9} {'p99':>9} {'msgs/s':>8}"
+        )
+        for transport in (TransportProtocol.jsonrpc, TransportProtocol.grpc):
+            client = create_client(agent_card, transport, httpx_client)
+            try:
+                for name, size in PAYLOADS.items():
+                    text = "x" * size
+                    await run(client, text, args.warmup, 1)
+                    latencies, elapsed = await run(
+                        client, text, args.requests, args.concurrency
+                    )
+                    print(
+                        f"{transport.value:<10} {f'{name} ({size} B)':<18} "
+                        f"{percentile(latencies, 50) * 1000:7.2f}ms "
+                        f"{percentile(latencies, 99) * 1000:7.2f}ms "
+                        f"{args.requests / elapsed:8.0f}"
+                    )
+            finally:
+                # Closes the gRPC channel; the shared httpx client stays open
+                if transport == TransportProtocol.grpc:
+                    await client.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,16 +1,111 @@
+import asyncio
+import json
+import os
+import time
 import uuid
+from contextlib import asynccontextmanager
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
-from fastapi import FastAPI
-from pydantic import BaseModel
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
 
-app = FastAPI()
+from a2a_common.metrics import CONTENT_TYPE, A2AMetrics, Registry
+from a2a_common.webhooks import WebhookNotAllowed, WebhookPolicy, check_webhook_url
+from artifacts import (
+    ArtifactStore,
+    InvalidBody,
+    JSONRPCBodyReader,
+    PayloadTooLarge,
+    add_artifact_routes,
+)
+
+# Background workers executing non-blocking tasks, and how many accepted tasks
+# may wait for them before new ones are rejected
+WORKERS = int(os.getenv("ECHO_AGENT_WORKERS", "4"))
+MAX_QUEUED_TASKS = int(os.getenv("ECHO_AGENT_MAX_QUEUED_TASKS", "1000"))
+
+# Finished tasks stay available to tasks/get for this long, and at most this
+# many are kept (oldest finished dropped first)
+TASK_TTL_SECONDS = float(os.getenv("ECHO_AGENT_TASK_TTL", "3600"))
+MAX_STORED_TASKS = int(os.getenv("ECHO_AGENT_MAX_STORED_TASKS", "10000"))
+
+# Webhooks only go to public addresses, plus the hosts listed in
+# ECHO_AGENT_WEBHOOK_ALLOWED_HOSTS (e.g. "localhost:9000" for webhook_receiver.py);
+# ECHO_AGENT_WEBHOOK_ALLOW_PRIVATE=1 accepts any host, for trusted networks only
+webhook_policy = WebhookPolicy.from_env("ECHO_AGENT")
+
+# Simulated work per task, to stand in for a long-running agent
+WORK_SECONDS = float(os.getenv("ECHO_AGENT_WORK_SECONDS", "0"))
+
+# Request bodies are buffered up to this size once inline file bytes have
+# been decoded to disk; single files (inline or uploaded) up to the next one,
+# and all stored files up to the last one (oldest evicted first)
+MAX_BODY_BYTES = int(os.getenv("ECHO_AGENT_MAX_BODY_BYTES", str(8 << 20)))
+MAX_FILE_BYTES = int(os.getenv("ECHO_AGENT_MAX_FILE_BYTES", str(64 << 20)))
+MAX_ARTIFACT_BYTES = int(os.getenv("ECHO_AGENT_MAX_ARTIFACT_BYTES", str(512 << 20)))
+
+# POST /artifacts requires "Authorization: Bearer <token>" when set
+UPLOAD_TOKEN = os.getenv("ECHO_AGENT_UPLOAD_TOKEN") or None
+
+# Bytes of file parts, referenced by URI from messages and task history; kept
+# in a directory of their own under ECHO_AGENT_ARTIFACT_DIR (default: temp dir)
+artifact_store = ArtifactStore(
+    os.getenv("ECHO_AGENT_ARTIFACT_DIR") or None,
+    max_file_bytes=MAX_FILE_BYTES,
+    max_total_bytes=MAX_ARTIFACT_BYTES,
+)
+
+# Tasks by id, so clients can poll them with tasks/get
+tasks = {}
+finished_at = {}  # task id -> monotonic time it finished, oldest first
+task_queue: asyncio.Queue = asyncio.Queue(maxsize=MAX_QUEUED_TASKS)
+busy_workers = 0
+
+# --- Metrics (served at /metrics; set ECHO_AGENT_METRICS=0 to turn off) ---
+METRICS_ENABLED = os.getenv("ECHO_AGENT_METRICS", "1") != "0"
+registry = Registry()
+a2a_metrics = A2AMetrics(registry)
+registry.gauge("a2a_task_store_tasks", "Tasks held for tasks/get.", lambda: len(tasks))
+registry.gauge(
+    "a2a_event_queue_depth", "Accepted tasks waiting for a worker.", task_queue.qsize
+)
+registry.gauge("a2a_active_tasks", "Tasks being executed by a worker.", lambda: busy_workers)
+push_notifications = registry.counter(
+    "a2a_push_notifications_total", "Webhook calls by outcome.", ("outcome",)
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    # One HTTP client shared by all workers for webhook calls
+    async with httpx.AsyncClient(timeout=10) as client:
+        workers = [asyncio.create_task(task_worker(client)) for _ in range(WORKERS)]
+        yield
+        for worker in workers:
+            worker.cancel()
+
+
+app = FastAPI(lifespan=lifespan)
+add_artifact_routes(app, artifact_store, UPLOAD_TOKEN)
+
+
+class FileContent(BaseModel):
+    name: Optional[str] = None
+    mimeType: Optional[str] = None
+    uri: Optional[str] = None
+    # Inline base64; replaced by a `uri` to the artifact store on arrival
+    bytes: Optional[str] = None
 
 
 class Part(BaseModel):
     kind: str
-    text: str = None
+    text: Optional[str] = None
+    file: Optional[FileContent] = None
+    data: Optional[Dict[str, Any]] = None
+    metadata: Optional[Dict[str, Any]] = None
 
 
 class Message(BaseModel):
@@ -20,8 +115,21 @@ class Message(BaseModel):
     parts: List[Part]
 
 
+class PushNotificationConfig(BaseModel):
+    url: str
+    token: Optional[str] = None
+
+
+class MessageSendConfiguration(BaseModel):
+    blocking: bool = True
+    pushNotificationConfig: Optional[PushNotificationConfig] = None
+
+
 class MessageParams(BaseModel):
-    message: Message
+    message: Optional[Message] = None
+    configuration: Optional[MessageSendConfiguration] = None
+    # tasks/get
+    id: Optional[str] = None
 
 
 class JSONRPCRequest(BaseModel):
@@ -49,9 +157,9 @@ def agent_card():
                 "examples": ["Hello", "How are you?"],
             }
         ],
-        "capabilities": {"streaming": False},
-        "defaultInputModes": ["text/plain"],
-        "defaultOutputModes": ["text/plain"],
+        "capabilities": {"streaming": False, "pushNotifications": True},
+        "defaultInputModes": ["text/plain", "application/json", "*/*"],
+        "defaultOutputModes": ["text/plain", "application/json", "*/*"],
     }
 
 
@@ -60,44 +168,212 @@ def hello():
     return {"message": "Hello from our A2A agent!"}
 
 
+def echo_reply(user_message):
+    """
+    Echoes a (dumped) user message. File and data parts are echoed by
+    reference: the reply shares the user message's `file` and `data` objects,
+    so nothing is copied or re-encoded.
+    """
+    texts = [part["text"] for part in user_message["parts"] if part.get("text") is not None]
+    user_text = texts[0] if texts else "No text"
+    parts = [{"kind": "text", "text": f"You said: '{user_text}'"}]
+    for part in user_message["parts"]:
+        if part.get("file") is not None:
+            parts.append({"kind": "file", "file": part["file"]})
+        elif part.get("data") is not None:
+            parts.append({"kind": "data", "data": part["data"]})
+    return {
+        "kind": "message",
+        "messageId": str(uuid.uuid4()),
+        "role": "agent",
+        "parts": parts,
+    }
+
+
+def set_state(task, state):
+    task["status"] = {
+        "state": state,
+        "timestamp": datetime.utcnow().isoformat() + "Z",
+    }
+
+
+def evict_tasks():
+    """Drops finished tasks past TASK_TTL_SECONDS, then the oldest beyond MAX_STORED_TASKS."""
+    expired_before = time.monotonic() - TASK_TTL_SECONDS
+    for task_id, finished in list(finished_at.items()):
+        if finished > expired_before and len(tasks) <= MAX_STORED_TASKS:
+            break
+        del finished_at[task_id]
+        tasks.pop(task_id, None)
+
+
+async def notify(client, task, push_config):
+    headers = {}
+    if push_config.token:
+        headers["X-A2A-Notification-Token"] = push_config.token
+    try:
+        # Checked again: the host may resolve elsewhere than when it was registered
+        await check_webhook_url(push_config.url, webhook_policy)
+        response = await client.post(push_config.url, json=task, headers=headers)
+        response.raise_for_status()
+        push_notifications.inc("ok")
+    except Exception as e:
+        # Bad URLs included; the result stays available through tasks/get
+        push_notifications.inc("error")
+        print(f"⚠️ Webhook {push_config.url} failed for task {task['id']}: {e}")
+
+
+async def task_worker(client):
+    """Executes queued tasks and POSTs each finished task to its webhook."""
+    global busy_workers
+    while True:
+        task, push_config = await task_queue.get()
+        busy_workers += 1
+        try:
+            try:
+                set_state(task, "working")
+                await asyncio.sleep(WORK_SECONDS)
+                task["history"].append(echo_reply(task["history"][0]))
+                set_state(task, "completed")
+            except Exception as e:
+                # One bad task must not take its worker down with it
+                set_state(task, "failed")
+                print(f"⚠️ Task {task['id']} failed: {e!r}")
+            if push_config:
+                await notify(client, task, push_config)
+        finally:
+            store_finished(task)
+            busy_workers -= 1
+            task_queue.task_done()
+
+
+@app.get("/metrics")
+def metrics():
+    return Response(registry.render(), media_type=CONTENT_TYPE)
+
+
+def jsonrpc_error(code, message, status_code=200, request_id=None):
+    return JSONResponse(
+        {"jsonrpc": "2.0", "id": request_id, "error": {"code": code, "message": message}},
+        status_code=status_code,
+    )
+
+
+async def read_request(http_request: Request) -> JSONRPCRequest:
+    """
+    Parses the JSON-RPC body as it streams in. Inline file bytes go straight
+    to the artifact store and are replaced by a `uri`, so memory per request
+    stays within MAX_BODY_BYTES whatever the file sizes.
+    """
+    reader = JSONRPCBodyReader(artifact_store, MAX_BODY_BYTES)
+    body = json.loads(await reader.read(http_request.stream()))
+    try:
+        params = body.get("params") or {}
+        message = params.get("message") or {}
+        for part in message.get("parts") or []:
+            file = part.get("file") if isinstance(part, dict) else None
+            writer = reader.artifacts.pop(file.get("bytes"), None) if file else None
+            if writer:
+                artifact = writer.close(file.get("name"), file.get("mimeType"))
+                part["file"] = artifact.file(str(http_request.base_url))
+    finally:
+        reader.abort()  # only files that never made it into a part
+    return JSONRPCRequest.model_validate(body)
+
+
 @app.post("/")
-def handle_message(request: JSONRPCRequest):
+async def handle_message(http_request: Request):
     """A2A Message Handler"""
+    start = time.perf_counter()
+    try:
+        request = await read_request(http_request)
+    except PayloadTooLarge as e:
+        return jsonrpc_error(-32600, str(e), status_code=413)
+    except (ValidationError, AttributeError):
+        return jsonrpc_error(-32600, "Invalid request")
+    except (InvalidBody, ValueError) as e:
+        return jsonrpc_error(-32700, f"Parse error: {e}")
+
+    if not METRICS_ENABLED:
+        return await dispatch(request)
+
+    response = await dispatch(request)
+    # Unknown methods share one label so clients cannot grow the series
+    method = request.method if request.method in ("message/send", "tasks/get") else "other"
+    a2a_metrics.record(method, start, "error" if "error" in response else "ok")
+    return response
+
+
+def store_finished(task):
+    tasks[task["id"]] = task
+    finished_at[task["id"]] = time.monotonic()
+    evict_tasks()
+
+
+async def dispatch(request: JSONRPCRequest):
+    if request.method == "tasks/get":
+        task = tasks.get(request.params.id)
+        if task is None:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.id,
+                "error": {"code": -32001, "message": "Task not found"},
+            }
+        return {"jsonrpc": "2.0", "id": request.id, "result": task}
+
     # Validate the method
-    if request.method != "message/send":
+    if request.method != "message/send" or request.params.message is None:
         return {
             "jsonrpc": "2.0",
             "id": request.id,
             "error": {"code": -32601, "message": "Method not found"},
         }
 
-    # Extract the user's message
-    user_message = request.params.message
-    user_text = user_message.parts[0].text if user_message.parts else "No text"
+    # File parts only carry references by now; history keeps the message as sent
+    user_message = request.params.message.model_dump(exclude_none=True)
+    configuration = request.params.configuration or MessageSendConfiguration()
 
-    # Create our A2A response as a completed task
     task = {
         "kind": "task",
         "id": str(uuid.uuid4()),
         "contextId": str(uuid.uuid4()),
-        "status": {
-            "state": "completed",
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-        },
-        "history": [
-            # Include the original user message
-            user_message.dict(),
-            # Add our agent response
-            {
-                "kind": "message",
-                "messageId": str(uuid.uuid4()),
-                "role": "agent",
-                "parts": [{"kind": "text", "text": f"You said: '{user_text}'"}],
-            },
-        ],
+        # Include the original user message
+        "history": [user_message],
     }
 
-    return {"jsonrpc": "2.0", "id": request.id, "result": task}
+    if configuration.blocking:
+        # Answer right away with the completed task, also kept for tasks/get
+        task["history"].append(echo_reply(user_message))
+        set_state(task, "completed")
+        store_finished(task)
+        return {"jsonrpc": "2.0", "id": request.id, "result": task}
+
+    push_config = configuration.pushNotificationConfig
+    if push_config:
+        try:
+            await check_webhook_url(push_config.url, webhook_policy)
+        except WebhookNotAllowed as e:
+            return {
+                "jsonrpc": "2.0",
+                "id": request.id,
+                "error": {"code": -32602, "message": str(e)},
+            }
+
+    # Non-blocking: accept the task, run it in the background and push the
+    # result to the client's webhook (or let the client poll with tasks/get)
+    set_state(task, "submitted")
+    try:
+        task_queue.put_nowait((task, push_config))
+    except asyncio.QueueFull:
+        return {
+            "jsonrpc": "2.0",
+            "id": request.id,
+            "error": {"code": -32000, "message": "Too many queued tasks, retry later"},
+        }
+    tasks[task["id"]] = task
+    # Snapshot: the worker keeps updating the stored task
+    submitted = {**task, "history": list(task["history"])}
+    return {"jsonrpc": "2.0", "id": request.id, "result": submitted}
 
 
 if __name__ == "__main__":
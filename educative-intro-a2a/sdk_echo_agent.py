@@ -1,18 +1,47 @@
 # Core A2A types for defining agent capabilities
 # For running the server
+import asyncio
+import os
+from contextlib import asynccontextmanager
+
+import grpc
 import uvicorn
+from a2a.grpc import a2a_pb2_grpc
 from a2a.server.agent_execution.agent_executor import AgentExecutor
 
 # Server framework components
 from a2a.server.apps.jsonrpc.fastapi_app import A2AFastAPIApplication
 from a2a.server.request_handlers.default_request_handler import DefaultRequestHandler
+from a2a.server.request_handlers.grpc_handler import GrpcHandler
 from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
-from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    AgentInterface,
+    AgentSkill,
+    DataPart,
+    FilePart,
+    FileWithBytes,
+    FileWithUri,
+    Part,
+    TextPart,
+    TransportProtocol,
+)
 
 # Message utilities
-from a2a.utils.message import new_agent_text_message
+from a2a.utils.message import new_agent_parts_message, new_agent_text_message
+from starlette.responses import Response
+
+from a2a_common.metrics import CONTENT_TYPE, A2AMetrics, InstrumentedRequestHandler, Registry
+from artifacts import ArtifactStore, add_artifact_routes
 
 PORT = 8000
+GRPC_PORT = 50051
+
+# File part limits and upload token, configured like echo_agent.py's
+MAX_FILE_BYTES = int(os.getenv("ECHO_AGENT_MAX_FILE_BYTES", str(64 << 20)))
+MAX_ARTIFACT_BYTES = int(os.getenv("ECHO_AGENT_MAX_ARTIFACT_BYTES", str(512 << 20)))
+UPLOAD_TOKEN = os.getenv("ECHO_AGENT_UPLOAD_TOKEN") or None
 
 # Define the agent's skill using real SDK classes
 echo_skill = AgentSkill(
@@ -21,8 +50,8 @@ echo_skill = AgentSkill(
     description="Repeats whatever you say back to you.",
     tags=["echo", "simple", "demo"],
     examples=["Hello there!", "How are you doing?", "Echo this message back to me."],
-    input_modes=["text/plain"],
-    output_modes=["text/plain"],
+    input_modes=["text/plain", "application/json", "*/*"],
+    output_modes=["text/plain", "application/json", "*/*"],
 )
 
 # Define agent capabilities
@@ -38,9 +67,15 @@ agent_card = AgentCard(
     version="1.0.0",
     protocol_version="0.3.0",
     skills=[echo_skill],
-    default_input_modes=["text/plain"],
-    default_output_modes=["text/plain"],
+    default_input_modes=["text/plain", "application/json", "*/*"],
+    default_output_modes=["text/plain", "application/json", "*/*"],
     capabilities=capabilities,
+    # JSON-RPC stays the default; clients that speak gRPC can pick it instead
+    preferred_transport=TransportProtocol.jsonrpc,
+    additional_interfaces=[
+        AgentInterface(transport=TransportProtocol.jsonrpc, url=f"http://localhost:{PORT}"),
+        AgentInterface(transport=TransportProtocol.grpc, url=f"localhost:{GRPC_PORT}"),
+    ],
 )
 
 
@@ -48,8 +83,36 @@ class EchoAgentExecutor(AgentExecutor):
     """
     Business logic implementation using the real A2A SDK AgentExecutor.
     The SDK handles all protocol complexity for us.
+
+    File parts are echoed as references: inline bytes are stored once in
+    `artifact_store` and the reply carries a URI to them, not a second
+    base64 copy. Data parts are echoed as the same objects.
     """
 
+    def __init__(self, artifact_store: ArtifactStore):
+        self.artifact_store = artifact_store
+
+    async def echo_files_and_data(self, message):
+        """Reply parts referencing the message's file and data parts."""
+        parts = []
+        for part in message.parts if message else []:
+            if isinstance(part.root, FilePart):
+                file = part.root.file
+                if isinstance(file, FileWithBytes):
+                    # Decoding megabytes is CPU work; keep it off the event loop
+                    artifact = await asyncio.to_thread(
+                        self.artifact_store.save_base64, file.bytes, file.name, file.mime_type
+                    )
+                    file = FileWithUri(
+                        uri=f"{agent_card.url}/artifacts/{artifact.id}",
+                        name=file.name,
+                        mime_type=file.mime_type,
+                    )
+                parts.append(Part(root=FilePart(file=file)))
+            elif isinstance(part.root, DataPart):
+                parts.append(part)
+        return parts
+
     async def execute(self, context, event_queue):
         """
         Execute the echo logic using the SDK pattern.
@@ -61,9 +124,10 @@ class EchoAgentExecutor(AgentExecutor):
         try:
             # Get the user's input - this returns a string with all text parts combined
             user_text = context.get_user_input()
+            attachments = await self.echo_files_and_data(context.message)
 
-            # Handle the case where no text was found
-            if not user_text or user_text.strip() == "":
+            # Handle the case where no text (and no file or data) was found
+            if not attachments and (not user_text or user_text.strip() == ""):
                 # Create an error message using the SDK utility
                 error_message = new_agent_text_message(
                     "I didn't receive any text to echo. Please send me a message with text content."
@@ -72,7 +136,10 @@ class EchoAgentExecutor(AgentExecutor):
                 return
 
             # Create and enqueue the echo response using the SDK utility
-            echo_message = new_agent_text_message(f"You said: '{user_text.strip()}'")
+            echo_text = f"You said: '{user_text.strip() or 'No text'}'"
+            echo_message = new_agent_parts_message(
+                [Part(root=TextPart(text=echo_text)), *attachments]
+            )
             await event_queue.enqueue_event(echo_message)
 
         except Exception as e:
@@ -96,31 +163,78 @@ class EchoAgentExecutor(AgentExecutor):
         await event_queue.enqueue_event(cancel_message)
 
 
-def create_app():
-    """Create and configure the A2A application using real SDK components."""
+def create_grpc_server(request_handler):
+    """Create a gRPC server for the same request handler as the HTTP app."""
+    server = grpc.aio.server()
+    a2a_pb2_grpc.add_A2AServiceServicer_to_server(
+        GrpcHandler(agent_card=agent_card, request_handler=request_handler), server
+    )
+    server.add_insecure_port(f"[::]:{GRPC_PORT}")
+    return server
 
-    # Create the agent executor
-    executor = EchoAgentExecutor()
+
+def create_app(metrics_enabled=True):
+    """
+    Create and configure the A2A application using real SDK components.
+
+    The app serves JSON-RPC over HTTP and, for its lifetime, gRPC on
+    GRPC_PORT; both transports share one request handler and task store.
+    With `metrics_enabled`, calls on either transport are recorded and
+    served in Prometheus format at /metrics.
+    """
+
+    # Create the agent executor; file bytes are kept on disk and served at /artifacts
+    artifact_store = ArtifactStore(
+        os.getenv("ECHO_AGENT_ARTIFACT_DIR") or None,
+        max_file_bytes=MAX_FILE_BYTES,
+        max_total_bytes=MAX_ARTIFACT_BYTES,
+    )
+    executor = EchoAgentExecutor(artifact_store)
 
     # Create task store for managing task state
     task_store = InMemoryTaskStore()
 
     # Create the request handler that coordinates everything
-    request_handler = DefaultRequestHandler(
-        agent_executor=executor, task_store=task_store
-    )
+    registry = Registry()
+    if metrics_enabled:
+        request_handler = InstrumentedRequestHandler(
+            agent_executor=executor, task_store=task_store, metrics=A2AMetrics(registry)
+        )
+        request_handler.register_gauges(registry)
+    else:
+        request_handler = DefaultRequestHandler(
+            agent_executor=executor, task_store=task_store
+        )
+
+    # Run the gRPC server in the same event loop as the HTTP app
+    @asynccontextmanager
+    async def lifespan(app):
+        grpc_server = create_grpc_server(request_handler)
+        await grpc_server.start()
+        yield
+        await grpc_server.stop(grace=1)
 
     # Create the A2A FastAPI application
     app = A2AFastAPIApplication(agent_card=agent_card, http_handler=request_handler)
 
-    # Build and return the configured FastAPI app
-    return app.build()
+    # Build the configured FastAPI app and expose the metrics
+    app = app.build(lifespan=lifespan)
+    add_artifact_routes(app, artifact_store, UPLOAD_TOKEN)
+    if metrics_enabled:
+        app.add_api_route(
+            "/metrics",
+            lambda: Response(registry.render(), media_type=CONTENT_TYPE),
+            methods=["GET"],
+        )
+    return app
 
 
 if __name__ == "__main__":
     print("🚀 Starting A2A SDK Echo Agent...")
     print(f"📡 Agent Card: http://localhost:{PORT}/.well-known/agent-card.json")
     print(f"🔗 A2A Endpoint: http://localhost:{PORT}/")
+    print(f"⚡ gRPC Endpoint: localhost:{GRPC_PORT}")
+    print(f"📊 Metrics: http://localhost:{PORT}/metrics")
 
     app = create_app()
 
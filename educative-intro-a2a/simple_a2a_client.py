@@ -1,9 +1,31 @@
+import argparse
+import mimetypes
+import os
 import requests
 import uuid
 import json
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Send one message to the echo agent.")
+    parser.add_argument(
+        "--webhook",
+        help="don't wait for the result; the agent POSTs the finished task here "
+        "(e.g. http://localhost:9000/webhook from webhook_receiver.py)",
+    )
+    parser.add_argument("--token", help="token the agent sends back with the notification")
+    parser.add_argument(
+        "--file",
+        help="attach a file; it is streamed to the agent's /artifacts first and "
+        "sent as a URI, so large files never travel as base64",
+    )
+    parser.add_argument(
+        "--upload-token",
+        default=os.getenv("ECHO_AGENT_UPLOAD_TOKEN"),
+        help="token for /artifacts when the agent sets ECHO_AGENT_UPLOAD_TOKEN",
+    )
+    args = parser.parse_args()
+
     # Step 1: Discover the Agent
     base_url = "http://localhost:8000"
     print("🔍 Discovering A2A agent...")
@@ -15,6 +37,30 @@ def main():
         print(f"❌ Discovery failed: {e}")
         return
 
+    parts = [{"kind": "text", "text": "Hello A2A world!"}]
+    if args.file:
+        name = os.path.basename(args.file)
+        mime_type = mimetypes.guess_type(name)[0] or "application/octet-stream"
+        print(f"\n📤 Uploading {name} ({os.path.getsize(args.file):,} bytes)...")
+        try:
+            # A file object is sent in chunks, not read into memory
+            headers = {"Content-Type": mime_type}
+            if args.upload_token:
+                headers["Authorization"] = f"Bearer {args.upload_token}"
+            with open(args.file, "rb") as f:
+                upload = requests.post(
+                    f"{base_url}/artifacts",
+                    params={"name": name},
+                    data=f,
+                    headers=headers,
+                )
+            upload.raise_for_status()
+        except requests.RequestException as e:
+            print(f"❌ Upload failed: {e}")
+            return
+        file = {k: v for k, v in upload.json().items() if k != "size"}
+        parts.append({"kind": "file", "file": file})
+
     # Step 2: Send a Message using A2A JSON-RPC
     print("\n💬 Sending message...")
 
@@ -27,11 +73,24 @@ def main():
                 "kind": "message",
                 "messageId": str(uuid.uuid4()),
                 "role": "user",
-                "parts": [{"kind": "text", "text": "Hello A2A world!"}],
+                "parts": parts,
             }
         },
     }
 
+    if args.webhook:
+        if not agent_card.get("capabilities", {}).get("pushNotifications"):
+            print("❌ Agent does not support push notifications")
+            return
+        # Ask the agent to accept the task and notify us when it's done
+        push_config = {"url": args.webhook}
+        if args.token:
+            push_config["token"] = args.token
+        message["params"]["configuration"] = {
+            "blocking": False,
+            "pushNotificationConfig": push_config,
+        }
+
     try:
         response = requests.post(base_url, json=message).json()
     except requests.RequestException as e:
@@ -43,11 +102,17 @@ def main():
         task = response["result"]
         print(f"📋 Task Status: {task['status']['state']}")
 
+        if args.webhook:
+            print(f"📬 Task {task['id']} accepted, the result will be sent to {args.webhook}")
+
         # Find agent's reply in history
         for msg in task.get("history", []):
             if msg.get("role") == "agent":
                 agent_reply = msg["parts"][0]["text"]
                 print(f"🤖 Agent: {agent_reply}")
+                for part in msg["parts"][1:]:
+                    if part["kind"] == "file":
+                        print(f"📎 File: {part['file']['uri']}")
                 break
     else:
         error = response.get("error", {})
@@ -1,10 +1,85 @@
+import asyncio
 import uuid
 
+import grpc
 import requests
+from a2a.client import ClientConfig, ClientFactory
+from a2a.types import AgentCard, Message, Part, Role, TextPart, TransportProtocol
 
 PORT = 8000
 
 
+class LowercaseMetadataInterceptor(
+    grpc.aio.UnaryUnaryClientInterceptor, grpc.aio.UnaryStreamClientInterceptor
+):
+    """
+    Lowercases metadata keys before a call goes out.
+
+    The SDK's gRPC transport sends its extensions header as "X-A2A-Extensions",
+    but gRPC only accepts lowercase metadata keys.
+    """
+
+    def _lowercase(self, details):
+        if details.metadata:
+            metadata = grpc.aio.Metadata(
+                *((key.lower(), value) for key, value in details.metadata)
+            )
+            details = details._replace(metadata=metadata)
+        return details
+
+    async def intercept_unary_unary(self, continuation, details, request):
+        return await continuation(self._lowercase(details), request)
+
+    async def intercept_unary_stream(self, continuation, details, request):
+        return await continuation(self._lowercase(details), request)
+
+
+def grpc_channel(url):
+    """Channel factory for the SDK client's gRPC transport."""
+    return grpc.aio.insecure_channel(url, interceptors=[LowercaseMetadataInterceptor()])
+
+
+def offers_grpc(agent_card):
+    """Whether the agent card advertises a gRPC interface."""
+    if agent_card.get("preferredTransport") == TransportProtocol.grpc:
+        return True
+    return any(
+        interface.get("transport") == TransportProtocol.grpc
+        for interface in agent_card.get("additionalInterfaces") or []
+    )
+
+
+async def send_over_grpc(agent_card, text):
+    """Send one message through the SDK client over gRPC and return the reply text."""
+    config = ClientConfig(
+        streaming=False,
+        supported_transports=[TransportProtocol.grpc],
+        grpc_channel_factory=grpc_channel,
+    )
+    client = ClientFactory(config).create(AgentCard.model_validate(agent_card))
+    message = Message(
+        message_id=str(uuid.uuid4()),
+        role=Role.user,
+        parts=[Part(root=TextPart(text=text))],
+    )
+
+    reply = None
+    try:
+        async for event in client.send_message(message):
+            # The SDK agent answers with a Message; a (Task, update) tuple is
+            # also possible for task-based agents
+            if isinstance(event, Message):
+                reply = event.parts[0].root.text
+            else:
+                task, _ = event
+                for msg in task.history or []:
+                    if msg.role == Role.agent:
+                        reply = msg.parts[0].root.text
+    finally:
+        await client.close()
+    return reply
+
+
 def main():
     # Step 1: Discover the Agent
     base_url = f"http://localhost:{PORT}"
@@ -17,6 +92,17 @@ def main():
         print(f"❌ Discovery failed: {e}")
         return
 
+    # Step 2a: Prefer gRPC when the agent offers it
+    if offers_grpc(agent_card):
+        print("\n⚡ Agent offers gRPC, sending message over gRPC...")
+        try:
+            agent_reply = asyncio.run(send_over_grpc(agent_card, "Hello A2A world!"))
+            print(f"🤖 Agent: {agent_reply}")
+            print("\n✨ A2A communication complete!")
+            return
+        except Exception as e:
+            print(f"⚠️ gRPC failed ({e}), falling back to JSON-RPC")
+
     # Step 2: Send a Message using A2A JSON-RPC
     print("\n💬 Sending message...")
 
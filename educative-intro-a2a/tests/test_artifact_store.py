@@ -0,0 +1,58 @@
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import httpx
+import pytest
+from fastapi import FastAPI
+
+from artifacts import ArtifactStore, add_artifact_routes
+
+
+def test_stores_sharing_a_parent_keep_their_files(tmp_path):
+    first = ArtifactStore(str(tmp_path))
+    artifact = first.save_base64("aGVsbG8=", "hello.txt")
+    second = ArtifactStore(str(tmp_path))
+    assert second.directory != first.directory
+    assert os.path.exists(artifact.path)
+
+    second.close()
+    assert os.path.exists(artifact.path)
+    first.close()
+    assert not os.path.exists(first.directory)
+    assert os.path.exists(tmp_path)
+
+
+def test_concurrent_writers_keep_the_total_consistent(tmp_path):
+    store = ArtifactStore(str(tmp_path), max_total_bytes=40 * 6)
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(lambda _: store.save_base64("aGVsbG8h"), range(200)))  # 6 bytes each
+    assert store.total_bytes == 240
+    assert sorted(os.listdir(store.directory)) == sorted(store._artifacts)
+    store.close()
+
+
+async def upload(store, headers=None):
+    app = FastAPI()
+    add_artifact_routes(app, store, upload_token="s3cret")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://t") as client:
+        response = await client.post("/artifacts", content=b"x" * 100, headers=headers or {})
+        if response.status_code == 200:
+            download = await client.get(response.json()["uri"])
+            assert download.content == b"x" * 100
+        return response
+
+
+@pytest.mark.parametrize(
+    "headers, status",
+    [
+        (None, 401),
+        ({"Authorization": "Bearer nope"}, 401),
+        ({"Authorization": "Bearer s3cret"}, 200),
+    ],
+)
+def test_upload_token(tmp_path, headers, status):
+    store = ArtifactStore(str(tmp_path))
+    assert asyncio.run(upload(store, headers)).status_code == status
+    store.close()
@@ -0,0 +1,91 @@
+import base64
+import json
+import os
+
+import pytest
+
+from artifacts import ArtifactStore, InvalidBody, JSONRPCBodyReader, PayloadTooLarge
+
+FILE_BYTES = bytes(range(256)) * 40
+
+
+def request_body(data: bytes = FILE_BYTES, escape_slashes: bool = False) -> bytes:
+    encoded = base64.b64encode(data).decode()
+    body = json.dumps(
+        {
+            "jsonrpc": "2.0",
+            "id": "1",
+            "method": "message/send",
+            "params": {
+                "message": {
+                    "kind": "message",
+                    "messageId": "m1",
+                    "role": "user",
+                    "parts": [
+                        {"kind": "text", "text": "a \"quoted\" bytes: value"},
+                        {"kind": "file", "file": {"name": "f.bin", "bytes": encoded}},
+                    ],
+                }
+            },
+        }
+    )
+    if escape_slashes:
+        body = body.replace("/", "\\/")
+    return body.encode()
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArtifactStore(str(tmp_path))
+    yield store
+    store.close()
+
+
+def read(store, body: bytes, chunk_size: int, max_body_bytes: int = 1 << 20):
+    reader = JSONRPCBodyReader(store, max_body_bytes)
+    for i in range(0, len(body), chunk_size):
+        reader.feed(body[i : i + chunk_size])
+    return reader, json.loads(reader.close())
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 4096, 1 << 20])
+def test_file_bytes_are_spooled_to_an_artifact(store, chunk_size):
+    reader, body = read(store, request_body(), chunk_size)
+    parts = body["params"]["message"]["parts"]
+    assert parts[0]["text"] == 'a "quoted" bytes: value'
+
+    artifact_id = parts[1]["file"]["bytes"]
+    artifact = reader.artifacts[artifact_id].close("f.bin")
+    with open(artifact.path, "rb") as f:
+        assert f.read() == FILE_BYTES
+    assert artifact.size == len(FILE_BYTES)
+
+
+def test_escaped_slashes_in_base64(store):
+    data = b"\xff" * 300  # base64 full of "/"
+    reader, body = read(store, request_body(data, escape_slashes=True), 5)
+    artifact = reader.artifacts[body["params"]["message"]["parts"][1]["file"]["bytes"]].close()
+    with open(artifact.path, "rb") as f:
+        assert f.read() == data
+
+
+def test_buffered_json_is_bounded_but_spooled_bytes_are_not(store):
+    read(store, request_body(), 4096, max_body_bytes=1024)
+    with pytest.raises(PayloadTooLarge):
+        read(store, request_body() + b" " * 2048, 4096, max_body_bytes=1024)
+
+
+def test_invalid_base64_is_rejected(store):
+    body = request_body().replace(b'"bytes": "', b'"bytes": "!!!!')
+    with pytest.raises(InvalidBody):
+        read(store, body, 64)
+
+
+def test_truncated_body_is_rejected_and_aborted(store):
+    body = request_body()
+    reader = JSONRPCBodyReader(store, 1 << 20)
+    reader.feed(body[: len(body) // 2])
+    with pytest.raises(InvalidBody):
+        reader.close()
+    reader.abort()
+    assert not os.listdir(store.directory)
@@ -0,0 +1,44 @@
+import os
+
+from fastapi import FastAPI, Header, HTTPException
+
+PORT = 9000
+
+# Token the client registered with its push notification config; notifications
+# carrying another token are rejected
+WEBHOOK_TOKEN = os.getenv("WEBHOOK_TOKEN")
+
+app = FastAPI()
+
+# Tasks received so far by id, handy for inspecting a test run
+received = {}
+
+
+@app.post("/webhook")
+def receive_task(task: dict, x_a2a_notification_token: str = Header(None)):
+    """A2A Push Notification Receiver"""
+    if WEBHOOK_TOKEN and x_a2a_notification_token != WEBHOOK_TOKEN:
+        raise HTTPException(status_code=401, detail="Invalid notification token")
+
+    received[task["id"]] = task
+    print(f"📬 Task {task['id']}: {task['status']['state']}")
+
+    # Find agent's reply in history
+    for msg in reversed(task.get("history", [])):
+        if msg.get("role") == "agent":
+            print(f"🤖 Agent: {msg['parts'][0]['text']}")
+            break
+
+    return {"ok": True}
+
+
+@app.get("/webhook/tasks")
+def list_tasks():
+    return received
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    print(f"📬 Webhook receiver on http://localhost:{PORT}/webhook")
+    uvicorn.run(app, host="0.0.0.0", port=PORT)
@@ -0,0 +1,52 @@
+import pytest
+from a2a.server.events.in_memory_queue_manager import InMemoryQueueManager
+from a2a.server.events.queue_manager import QueueManager
+from a2a.server.tasks.inmemory_task_store import InMemoryTaskStore
+
+from a2a_common.metrics import A2AMetrics, InstrumentedRequestHandler, Registry
+
+
+def test_label_values_are_escaped():
+    registry = Registry()
+    counter = registry.counter("requests_total", "Requests.", ("method",))
+    counter.inc('a\\b"c\nd')
+    assert 'requests_total{method="a\\\\b\\"c\\nd"} 1' in registry.render().splitlines()
+
+
+def test_histogram_buckets_are_cumulative():
+    registry = Registry()
+    histogram = registry.histogram("latency_seconds", "Latency.", ("method",), buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5):
+        histogram.observe(value, "m")
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{method="m",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{method="m",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{method="m",le="+Inf"} 3' in lines
+    assert 'latency_seconds_count{method="m"} 3' in lines
+
+
+def handler(queue_manager=None):
+    return InstrumentedRequestHandler(
+        agent_executor=None,
+        task_store=InMemoryTaskStore(),
+        queue_manager=queue_manager,
+        metrics=A2AMetrics(Registry()),
+    )
+
+
+def test_gauges_read_the_sdk_internals():
+    registry = Registry()
+    handler().register_gauges(registry)
+    lines = registry.render().splitlines()
+    assert "a2a_task_store_tasks 0" in lines
+    assert "a2a_event_queue_depth 0" in lines
+    assert "a2a_active_tasks 0" in lines
+
+
+def test_gauges_refuse_an_unknown_queue_manager():
+    class OtherQueueManager(QueueManager):
+        add = get = tap = close = create_or_tap = None
+
+    with pytest.raises(RuntimeError, match="a2a-sdk"):
+        handler(OtherQueueManager()).register_gauges(Registry())
+
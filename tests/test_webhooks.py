@@ -0,0 +1,47 @@
+import asyncio
+
+import pytest
+
+from a2a_common.webhooks import WebhookNotAllowed, WebhookPolicy, check_webhook_url
+
+
+def check(url, policy=None):
+    asyncio.run(check_webhook_url(url, policy))
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1:9000/webhook",
+        "http://10.0.0.5/hook",
+        "http://169.254.169.254/latest/meta-data",
+        "http://[::1]/hook",
+        "file:///etc/passwd",
+        "http:///no-host",
+    ],
+)
+def test_rejects_non_public_targets(url):
+    with pytest.raises(WebhookNotAllowed):
+        check(url)
+
+
+def test_accepts_public_address():
+    check("https://8.8.8.8/hook")
+
+
+def test_allowed_hosts_match_host_and_port():
+    policy = WebhookPolicy(allowed_hosts=frozenset({"127.0.0.1:9000"}))
+    check("http://127.0.0.1:9000/webhook", policy)
+    with pytest.raises(WebhookNotAllowed):
+        check("http://127.0.0.1:9001/webhook", policy)
+
+
+def test_allow_private():
+    check("http://10.0.0.5/hook", WebhookPolicy(allow_private=True))
+
+
+def test_policy_from_env(monkeypatch):
+    monkeypatch.setenv("DEMO_WEBHOOK_ALLOWED_HOSTS", "localhost:9000, Example.internal")
+    policy = WebhookPolicy.from_env("DEMO")
+    assert policy.allowed_hosts == {"localhost:9000", "example.internal"}
+    assert not policy.allow_private